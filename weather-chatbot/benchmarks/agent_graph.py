@@ -0,0 +1,127 @@
+"""
+Compares the per-turn overhead of building the agent graph (agents, extractors,
+assistants) for every turn, as the orchestrator used to, with building it once and
+reusing it. The LLM, geocoder and weather service are replaced with canned responses,
+so this runs offline and only measures the chatbot's own work per turn: wall time,
+and the peak memory allocated during the turn as traced by tracemalloc. Run from the
+weather-chatbot folder:
+
+    python -m benchmarks.agent_graph --turns 200
+"""
+import argparse
+import contextlib
+import json
+import os
+import statistics
+import time
+import tracemalloc
+from types import SimpleNamespace
+from typing import Callable, Iterator
+from unittest.mock import patch
+
+from src.clients.geocoding import GeocodeResult
+from src.context import Context
+from src.orchestrator import Orchestrator
+
+USER_MESSAGES = ["Hi", "I live in Seattle", "What's the weather like right now?", "Is it windy?"]
+
+WEATHER = json.dumps({"results": [{"phrase": "Cloudy", "temperature": {"value": 15.0, "unit": "C"}}]})
+
+
+class FakeCompletions:
+    """Answers every agent's prompt like the model would for a user in Seattle."""
+    def create(self, messages: list[dict], **kwargs):
+        prompt = messages[0]["content"]
+        if "extract location information" in prompt:
+            content = "Seattle, Washington, United States"
+        elif "classify it into one of the following" in prompt:
+            content = "CURRENT_CONDITIONS"
+        else:
+            content = "It is cloudy and 15C in Seattle."
+
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+class FakeGeocoder:
+    def geocode(self, description: str) -> GeocodeResult:
+        return GeocodeResult(47.6062, -122.3321, "United States, Seattle, WA")
+
+
+class FakePrefetcher:
+    def prefetch(self, lat: float, lon: float):
+        pass
+
+    def get_weather(self, lat: float, lon: float, weather_type) -> str:
+        return WEATHER
+
+
+@contextlib.contextmanager
+def offline() -> Iterator[None]:
+    client = SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions()))
+    with contextlib.ExitStack() as stack:
+        stack.enter_context(patch.dict(os.environ, {"OPENAI_DEPLOYMENT_NAME": "fake"}))
+        for module in ("location.location_extractor", "location.location_assistant",
+                       "weather.weather_extractor", "weather.weather_assistant"):
+            stack.enter_context(patch(f"src.agents.{module}.get_llm_client", return_value=client))
+        stack.enter_context(patch("src.agents.location.location_extractor.get_geocoder", return_value=FakeGeocoder()))
+        for module in ("location.location_agent", "weather.weather_assistant"):
+            stack.enter_context(patch(f"src.agents.{module}.get_weather_prefetcher", return_value=FakePrefetcher()))
+        yield
+
+
+def run(turns: int, get_orchestrator: Callable[[], Orchestrator], trace_memory: bool) -> list[float]:
+    """Returns the wall time (ms), or peak traced allocation (KiB), of each turn."""
+    samples = []
+    context = Context()
+
+    for turn in range(turns):
+        if turn % len(USER_MESSAGES) == 0:
+            context = Context()
+
+        if trace_memory:
+            tracemalloc.reset_peak()
+            start = tracemalloc.get_traced_memory()[0]
+            get_orchestrator().get_reply(USER_MESSAGES[turn % len(USER_MESSAGES)], context)
+            samples.append((tracemalloc.get_traced_memory()[1] - start) / 1024)
+        else:
+            start = time.perf_counter()
+            get_orchestrator().get_reply(USER_MESSAGES[turn % len(USER_MESSAGES)], context)
+            samples.append((time.perf_counter() - start) * 1000)
+
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=200)
+    args = parser.parse_args()
+
+    with offline():
+        shared = Orchestrator()
+        strategies = {"per turn": Orchestrator, "shared": lambda: shared}
+
+        # Warm up imports and singletons so neither strategy pays for them
+        run(len(USER_MESSAGES), Orchestrator, trace_memory=False)
+
+        results = {name: run(args.turns, get_orchestrator, trace_memory=False)
+                   for name, get_orchestrator in strategies.items()}
+
+        tracemalloc.start()
+        memory = {name: run(args.turns, get_orchestrator, trace_memory=True)
+                  for name, get_orchestrator in strategies.items()}
+        tracemalloc.stop()
+
+        start = time.perf_counter()
+        for _ in range(args.turns):
+            Orchestrator()
+        setup_us = (time.perf_counter() - start) / args.turns * 1e6
+
+    print(f"{'graph':<10} {'median ms/turn':>15} {'mean ms/turn':>13} {'peak KiB/turn':>14}")
+    for name in strategies:
+        print(f"{name:<10} {statistics.median(results[name]):>15.3f} {statistics.mean(results[name]):>13.3f} "
+              f"{statistics.median(memory[name]):>14.1f}")
+    print(f"building the graph: {setup_us:.0f}us")
+
+
+if __name__ == "__main__":
+    main()
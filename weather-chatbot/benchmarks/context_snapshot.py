@@ -0,0 +1,51 @@
+"""
+Measures Context snapshot size and to_bytes/from_bytes time against conversation length,
+with pickle of the same context as a reference. Run from the weather-chatbot folder:
+
+    python -m benchmarks.context_snapshot
+"""
+import argparse
+import pickle
+import timeit
+
+from src.clients.weather import WeatherType
+from src.context import Context
+
+
+def build_context(turns: int) -> Context:
+    context = Context()
+    for turn in range(turns):
+        context.add_message("user", f"What is the weather going to be like in Seattle on day {turn}?")
+        context.add_message("assistant", "Expect mostly cloudy skies with a high of 15 degrees, light winds "
+                                         "from the south and a 20 percent chance of showers in the evening.")
+    context.location = (47.6062, -122.3321)
+    context.location_description = "United States, Seattle, WA"
+    context.weather_category = WeatherType.DAILY_FORECAST
+
+    return context
+
+
+def time_us(function, number: int) -> float:
+    return min(timeit.repeat(function, number=number, repeat=5)) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, nargs="+", default=[1, 4, 8, 16, 64, 256])
+    parser.add_argument("--number", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'turns':>6} {'bytes':>8} {'pickle':>8} {'to_bytes_us':>12} {'from_bytes_us':>14}")
+    for turns in args.turns:
+        context = build_context(turns)
+        snapshot = context.to_bytes()
+        pickled = pickle.dumps(context)
+
+        to_bytes_us = time_us(context.to_bytes, args.number)
+        from_bytes_us = time_us(lambda: Context.from_bytes(snapshot), args.number)
+
+        print(f"{turns:>6} {len(snapshot):>8} {len(pickled):>8} {to_bytes_us:>12.1f} {from_bytes_us:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Measures Gazetteer lookup time for exact, reformatted, misspelled and unknown places
+against index size, on a synthetic index of made-up towns spread over the US states.
+Run from the weather-chatbot folder:
+
+    python -m benchmarks.gazetteer_lookup
+"""
+import argparse
+import itertools
+import timeit
+
+from src.clients.gazetteer import US_STATES, Gazetteer
+from src.clients.geocoding import GeocodeResult
+
+
+SYLLABLES = ["ash", "bel", "cor", "dun", "el", "fair", "glen", "har", "iver", "kings", "lan", "mar", "nor",
+             "oak", "pen", "ros", "sil", "tor", "ver", "wood"]
+SUFFIXES = ["ton", "ville", "field", "burg", "dale", "port", "wood", "ford"]
+
+
+def build_gazetteer(places: int) -> tuple[Gazetteer, str]:
+    names = ("".join(parts).title() for parts in itertools.product(SYLLABLES, SYLLABLES, SUFFIXES))
+    states = itertools.cycle(sorted(set(US_STATES.values())))
+
+    gazetteer = Gazetteer()
+    entries = {}
+    for index, (name, state) in enumerate(zip(names, states)):
+        if index == places:
+            break
+        entries[f"{name}, {state.title()}"] = GeocodeResult(30 + index % 20, -120 + index % 50, f"US, {name}")
+    gazetteer.add_all(entries)
+
+    return gazetteer, next(iter(entries))
+
+
+def time_us(function, number: int) -> float:
+    return min(timeit.repeat(function, number=number, repeat=5)) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--places", type=int, nargs="+", default=[100, 1000, 3200])
+    parser.add_argument("--number", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'places':>7} {'exact_us':>9} {'reformatted_us':>15} {'fuzzy_us':>9} {'miss_us':>8}")
+    for places in args.places:
+        gazetteer, name = build_gazetteer(places)
+        city, state = name.split(", ")
+        reformatted = f"United States, {state.upper()}, {city.lower()}"
+        misspelled = f"{city[:-2]}{city[-1]}, {state}"
+
+        assert gazetteer.lookup(misspelled) is not None, misspelled
+
+        exact_us = time_us(lambda: gazetteer.lookup(name), args.number)
+        reformatted_us = time_us(lambda: gazetteer.lookup(reformatted), args.number)
+        fuzzy_us = time_us(lambda: gazetteer.lookup(misspelled), args.number)
+        miss_us = time_us(lambda: gazetteer.lookup("Atlantis, Ocean"), args.number)
+
+        print(f"{places:>7} {exact_us:>9.1f} {reformatted_us:>15.1f} {fuzzy_us:>9.1f} {miss_us:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
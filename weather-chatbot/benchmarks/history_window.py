@@ -0,0 +1,55 @@
+"""
+Compares the history tokens WeatherAssistant puts in its prompt per turn with and without
+the HistoryManager window. Summaries are canned, so this runs offline and only measures
+prompt size. Run from the weather-chatbot folder:
+
+    python -m benchmarks.history_window --turns 40
+"""
+import argparse
+
+from src.context import Context
+from src.history import HistoryManager
+from src.metrics import estimate_tokens
+
+SUMMARY = "The user is in Seattle, WA and asked about rain, the weekend forecast and weather alerts."
+
+
+def run(turns: int, history: HistoryManager | None) -> list[int]:
+    """Returns the history tokens of each turn's prompt, rendering the full history if history is None."""
+    context = Context()
+    tokens_per_turn = []
+
+    for turn in range(turns):
+        context.add_message("user", f"What is the weather going to be like in Seattle on day {turn}?")
+        rendered = history.render(context) if history is not None else context.transcript.render()
+        tokens_per_turn.append(estimate_tokens(rendered))
+        context.add_message("assistant", "Expect mostly cloudy skies with a high of 15 degrees, light winds "
+                                         "from the south and a 20 percent chance of showers in the evening.")
+
+    return tokens_per_turn
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=40)
+    parser.add_argument("--keep-turns", type=int, default=4)
+    parser.add_argument("--token-budget", type=int, default=1500)
+    parser.add_argument("--every", type=int, default=5, help="print every n-th turn")
+    args = parser.parse_args()
+
+    history = HistoryManager(keep_turns=args.keep_turns, token_budget=args.token_budget,
+                             summarize=lambda summary, transcript: SUMMARY)
+
+    full = run(args.turns, None)
+    windowed = run(args.turns, history)
+
+    print(f"{'turn':>6} {'full':>8} {'windowed':>9}")
+    for turn in range(0, args.turns, args.every):
+        print(f"{turn + 1:>6} {full[turn]:>8} {windowed[turn]:>9}")
+
+    print(f"{'total':>6} {sum(full):>8} {sum(windowed):>9}")
+    print(f"summaries: {history.stats()['summaries']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+"""
+Load test driving many concurrent conversations through the orchestrator against the
+local fake backends, to find how many simultaneous sessions one process sustains.
+
+Each session plays a canned user script turn by turn, in its own thread through
+Orchestrator.get_reply (--mode threads) or as a task through
+AsyncOrchestrator.get_reply_async (--mode async), all sharing one orchestrator. The
+report has throughput, turn latency percentiles, failed turns, the calls each fake
+backend served and the process memory growth; --output saves it as JSON to compare
+builds with --baseline. Run from the weather-chatbot folder:
+
+    python -m benchmarks.load_test --concurrency 50 --sessions 200 --output load.json
+
+The fakes run in-process by default (configured with --config). As they then share the
+GIL with the chatbot, point --backend-url at a separately started `python -m fakes.server`
+to keep their overhead out of the measurement.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Optional
+
+import requests
+
+from fakes.server import BackgroundServer, FakeBackend, fake_environment
+from src.context import Context
+from src.metrics import percentile
+
+DEFAULT_CONFIG = os.path.join(os.path.dirname(__file__), "..", "fakes", "example_config.json")
+
+SCRIPTS = [
+    ["Hi", "I live in Seattle, Washington", "Will it rain tomorrow?", "Any weather alerts?"],
+    ["What's the weather like in Austin, Texas right now?", "And the forecast for the weekend?"],
+    ["Hello there", "Denver, Colorado", "How cold is it outside?", "What about next week?", "Thanks!"],
+    ["Are there any storm warnings in Miami, Florida?", "Is it humid right now?"],
+    ["I'm visiting Boston, Massachusetts", "Should I pack an umbrella for the next few days?",
+     "Actually I'm going to Portland, Oregon instead", "What's the forecast there?"],
+]
+
+
+class SessionResult:
+    def __init__(self):
+        self.latencies_ms: list[float] = []
+        self.errors: dict[str, int] = {}
+
+    def record_error(self, error: Exception):
+        name = type(error).__name__
+        self.errors[name] = self.errors.get(name, 0) + 1
+
+
+def _rss_mb() -> float:
+    """Current resident set size, or the peak where /proc is not available."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2 ** 20 if sys.platform == "darwin" else peak / 2 ** 10
+
+
+def run_session_sync(orchestrator, script: list[str], think_s: float) -> SessionResult:
+    context = Context()
+    result = SessionResult()
+
+    for message in [None] + script:
+        start = time.perf_counter()
+        try:
+            orchestrator.get_reply(message, context)
+            result.latencies_ms.append((time.perf_counter() - start) * 1000)
+        except Exception as error:
+            result.record_error(error)
+        time.sleep(think_s)
+
+    return result
+
+
+async def run_session_async(orchestrator, script: list[str], think_s: float) -> SessionResult:
+    context = Context()
+    result = SessionResult()
+
+    for message in [None] + script:
+        start = time.perf_counter()
+        try:
+            await orchestrator.get_reply_async(message, context)
+            result.latencies_ms.append((time.perf_counter() - start) * 1000)
+        except Exception as error:
+            result.record_error(error)
+        await asyncio.sleep(think_s)
+
+    return result
+
+
+def run_threads(scripts: list[list[str]], concurrency: int, think_s: float) -> list[SessionResult]:
+    from src.orchestrator import Orchestrator
+
+    orchestrator = Orchestrator()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(executor.map(lambda script: run_session_sync(orchestrator, script, think_s), scripts))
+
+
+async def run_async(scripts: list[list[str]], concurrency: int, think_s: float) -> list[SessionResult]:
+    from src.clients.geocoding import get_geocoder
+    from src.clients.llm_interface import get_client_registry
+    from src.clients.weather import get_async_weather_client
+    from src.orchestrator import AsyncOrchestrator
+
+    orchestrator = AsyncOrchestrator()
+    slots = asyncio.Semaphore(concurrency)
+
+    async def session(script: list[str]) -> SessionResult:
+        async with slots:
+            return await run_session_async(orchestrator, script, think_s)
+
+    try:
+        return await asyncio.gather(*(session(script) for script in scripts))
+    finally:
+        # The clients are bound to this loop, which asyncio.run closes
+        await get_client_registry().aclose()
+        await get_geocoder().aclose()
+        await get_async_weather_client().aclose()
+
+
+def backend_stats(base_url: str) -> dict[str, dict[str, int]]:
+    return requests.get(f"{base_url}/stats", timeout=10).json()
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(base_url: str, mode: str, concurrency: int, sessions: int, think_s: float,
+        scripts: Optional[list[list[str]]] = None) -> dict:
+    """Runs the sessions against the fakes at base_url and returns the report."""
+    from src.clients.geocoding import get_geocoder
+    from src.clients.resilience import get_llm_resilience
+    from src.clients.weather_cache import get_weather_cache
+
+    os.environ.update(fake_environment(base_url))
+    scripts = scripts or SCRIPTS
+    session_scripts = [scripts[session % len(scripts)] for session in range(sessions)]
+
+    calls_before = backend_stats(base_url)
+    rss_before = _rss_mb()
+    start = time.perf_counter()
+
+    if mode == "threads":
+        results = run_threads(session_scripts, concurrency, think_s)
+    else:
+        results = asyncio.run(run_async(session_scripts, concurrency, think_s))
+
+    elapsed = time.perf_counter() - start
+    rss_after = _rss_mb()
+    calls_after = backend_stats(base_url)
+
+    latencies = [latency for result in results for latency in result.latencies_ms]
+    errors: dict[str, int] = {}
+    for result in results:
+        for name, count in result.errors.items():
+            errors[name] = errors.get(name, 0) + count
+
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "parameters": {"mode": mode, "concurrency": concurrency, "sessions": sessions, "think_ms": think_s * 1000},
+        "elapsed_s": elapsed,
+        "turns": len(latencies),
+        "failed_turns": sum(errors.values()),
+        "errors": errors,
+        "throughput_turns_per_s": len(latencies) / elapsed if elapsed > 0 else None,
+        "latency_ms": {
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+            "max": max(latencies) if latencies else None,
+        },
+        "backend_calls": {backend: {name: calls_after[backend][name] - calls_before[backend][name]
+                                    for name in calls_after[backend]}
+                          for backend in calls_after},
+        "geocoder": get_geocoder().stats(),
+        "weather_cache": get_weather_cache().stats(),
+        "llm": get_llm_resilience().stats(),
+        "memory_mb": {"before": rss_before, "after": rss_after, "growth": rss_after - rss_before},
+    }
+
+
+def _format(value) -> str:
+    return f"{value:.1f}" if isinstance(value, float) else str(value)
+
+
+def print_report(report: dict, baseline: Optional[dict] = None):
+    rows = [
+        ("throughput (turns/s)", report["throughput_turns_per_s"], lambda r: r["throughput_turns_per_s"]),
+        ("p50 turn latency (ms)", report["latency_ms"]["p50"], lambda r: r["latency_ms"]["p50"]),
+        ("p95 turn latency (ms)", report["latency_ms"]["p95"], lambda r: r["latency_ms"]["p95"]),
+        ("p99 turn latency (ms)", report["latency_ms"]["p99"], lambda r: r["latency_ms"]["p99"]),
+        ("failed turns", report["failed_turns"], lambda r: r["failed_turns"]),
+        ("memory growth (MB)", report["memory_mb"]["growth"], lambda r: r["memory_mb"]["growth"]),
+    ]
+
+    print(f"{report['turns']} turns in {report['elapsed_s']:.1f}s ({report['parameters']})")
+    print(f"{'':<24}{'this run':>12}" + (f"{'baseline':>12}{'change':>10}" if baseline else ""))
+    for name, value, get in rows:
+        line = f"{name:<24}{_format(value):>12}"
+        if baseline is not None:
+            previous = get(baseline)
+            change = f"{(value - previous) / previous * 100:+.0f}%" if value is not None and previous else ""
+            line += f"{_format(previous):>12}{change:>10}"
+        print(line)
+
+    for backend, calls in report["backend_calls"].items():
+        print(f"{backend + ' calls':<24}{calls['requests']:>12} ({calls['errors']} errors, "
+              f"{calls['throttled']} throttled)")
+    for name in ("geocoder", "weather_cache"):
+        if name in report:
+            print(f"{name + ' lookups':<24}{report[name]['hits'] + report[name]['misses']:>12} "
+                  f"({report[name]['hits']} cached, {report[name]['coalesced']} coalesced)")
+    llm = report.get("llm") or {}
+    if llm.get("hedges_fired") or llm.get("timeouts") or llm.get("circuit"):
+        print(f"LLM calls: {llm['hedges_fired']} hedged ({llm['hedges_won']} won), {llm['timeouts']} timed out, "
+              f"circuit {llm['circuit']}")
+    if report["errors"]:
+        print(f"errors: {report['errors']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["threads", "async"], default="threads")
+    parser.add_argument("--concurrency", type=int, default=20, help="sessions running at once")
+    parser.add_argument("--sessions", type=int, default=100, help="sessions to run in total")
+    parser.add_argument("--think-ms", type=float, default=0, help="pause between a reply and the next message")
+    parser.add_argument("--scripts", help="JSON file with a list of scripts, each a list of user messages")
+    parser.add_argument("--config", default=DEFAULT_CONFIG, help="config of the in-process fakes")
+    parser.add_argument("--backend-url", help="use fakes already running at this address")
+    parser.add_argument("--output", help="save the report as JSON")
+    parser.add_argument("--baseline", help="a previously saved report to compare with")
+    args = parser.parse_args()
+
+    scripts = None
+    if args.scripts:
+        with open(args.scripts) as scripts_file:
+            scripts = json.load(scripts_file)
+
+    if args.backend_url:
+        report = run(args.backend_url, args.mode, args.concurrency, args.sessions, args.think_ms / 1000, scripts)
+    else:
+        with BackgroundServer(FakeBackend.from_file(args.config)) as server:
+            report = run(server.base_url, args.mode, args.concurrency, args.sessions, args.think_ms / 1000, scripts)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+
+    print_report(report, baseline)
+
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(report, output_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Compares the prompt tokens sent by LocationExtractor per turn in full and incremental mode.
+
+The LLM and geocoder are replaced with canned responses, so this runs offline and only
+measures prompt size, which dominates the extractor's cost and latency on long
+conversations. Run from the weather-chatbot folder:
+
+    python -m benchmarks.location_extraction --turns 40
+"""
+import argparse
+import os
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from src.agents.location.location_extractor import LocationExtractor, location_unchanged
+from src.clients.geocoding import GeocodeResult
+from src.context import Context
+from src.metrics import estimate_tokens
+
+USER_MESSAGES = [
+    "Will it rain this afternoon?",
+    "What about tomorrow morning?",
+    "Is there anything I should be worried about, like storms?",
+    "How warm will it get over the weekend?",
+]
+
+
+class FakeCompletions:
+    """Records the prompt tokens of each call and answers like a model that always finds Seattle."""
+    def __init__(self):
+        self.prompt_tokens = []
+
+    def create(self, messages: list[dict], **kwargs):
+        prompt = "\n".join(m["content"] for m in messages)
+        self.prompt_tokens.append(estimate_tokens(prompt))
+        content = location_unchanged if "LOCATION CHANGED" in prompt else "Seattle, Washington, United States"
+
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+class FakeGeocoder:
+    def geocode(self, description: str) -> GeocodeResult:
+        return GeocodeResult(47.6062, -122.3321, "United States, Seattle, WA")
+
+
+def run(turns: int, incremental: bool) -> list[int]:
+    """Returns the prompt tokens sent on each turn of a conversation with the given number of turns."""
+    completions = FakeCompletions()
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    extractor = LocationExtractor(geocoder=FakeGeocoder(), incremental=incremental)
+    context = Context()
+    context.add_message("assistant", "Hi! What is your location?")
+    context.add_message("user", "I live in Seattle")
+
+    tokens_per_turn = []
+    with patch("src.agents.location.location_extractor.get_llm_client", return_value=client):
+        for turn in range(turns):
+            calls_before = len(completions.prompt_tokens)
+            extractor.extract(context)
+            tokens_per_turn.append(sum(completions.prompt_tokens[calls_before:]))
+
+            context.add_message("assistant", "It will be mostly cloudy with a high of 15 degrees and light winds.")
+            context.add_message("user", USER_MESSAGES[turn % len(USER_MESSAGES)])
+
+    return tokens_per_turn
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=40)
+    parser.add_argument("--every", type=int, default=5, help="print every n-th turn")
+    args = parser.parse_args()
+
+    os.environ.setdefault("OPENAI_DEPLOYMENT_NAME", "benchmark")
+
+    full = run(args.turns, incremental=False)
+    incremental = run(args.turns, incremental=True)
+
+    print(f"{'turn':>6} {'full':>8} {'incremental':>12}")
+    for turn in range(0, args.turns, args.every):
+        print(f"{turn + 1:>6} {full[turn]:>8} {incremental[turn]:>12}")
+
+    print(f"{'total':>6} {sum(full):>8} {sum(incremental):>12}")
+
+
+if __name__ == "__main__":
+    main()
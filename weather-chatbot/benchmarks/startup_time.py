@@ -0,0 +1,81 @@
+"""
+Measures how long the chatbot and eval entry points take to import, in a fresh
+interpreter per module so nothing is already cached, and lists the modules that
+cost the most with `python -X importtime`. Heavy SDKs (openai, azure.maps.search,
+mlflow, azureml, pandas) should only show up for modules that really use them at
+import. Run from the weather-chatbot folder:
+
+    python -m benchmarks.startup_time --top 5
+"""
+import argparse
+import subprocess
+import sys
+
+DEFAULT_MODULES = [
+    "src.demo",
+    "src.server",
+    "eval.agents.run_agent_test",
+    "eval.end_to_end.run_local",
+    "eval.library.utils.aml_utils",
+    "eval.library.utils.eval_helpers",
+    "eval.library.conversation_generator.conversation",
+    "eval.library.llm_grader.llm_grader",
+]
+
+HEAVY_MODULES = ["openai", "azure.maps.search", "mlflow", "azureml.core", "pandas", "numpy"]
+
+
+def import_times(module: str) -> tuple[int, dict[str, int], set[str]]:
+    """
+    Imports module in a fresh interpreter and returns its cumulative import time, the
+    cumulative time of each top level package it pulled in (in microseconds) and the
+    names of all the modules it pulled in.
+    """
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                               capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{completed.stderr}")
+
+    entries = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        entries.append((name.strip(), int(cumulative_us), len(name) - len(name.lstrip())))
+
+    # A module's own imports are listed right before it, indented further
+    index = next(index for index, (name, _, _) in enumerate(entries) if name == module)
+    _, total_us, indent = entries[index]
+    packages = {}
+    names = set()
+    for name, cumulative_us, child_indent in reversed(entries[:index]):
+        if child_indent <= indent:
+            break
+
+        names.add(name)
+        top_level = name.split(".")[0]
+        packages[top_level] = max(packages.get(top_level, 0), cumulative_us)
+
+    return total_us, packages, names
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--top", type=int, default=3, help="slowest imported packages to list per module")
+    parser.add_argument("--runs", type=int, default=3, help="best of this many fresh interpreters")
+    args = parser.parse_args()
+
+    print(f"{'module':<52} {'import ms':>10}  heavy SDKs loaded")
+    for module in args.modules:
+        total_us, packages, names = min((import_times(module) for _ in range(args.runs)), key=lambda run: run[0])
+        heavy = [name for name in HEAVY_MODULES if name in names]
+        print(f"{module:<52} {total_us / 1000:>10.0f}  {', '.join(heavy) or '-'}")
+
+        slowest = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:args.top]
+        for name, cumulative_us in slowest:
+            print(f"    {name:<48} {cumulative_us / 1000:>10.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Compares the combined extractor (one LLM call for the location and the weather category)
+with the separate LocationExtractor and WeatherExtractor calls on their test data,
+reporting accuracy and latency side by side.
+
+A location is correct when it is within --tolerance_km of the geocoded labelled city
+and state; a weather category when it equals the labelled one. Test cases without a
+label for a field are left out of that field's accuracy. The separate extractors run one
+after the other, as in the synchronous Orchestrator. To run from the
+weather-chatbot folder:
+
+    python -m eval.agents.combined.CombinedExtractor.extraction_comparison
+"""
+import argparse
+import json
+import math
+import os
+import time
+
+from dotenv import load_dotenv
+
+from eval.agents.weather.WeatherExtractor.fast_path_report import load_test_cases
+from src.agents.combined_extractor import CombinedExtractor
+from src.agents.location.location_extractor import LocationExtractor
+from src.agents.weather.weather_extractor import WeatherExtractor
+from src.clients.geocoding import Geocoder, get_geocoder
+from src.context import Context
+from src.metrics import LatencyRecorder
+
+AGENTS_FOLDER = os.path.join(os.path.dirname(__file__), '..', '..')
+TEST_DATA_FOLDERS = [os.path.join(AGENTS_FOLDER, 'location', 'LocationExtractor', 'test-data'),
+                     os.path.join(AGENTS_FOLDER, 'weather', 'WeatherExtractor', 'test-data')]
+DEFAULT_TOLERANCE_KM = 25
+
+
+def distance_km(first: tuple[float, float], second: tuple[float, float]) -> float:
+    lat1, lon1, lat2, lon2 = map(math.radians, (*first, *second))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+
+    return 2 * 6371 * math.asin(math.sqrt(a))
+
+
+def run_separate(context: Context):
+    LocationExtractor(incremental=False).extract(context)
+    WeatherExtractor().extract(context)
+
+
+def run_combined(context: Context):
+    CombinedExtractor().extract(context)
+
+
+MODES = {'separate': run_separate, 'combined': run_combined}
+
+
+def build_report(test_cases: list[dict], geocoder: Geocoder, tolerance_km: float = DEFAULT_TOLERANCE_KM) -> dict:
+    latency = {mode: LatencyRecorder() for mode in MODES}
+    correct = {mode: {'location': 0, 'weather_category': 0} for mode in MODES}
+    labelled = {'location': 0, 'weather_category': 0}
+    rows = []
+
+    for test_case in test_cases:
+        attributes = test_case.get('customer_profile', {}).get('attributes', {})
+        expected_location = None
+        if attributes.get('location'):
+            expected = geocoder.geocode(f"{attributes['location']['city']}, {attributes['location']['state']}")
+            expected_location = (expected.lat, expected.lon) if expected else None
+        expected_category = attributes.get('weather_category')
+
+        labelled['location'] += expected_location is not None
+        labelled['weather_category'] += expected_category is not None
+
+        row = {'test_case_id': test_case.get('test_case_id')}
+        for mode, run in MODES.items():
+            context = Context()
+            context._messages = test_case['context']['message_history']
+
+            start = time.perf_counter()
+            run(context)
+            latency[mode].record((time.perf_counter() - start) * 1000)
+
+            category = context.weather_category.name if context.weather_category else None
+            location_correct = expected_location is not None and context.location is not None \
+                and distance_km(context.location, expected_location) <= tolerance_km
+            correct[mode]['location'] += location_correct
+            correct[mode]['weather_category'] += expected_category is not None and category == expected_category
+            row[mode] = {'location': context.location_description, 'weather_category': category}
+
+        rows.append(row)
+
+    def accuracy(mode: str, field: str) -> float | None:
+        return correct[mode][field] / labelled[field] if labelled[field] else None
+
+    return {
+        'test_cases': len(test_cases),
+        'modes': {
+            mode: {
+                'location_accuracy': accuracy(mode, 'location'),
+                'weather_category_accuracy': accuracy(mode, 'weather_category'),
+                'latency_p50_ms': latency[mode].summary()['p50_ms'],
+                'latency_p95_ms': latency[mode].summary()['p95_ms'],
+            }
+            for mode in MODES
+        },
+        'disagreements': [row for row in rows if row['separate'] != row['combined']],
+        'rows': rows,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--test_data', nargs='+', default=TEST_DATA_FOLDERS, help='Test data files or folders')
+    parser.add_argument('--tolerance_km', type=float, default=DEFAULT_TOLERANCE_KM)
+    args = parser.parse_args()
+
+    load_dotenv()
+
+    report = build_report(load_test_cases(args.test_data), get_geocoder(), args.tolerance_km)
+
+    print(json.dumps({key: value for key, value in report.items() if key != 'rows'}, indent=4))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,13 +1,20 @@
 import argparse
 import glob
+import logging
 import os
+from dotenv import load_dotenv
 from eval.library.utils.aml_utils import connect_to_aml
-from eval.library.inner_loop.mlflow_helpers.core.run_mlflow_experiment import (
-    run_mlflow_experiment)
-from eval.agents.location.LocationExtractor.mlflow_experiment import LocationExtractorAgent
-from eval.agents.location.LocationAssistant.mlflow_experiment import LocationAssistantAgent
-from eval.agents.weather.WeatherExtractor.mlflow_experiment import WeatherExtractorAgent
-from eval.agents.weather.WeatherAssistant.mlflow_experiment import WeatherAssistantAgent
+from src.lazy import lazy_import
+
+# The experiment runner and agent wrappers import mlflow, so only the one being run is loaded
+run_mlflow_experiment = lazy_import(
+    "eval.library.inner_loop.mlflow_helpers.core.run_mlflow_experiment", "run_mlflow_experiment")
+LocationExtractorAgent = lazy_import("eval.agents.location.LocationExtractor.mlflow_experiment",
+                                     "LocationExtractorAgent")
+LocationAssistantAgent = lazy_import("eval.agents.location.LocationAssistant.mlflow_experiment",
+                                     "LocationAssistantAgent")
+WeatherExtractorAgent = lazy_import("eval.agents.weather.WeatherExtractor.mlflow_experiment", "WeatherExtractorAgent")
+WeatherAssistantAgent = lazy_import("eval.agents.weather.WeatherAssistant.mlflow_experiment", "WeatherAssistantAgent")
 
 
 
@@ -69,6 +76,8 @@ def main():
     parser.add_argument('--output_folder', type=str, required=False, default='eval/agents', help='Name of folder being outputed in aml')
 
     cli_args = parser.parse_args()
+    load_dotenv()
+    logging.basicConfig(level=logging.ERROR)
     connect_to_aml()
     agent_test = AgentTest.from_args(args=cli_args)
     agent_test.run_experiment()
@@ -0,0 +1,97 @@
+"""
+Reports how the rule based fast path of the WeatherExtractor does on its test data:
+how often it resolves the category locally (hit rate) and, for those hits, how often it
+agrees with the LLM and with the test case's labelled weather category.
+
+To run from the weather-chatbot folder (add --no_llm to skip the LLM calls):
+
+    python -m eval.agents.weather.WeatherExtractor.fast_path_report
+"""
+import argparse
+import glob
+import json
+import os
+
+from dotenv import load_dotenv
+
+from src.agents.weather.weather_classifier import DEFAULT_THRESHOLD, WeatherRuleClassifier
+from src.agents.weather.weather_extractor import WeatherExtractor
+from src.context import Context
+
+TEST_DATA_FOLDER = os.path.join(os.path.dirname(__file__), 'test-data')
+
+
+def load_test_cases(paths: list[str]) -> list[dict]:
+    test_cases = []
+    for path in paths:
+        files = glob.glob(os.path.join(path, '**', '*.json'), recursive=True) if os.path.isdir(path) else [path]
+        for file in files:
+            with open(file) as test_data:
+                test_cases.extend(json.load(test_data))
+
+    return test_cases
+
+
+def llm_category(messages: list[dict]) -> str | None:
+    extractor = WeatherExtractor()
+    extractor.classifier = None
+    context = Context()
+    context._messages = messages
+    extractor.extract(context)
+
+    return context.weather_category.name if context.weather_category else None
+
+
+def build_report(test_cases: list[dict], classifier: WeatherRuleClassifier, use_llm: bool = True) -> dict:
+    rows = []
+    for test_case in test_cases:
+        messages = test_case['context']['message_history']
+        context = Context()
+        context._messages = messages
+        classification = classifier.classify(context.transcript.render(start=-2, roles=['user']))
+
+        rows.append({
+            'test_case_id': test_case.get('test_case_id'),
+            'fast_path': classification.weather_type.name if classification.weather_type else None,
+            'confidence': round(classification.confidence, 3),
+            'llm': llm_category(messages) if use_llm else None,
+            'label': test_case.get('customer_profile', {}).get('attributes', {}).get('weather_category'),
+        })
+
+    hits = [row for row in rows if row['fast_path'] is not None]
+
+    def agreement(key: str) -> float | None:
+        compared = [row for row in hits if row[key] is not None]
+        return sum(row['fast_path'] == row[key] for row in compared) / len(compared) if compared else None
+
+    return {
+        'test_cases': len(rows),
+        'fast_path_hits': len(hits),
+        'hit_rate': len(hits) / len(rows) if rows else None,
+        'llm_agreement': agreement('llm'),
+        'label_agreement': agreement('label'),
+        'disagreements': [row for row in hits if (row['llm'] and row['llm'] != row['fast_path'])
+                          or (row['label'] and row['label'] != row['fast_path'])],
+        'rows': rows,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--test_data', nargs='+', default=[TEST_DATA_FOLDER], help='Test data files or folders')
+    parser.add_argument('--patterns', help='JSON file with the patterns to evaluate instead of the defaults')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument('--no_llm', action='store_true', help='Only compare with the labelled categories')
+    args = parser.parse_args()
+
+    load_dotenv()
+
+    classifier = WeatherRuleClassifier.from_file(args.patterns, args.threshold) if args.patterns \
+        else WeatherRuleClassifier(threshold=args.threshold)
+    report = build_report(load_test_cases(args.test_data), classifier, use_llm=not args.no_llm)
+
+    print(json.dumps({key: value for key, value in report.items() if key != 'rows'}, indent=4))
+
+
+if __name__ == '__main__':
+    main()
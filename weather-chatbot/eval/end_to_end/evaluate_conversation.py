@@ -1,6 +1,5 @@
 from copy import deepcopy
 import json
-import openai
 from  eval.library.llm_grader.templates import (
     prompt_template_single_criteria_full_conversation,
     prompt_template_multiple_criteria_full_conversation,
@@ -9,7 +8,6 @@ import os
 from  eval.library.llm_grader.llm_grader import LLMgrader
 import mlflow
 from statistics import mean
-import pandas as pd
 from eval.end_to_end.constants import (
     CRITERIA_PROMPT_VAR,
     CONVO_HISTORY_VAR,
@@ -23,6 +21,10 @@ from eval.library.utils.constants import (
     PROMPT_DICT_FILE_NAME,
     RESULT_DATA_FILE_NAME,
 )
+from src.lazy import lazy_import
+
+openai = lazy_import("openai")
+pd = lazy_import("pandas")
 
 
 METRICS_DICT_FILE_NAME = 'score_per_convo.json'
@@ -11,12 +11,15 @@ from eval.end_to_end.constants import (
     LOCAL_COPILOT_PRINCIPLES_DATAPATH,CONVO_RUNTIME_FILE_NAME,CUSTOMER_PROFILE_VAR,
     EXIT_ERROR_VAR,CONVO_GEN_RETRY_VAR,PROFILE_OVERRIDE_VAR,NUM_CONVO_VAR,USER_PROMPT_VAR
 )
-import pandas as pd
-import mlflow
 import json
 import os
 import time
 
+from src.lazy import lazy_import
+
+pd = lazy_import("pandas")
+mlflow = lazy_import("mlflow")
+
 
 class OrchestrateConversation:
     def __init__(self, convo_gen: ConversationGenerator, default_num_convo=3):
@@ -32,7 +35,7 @@ class OrchestrateConversation:
         self.runtime_dict = {}
         self.scenario_count = 0
 
-    def initialize_scenario_criteria_df(self) -> pd.DataFrame:
+    def initialize_scenario_criteria_df(self) -> "pd.DataFrame":
         '''This method is to download the scenario criteria csv from azure machine learning blob workspace
         Returns:
             pd.DataFrame: Dataframe of scenarios and criteria
@@ -51,7 +54,7 @@ class OrchestrateConversation:
         return scenario_df
 
     def generate_scenario_convo_dict_helper(
-        self, df: pd.DataFrame, context: dict, customer_profile: dict
+        self, df: "pd.DataFrame", context: dict, customer_profile: dict
     ) -> list[dict]:
         '''This methods takes in a dataframe a scenario and its criteria and returns a list
         of dict of each scenario criteria pair.
@@ -90,7 +93,7 @@ class OrchestrateConversation:
         return scenario_conversation_json
 
     def generate_structured_convo_data_per_scenario(
-        self, group: tuple, df: pd.DataFrame
+        self, group: tuple, df: "pd.DataFrame"
     ) -> None:
         '''This method is to generate structured convo data per scenario
         by taking input scenario to generate a conversation and store this
@@ -1,12 +1,9 @@
-import mlflow
-from mlflow.exceptions import MlflowException
 from datetime import datetime
 import os
 import shutil
 import argparse
 import traceback
 
-from eval.end_to_end.evaluate_conversation import EndtoEndEval
 from eval.end_to_end.generate_conversation import OrchestrateConversation
 from eval.library.conversation_generator.conversation import ConversationGenerator
 
@@ -20,16 +17,22 @@ from eval.end_to_end.constants import (
     LOCAL_SCENARIO_DATAPATH,
     LOCAL_END_TO_END_DATAPATH
 )
+from src.lazy import lazy_import
 import logging
 from dotenv import load_dotenv
 
-load_dotenv()
+mlflow = lazy_import("mlflow")
+# EndtoEndEval is an mlflow model, so its module imports mlflow
+EndtoEndEval = lazy_import("eval.end_to_end.evaluate_conversation", "EndtoEndEval")
+
 AML_END_TO_END_DATAPATH = "scenario_data"
 END_TO_END_ARTIFACT_PATH = "end_to_end"
 
 
 def run_mlflow_experiment(output_folder: str):
     """Run mlflow experiment locally and track in aml"""
+    from mlflow.exceptions import MlflowException
+
     # Define required arguments
     timestamp = datetime.now().strftime("%Y-%m-%d-%H-%M-%S")
     exp_name = f"{END_TO_END_ARTIFACT_PATH}"
@@ -129,6 +132,9 @@ def run(output_folder: str):
 
 
 if __name__ == "__main__":
+    load_dotenv()
+    logging.basicConfig(level=logging.ERROR)
+
     parser = argparse.ArgumentParser()
     parser.add_argument("--output_folder", type=str, required=False, default=LOCAL_END_TO_END_DATAPATH)
     args, _ = parser.parse_known_args()
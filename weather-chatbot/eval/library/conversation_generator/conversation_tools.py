@@ -1,9 +1,12 @@
 import os
 from typing import List, Optional
 import json
-import pandas as pd
 from copy import deepcopy
 
+from src.lazy import lazy_import
+
+pd = lazy_import("pandas")
+
 
 def write_conversation_to_logs(message_history: List,
                                conversation_id: str,
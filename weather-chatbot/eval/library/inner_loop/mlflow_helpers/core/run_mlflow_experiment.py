@@ -1,14 +1,10 @@
 import os
 import glob
-import mlflow
 from datetime import datetime
 import json
-import numpy as np
 import time
+from typing import TYPE_CHECKING
 
-from eval.library.inner_loop.mlflow_helpers.core.agent_base_class import (
-    AgentWrapper
-)
 from eval.library.utils.aml_utils import (
     associate_model_w_data
 )
@@ -22,10 +18,17 @@ from eval.end_to_end.constants import (
     LLM_GRADER_EXPLANATION,
     EXACT_MATCH_RAW
 )
+from src.lazy import lazy_import
+
+if TYPE_CHECKING:
+    from eval.library.inner_loop.mlflow_helpers.core.agent_base_class import AgentWrapper
+
+mlflow = lazy_import("mlflow")
+np = lazy_import("numpy")
 
 
 def run_mlflow_experiment(
-        agent: AgentWrapper,
+        agent: "AgentWrapper",
         test_data_path: list[str],
         output_folder: str) -> None:
     """Run experiment with variants in mlflow and evaluate the output"""
@@ -1,21 +1,21 @@
 from typing import Dict
-from azureml.core.model import Model
-from azureml.core import Workspace, Datastore, Dataset, Experiment
-from azureml.core.run import Run
-from azureml.data.datapath import DataPath
-from dotenv import load_dotenv
 import os
-import logging
 import traceback
 
-import mlflow
+from src.lazy import lazy_import
 
+# The Azure ML SDK and mlflow take seconds to import, so they are only loaded when used
+Model = lazy_import("azureml.core.model", "Model")
+Workspace = lazy_import("azureml.core", "Workspace")
+Datastore = lazy_import("azureml.core", "Datastore")
+Dataset = lazy_import("azureml.core", "Dataset")
+Experiment = lazy_import("azureml.core", "Experiment")
+Run = lazy_import("azureml.core.run", "Run")
+DataPath = lazy_import("azureml.data.datapath", "DataPath")
+mlflow = lazy_import("mlflow")
 
-DATASTORE_NAME = "workspaceblobstore"
-
-load_dotenv()
 
-logging.basicConfig(level=logging.ERROR)
+DATASTORE_NAME = "workspaceblobstore"
 
 
 def get_workspace() -> Workspace:
@@ -58,7 +58,7 @@ def get_dataset(ws, azure_data_path) -> Dataset:
     return dataset
 
 
-def get_run(run_name: str, experiment_id: str) -> mlflow.ActiveRun:
+def get_run(run_name: str, experiment_id: str) -> "mlflow.ActiveRun":
     """Return the active mlflow run or start one if it doesn't exist
     (when running locally)
 
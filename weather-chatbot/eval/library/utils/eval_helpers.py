@@ -1,9 +1,12 @@
 """Contains helper functions for evaluation data"""
 
-import pandas as pd
+from src.lazy import lazy_import
+from src.transcript import transcript_for
 
+pd = lazy_import("pandas")
 
-def append_dataset(df1: pd.DataFrame, df2: pd.DataFrame) -> pd.DataFrame:
+
+def append_dataset(df1: "pd.DataFrame", df2: "pd.DataFrame") -> "pd.DataFrame":
     """Helper function to append synthetic datasets together.
 
     Args:
@@ -29,8 +32,7 @@ def append_dataset(df1: pd.DataFrame, df2: pd.DataFrame) -> pd.DataFrame:
 
 
 def get_conversation_as_string(context):
-    conversation = ""
-    for turn_dct in context["message_history"]:
-        line = f"{turn_dct['role'].upper()}: {turn_dct['content']}"
-        conversation = conversation + line + "\n"
-    return conversation
+    transcript = transcript_for(context["message_history"])
+    if len(transcript) == 0:
+        return ""
+    return transcript.render("upper") + "\n"
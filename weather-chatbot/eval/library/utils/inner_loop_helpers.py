@@ -14,6 +14,7 @@ from eval.end_to_end.constants import (
     IDEAL_ANSWER_VAR,
 )
 from eval.end_to_end.constants import CONVO_HISTORY_VAR
+from src.transcript import transcript_for
     
 
 def load_json_file(path: str, name_data: str) -> list[dict]:
@@ -50,7 +51,7 @@ class GuardrailsGrader:
         score = {}
         agent_context = self.agent_input['context']
         message_history = agent_context[CONVO_HISTORY_VAR]
-        message_history = '\n'.join([f"{msg['role']}: {msg['content']}" for msg in message_history])
+        message_history = transcript_for(message_history).render()
         answer = evaluator.evaluate_conversation(message_history, self.criteria)
         if answer is None or len(answer) == 0:
             score['exact_match'] = 0
@@ -70,7 +71,7 @@ class GuardrailsGrader:
             criteria_list_string += f"{i+1}. {self.criteria[i]}\n"
         agent_context = self.agent_input['context']
         message_history = agent_context[CONVO_HISTORY_VAR]
-        message_history = '\n'.join([f"{msg['role']}: {msg['content']}" for msg in message_history])
+        message_history = transcript_for(message_history).render()
         answer = evaluator.evaluate_conversation(message_history, criteria_list_string)
         score = {}
         if answer is None or len(answer) == 0:
@@ -1,8 +1,11 @@
-from openai import AzureOpenAI
 from dotenv import load_dotenv
 from typing import Optional
 import os
 
+from src.lazy import lazy_import
+
+AzureOpenAI = lazy_import("openai", "AzureOpenAI")
+
 
 def get_completion(messages, temperature, max_tokens: Optional[int] = None):
     """This method generates a response from the Azure OpenAI API
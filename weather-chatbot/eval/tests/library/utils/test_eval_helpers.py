@@ -22,3 +22,12 @@ class TestEvalDataHelpersObject(TestCase):
             conversation_string = get_conversation_as_string(context=context)
 
             self.assertGreater(len(conversation_string), 0)
+
+    def test_get_conversation_as_string_uppercases_roles(self):
+        context = {'message_history': [{'role': 'assistant', 'content': 'hello'}, {'role': 'user', 'content': 'hi'}]}
+
+        self.assertEqual('ASSISTANT: hello\nUSER: hi\n', get_conversation_as_string(context))
+
+        context['message_history'].append({'role': 'assistant', 'content': 'bye'})
+        self.assertEqual('ASSISTANT: hello\nUSER: hi\nASSISTANT: bye\n', get_conversation_as_string(context))
+        self.assertEqual('', get_conversation_as_string({'message_history': []}))
@@ -0,0 +1,417 @@
+"""
+Local stand-in for the Azure services the chatbot calls, for load tests and benchmarks
+without Azure credentials. A single plain ASGI application serves:
+
+    POST /openai/deployments/{deployment}/chat/completions   Azure OpenAI chat completions (and streams)
+    GET  /search/address/json                                Azure Maps search_address
+    GET  /weather/{currentConditions,forecast/daily,severe/alerts}/json   Azure Maps weather
+
+Run it from the weather-chatbot folder with:
+
+    python -m fakes.server --port 8100 --config fakes/example_config.json
+
+and point the chatbot at it with the variables printed on startup (AZURE_OPENAI_ENDPOINT,
+MAPS_ENDPOINT and fake keys), so the usual code paths run unchanged.
+
+Each backend (chat, maps, weather) is configured with a latency distribution, an
+error rate (500s), a throttle rate (429s with Retry-After) and scripted responses
+matched by regular expression against the request. Requests without a matching
+script get a plausible default: the chat backend recognizes the chatbot's own
+prompts and answers them the way the model would.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Optional
+from urllib.parse import parse_qs
+
+from src.agents.weather.weather_classifier import WeatherRuleClassifier
+from src.clients.weather import WeatherType
+
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "normal", "lognormal")
+
+PLACE_PATTERN = re.compile(r"\b([A-Z][a-zA-Z.]+(?: [A-Z][a-zA-Z.]+)*), ?([A-Z][a-zA-Z]+(?: [A-Z][a-zA-Z]+)*)\b")
+
+
+class LatencyModel:
+    """
+    Latency distribution of a backend, in milliseconds.
+
+    fixed: ms. uniform: min_ms to max_ms. normal: mean_ms and stddev_ms.
+    lognormal: median_ms and sigma (the long tail seen on LLM calls).
+    """
+    def __init__(self, distribution: str = "fixed", **params: float):
+        if distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: received {distribution}, "
+                             f"expected one of {LATENCY_DISTRIBUTIONS}")
+
+        self.distribution = distribution
+        self.params = params
+
+    def sample_ms(self, rng: random.Random) -> float:
+        params = self.params
+        if self.distribution == "fixed":
+            latency = params.get("ms", 0)
+        elif self.distribution == "uniform":
+            latency = rng.uniform(params.get("min_ms", 0), params.get("max_ms", 0))
+        elif self.distribution == "normal":
+            latency = rng.gauss(params.get("mean_ms", 0), params.get("stddev_ms", 0))
+        else:
+            latency = params.get("median_ms", 0) * math.exp(rng.gauss(0, params.get("sigma", 0.5)))
+
+        return max(latency, 0)
+
+
+class BackendConfig:
+    """Latency, fault injection and scripted responses of one backend."""
+    def __init__(self,
+                 latency: Optional[dict] = None,
+                 error_rate: float = 0.0,
+                 throttle_rate: float = 0.0,
+                 retry_after: float = 1.0,
+                 responses: Optional[list[dict]] = None):
+        self.latency = LatencyModel(**(latency or {}))
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.responses = [(re.compile(response["match"], re.IGNORECASE), response) for response in responses or []]
+
+    def scripted(self, text: str) -> dict | None:
+        """Returns the first scripted response whose pattern matches text."""
+        for pattern, response in self.responses:
+            if pattern.search(text):
+                return response
+
+        return None
+
+
+class FakeError(Exception):
+    def __init__(self, status: int, message: str, headers: Optional[dict[str, str]] = None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.headers = headers or {}
+
+
+def _fake_coordinates(query: str) -> tuple[float, float]:
+    """Stable coordinates within the continental US for places without a script."""
+    digest = hashlib.sha256(query.lower().encode("utf-8")).digest()
+    return 25 + digest[0] / 255 * 23, -124 + digest[1] / 255 * 57
+
+
+class FakeBackend:
+    """ASGI application faking the chat completions, Maps search and Maps weather APIs."""
+    def __init__(self,
+                 chat: Optional[BackendConfig] = None,
+                 maps: Optional[BackendConfig] = None,
+                 weather: Optional[BackendConfig] = None,
+                 seed: Optional[int] = None,
+                 sleep: Callable[[float], Awaitable[None]] = asyncio.sleep):
+        self.backends = {
+            "chat": chat if chat is not None else BackendConfig(),
+            "maps": maps if maps is not None else BackendConfig(),
+            "weather": weather if weather is not None else BackendConfig(),
+        }
+        self._rng = random.Random(seed)
+        self._sleep = sleep
+        self._classifier = WeatherRuleClassifier()
+        self._lock = threading.Lock()
+        self.requests = {name: 0 for name in self.backends}
+        self.errors = {name: 0 for name in self.backends}
+        self.throttled = {name: 0 for name in self.backends}
+
+    @classmethod
+    def from_config(cls, config: dict) -> "FakeBackend":
+        """Creates the backend from a dict like fakes/example_config.json."""
+        return cls(**{name: BackendConfig(**config.get(name, {})) for name in ("chat", "maps", "weather")},
+                   seed=config.get("seed"))
+
+    @classmethod
+    def from_file(cls, path: str) -> "FakeBackend":
+        with open(path) as config_file:
+            return cls.from_config(json.load(config_file))
+
+    async def __call__(self, scope: dict, receive: Callable[[], Awaitable[dict]],
+                       send: Callable[[dict], Awaitable[None]]):
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                await send({"type": f"{message['type']}.complete"})
+                if message["type"] == "lifespan.shutdown":
+                    return
+
+        if scope["type"] != "http":
+            return
+
+        body = b""
+        more_body = True
+        while more_body:
+            message = await receive()
+            body += message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+        path = scope["path"]
+        query = {key: values[0] for key, values in parse_qs(scope.get("query_string", b"").decode()).items()}
+
+        try:
+            if scope["method"] == "POST" and re.fullmatch(r"/openai/deployments/[^/]+/chat/completions", path):
+                await self._chat(json.loads(body or b"{}"), send)
+            elif scope["method"] == "GET" and path == "/search/address/json":
+                await self._respond(send, 200, await self._search_address(query.get("query", "")))
+            elif scope["method"] == "GET" and path.startswith("/weather/"):
+                await self._respond(send, 200, await self._weather(path, query.get("query", "")))
+            elif scope["method"] == "GET" and path == "/stats":
+                await self._respond(send, 200, self.stats())
+            else:
+                await self._respond(send, 404, {"error": {"code": "NotFound", "message": f"{path} not found"}})
+        except FakeError as error:
+            await self._respond(send, error.status, {"error": {"code": str(error.status), "message": error.message}},
+                                error.headers)
+
+    async def _simulate(self, backend: str) -> BackendConfig:
+        """Counts the request, waits for the backend's latency and injects throttling and errors."""
+        config = self.backends[backend]
+        with self._lock:
+            self.requests[backend] += 1
+            latency_ms = config.latency.sample_ms(self._rng)
+            fault = self._rng.random()
+
+        if fault < config.throttle_rate:
+            with self._lock:
+                self.throttled[backend] += 1
+            raise FakeError(429, "Rate limit exceeded", {"Retry-After": str(config.retry_after)})
+
+        await self._sleep(latency_ms / 1000)
+
+        if fault < config.throttle_rate + config.error_rate:
+            with self._lock:
+                self.errors[backend] += 1
+            raise FakeError(500, "Injected server error")
+
+        return config
+
+    async def _chat(self, request: dict, send):
+        config = await self._simulate("chat")
+
+        messages = request.get("messages", [])
+        prompt = "\n".join(str(message.get("content", "")) for message in messages)
+        scripted = config.scripted(prompt)
+        content = scripted["content"] if scripted is not None else self._default_reply(messages)
+
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        created = int(time.time())
+        model = request.get("model", "fake")
+
+        if not request.get("stream"):
+            prompt_tokens = math.ceil(len(prompt) / 4)
+            completion_tokens = math.ceil(len(content) / 4)
+            await self._respond(send, 200, {
+                "id": completion_id, "object": "chat.completion", "created": created, "model": model,
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": content}}],
+                "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                          "total_tokens": prompt_tokens + completion_tokens},
+            })
+            return
+
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": [(b"content-type", b"text/event-stream")]})
+        for chunk in re.findall(r"\S+\s*", content) or [""]:
+            event = {"id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                     "choices": [{"index": 0, "delta": {"content": chunk}, "finish_reason": None}]}
+            await send({"type": "http.response.body", "body": f"data: {json.dumps(event)}\n\n".encode(),
+                        "more_body": True})
+        await send({"type": "http.response.body", "body": b"data: [DONE]\n\n"})
+
+    def _default_reply(self, messages: list[dict]) -> str:
+        """Answers the chatbot's prompts the way the model would, from what the user said."""
+        prompt = str(messages[0].get("content", "")) if messages else ""
+        user_lines = [line[len("user: "):] for line in prompt.splitlines() if line.startswith("user: ")]
+        user_lines += [str(message.get("content", "")) for message in messages[1:] if message.get("role") == "user"]
+
+        places = [match.group(0) for line in user_lines for match in PLACE_PATTERN.finditer(line)]
+        place = places[-1] if places else None
+        classification = self._classifier.classify(" ".join(user_lines[-1:]))
+        category = (classification.weather_type or WeatherType.CURRENT_CONDITIONS).name
+
+        if "extract two things" in prompt:
+            return json.dumps({"location": place or "LOCATION UNKNOWN", "weather_category": category})
+        if "extract location information" in prompt:
+            return place or "LOCATION UNKNOWN"
+        if "changed the geographical location" in prompt:
+            known = re.search(r"location known so far is: (.*)", prompt)
+            unchanged = place is None or (known is not None and place.lower() in known.group(1).lower())
+            return "LOCATION UNCHANGED" if unchanged else "LOCATION CHANGED"
+        if "classify it into one of the following" in prompt:
+            return category
+        if "summarizing a conversation" in prompt:
+            return f"The user asked about the weather{f' in {place}' if place else ''}."
+        if "provide their geographical location" in prompt:
+            return "Sure, I can help with that. Which city and state are you in?"
+
+        return "It is mostly sunny with a high of 21C and a light breeze from the west. " \
+               "There is a 10 percent chance of showers later in the day."
+
+    async def _search_address(self, query: str) -> dict:
+        config = await self._simulate("maps")
+
+        scripted = config.scripted(query)
+        if scripted is not None:
+            results = scripted.get("results", [])
+        else:
+            lat, lon = _fake_coordinates(query)
+            results = [{"address": query, "lat": lat, "lon": lon, "score": 0.95}]
+
+        return {
+            "summary": {"query": query, "queryType": "NON_NEAR", "numResults": len(results), "totalResults": len(results),
+                        "offset": 0, "fuzzyLevel": 1},
+            "results": [{
+                "type": "Geography",
+                "id": f"fake-{index}",
+                "score": result.get("score", 0.95),
+                "entityType": "Municipality",
+                "address": {"freeformAddress": result["address"], "country": result.get("country", "United States"),
+                            "countryCode": result.get("country_code", "US")},
+                "position": {"lat": result["lat"], "lon": result["lon"]},
+                "viewport": {"topLeftPoint": {"lat": result["lat"] + 0.1, "lon": result["lon"] - 0.1},
+                             "btmRightPoint": {"lat": result["lat"] - 0.1, "lon": result["lon"] + 0.1}},
+            } for index, result in enumerate(results)],
+        }
+
+    async def _weather(self, path: str, query: str) -> dict:
+        config = await self._simulate("weather")
+
+        scripted = config.scripted(f"{path}?query={query}")
+        if scripted is not None:
+            return scripted["body"]
+
+        weather_path = path[len("/weather/"):-len("json")]
+        if weather_path == WeatherType.CURRENT_CONDITIONS.value:
+            return _current_conditions()
+        if weather_path == WeatherType.DAILY_FORECAST.value:
+            return _daily_forecast()
+        if weather_path == WeatherType.SEVERE_ALERTS.value:
+            return {"results": []}
+
+        raise FakeError(404, f"Unknown weather endpoint {path}")
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        with self._lock:
+            return {name: {"requests": self.requests[name], "errors": self.errors[name],
+                           "throttled": self.throttled[name]} for name in self.backends}
+
+    @staticmethod
+    async def _respond(send, status: int, payload: Any, headers: Optional[dict[str, str]] = None):
+        body = json.dumps(payload).encode("utf-8")
+        raw_headers = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+        raw_headers += [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()]
+
+        await send({"type": "http.response.start", "status": status, "headers": raw_headers})
+        await send({"type": "http.response.body", "body": body})
+
+
+def _current_conditions() -> dict:
+    return {"results": [{
+        "dateTime": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "phrase": "Mostly sunny",
+        "temperature": {"value": 21.0, "unit": "C"},
+        "realFeelTemperature": {"value": 22.0, "unit": "C"},
+        "relativeHumidity": 48,
+        "wind": {"direction": {"localizedDescription": "W"}, "speed": {"value": 11.0, "unit": "km/h"}},
+        "windGust": {"speed": {"value": 19.0, "unit": "km/h"}},
+        "uvIndexPhrase": "Moderate",
+        "cloudCover": 20,
+        "precipitationSummary": {"pastHour": {"value": 0.0, "unit": "mm"},
+                                 "past24Hours": {"value": 0.0, "unit": "mm"}},
+    }]}
+
+
+def _daily_forecast(days: int = 5) -> dict:
+    today = date.today()
+    return {
+        "summary": {"phrase": "Pleasant weather through the weekend"},
+        "forecasts": [{
+            "date": f"{today + timedelta(days=day)}T07:00:00+00:00",
+            "temperature": {"minimum": {"value": 11.0 + day, "unit": "C"}, "maximum": {"value": 21.0 + day, "unit": "C"}},
+            "hoursOfSun": 9.5,
+            "day": {"iconPhrase": "Partly sunny", "hasPrecipitation": False, "precipitationProbability": 10,
+                    "thunderstormProbability": 0, "wind": {"speed": {"value": 11.0, "unit": "km/h"}}},
+            "night": {"iconPhrase": "Clear", "hasPrecipitation": False, "precipitationProbability": 5,
+                      "thunderstormProbability": 0, "wind": {"speed": {"value": 6.0, "unit": "km/h"}}},
+        } for day in range(days)],
+    }
+
+
+def fake_environment(base_url: str) -> dict[str, str]:
+    """Environment variables that point the chatbot's clients at a fake backend serving base_url."""
+    return {
+        "AZURE_OPENAI_ENDPOINT": base_url,
+        "AZURE_OPENAI_API_KEY": "fake",
+        "OPENAI_API_VERSION": "2024-02-01",
+        "OPENAI_DEPLOYMENT_NAME": "fake-deployment",
+        "MAPS_ENDPOINT": base_url,
+        "MAPS_API_KEY": "fake",
+    }
+
+
+class BackgroundServer:
+    """Runs an ASGI app with uvicorn on a background thread, for in-process benchmarks and load tests."""
+    def __init__(self, app, host: str = "127.0.0.1", port: int = 0):
+        import uvicorn
+
+        self._server = uvicorn.Server(uvicorn.Config(app, host=host, port=port, log_level="warning"))
+        self._thread = threading.Thread(target=self._server.run, name="FakeBackend", daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.servers[0].sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "BackgroundServer":
+        self._thread.start()
+        while not self._server.started:
+            if not self._thread.is_alive():
+                raise RuntimeError("The fake backend failed to start")
+            time.sleep(0.01)
+
+        return self
+
+    def stop(self):
+        self._server.should_exit = True
+        self._thread.join()
+
+    def __enter__(self) -> "BackgroundServer":
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--config", help="JSON file with the latency, faults and scripts of each backend")
+    args = parser.parse_args()
+
+    app = FakeBackend.from_file(args.config) if args.config else FakeBackend()
+
+    print("Point the chatbot at the fakes with:")
+    for name, value in fake_environment(f"http://{args.host}:{args.port}").items():
+        print(f"    {name}={value}")
+
+    import uvicorn
+    uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+import json
+import os
+import random
+import unittest
+from unittest import mock
+
+from openai import AzureOpenAI
+
+from fakes.server import BackendConfig, BackgroundServer, FakeBackend, LatencyModel, fake_environment
+from src.clients.geocoding import Geocoder
+from src.clients.weather import WeatherClient, WeatherType
+
+
+async def request(app: FakeBackend, method: str, path: str, query: str = '',
+                  body: dict | None = None) -> tuple[int, dict, list[bytes]]:
+    messages = [{'type': 'http.request', 'body': json.dumps(body).encode() if body is not None else b''}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    await app({'type': 'http', 'method': method, 'path': path, 'query_string': query.encode()}, receive, send)
+
+    headers = {name.decode(): value.decode() for name, value in sent[0]['headers']}
+    return sent[0]['status'], headers, [message['body'] for message in sent[1:]]
+
+
+def chat_body(prompt: str, **params) -> dict:
+    return {'model': 'fake-deployment', 'messages': [{'role': 'system', 'content': prompt}], **params}
+
+
+class TestLatencyModel(unittest.TestCase):
+
+    def test_distributions(self):
+        rng = random.Random(1)
+
+        self.assertEqual(50, LatencyModel('fixed', ms=50).sample_ms(rng))
+        self.assertTrue(all(10 <= LatencyModel('uniform', min_ms=10, max_ms=20).sample_ms(rng) <= 20
+                            for _ in range(100)))
+        self.assertTrue(all(LatencyModel('normal', mean_ms=5, stddev_ms=50).sample_ms(rng) >= 0 for _ in range(100)))
+        samples = sorted(LatencyModel('lognormal', median_ms=100, sigma=0.5).sample_ms(rng) for _ in range(1001))
+        self.assertAlmostEqual(100, samples[500], delta=15)
+
+    def test_unknown_distribution(self):
+        with self.assertRaises(ValueError):
+            LatencyModel('pareto')
+
+
+class TestFakeBackend(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.sleeps = []
+
+        async def sleep(seconds):
+            self.sleeps.append(seconds)
+
+        self.sleep = sleep
+
+    async def test_chat_answers_the_chatbot_prompts(self):
+        app = FakeBackend(sleep=self.sleep)
+        transcript = 'user: Hi\nassistant: Where are you?\nuser: I live in Seattle, Washington. Any rain tomorrow?'
+
+        _, _, body = await request(app, 'POST', '/openai/deployments/fake/chat/completions', body=chat_body(
+            f'Your task is to extract location information from the conversation with the user.\n{transcript}'))
+        completion = json.loads(body[0])
+        self.assertEqual('Seattle, Washington', completion['choices'][0]['message']['content'])
+        self.assertGreater(completion['usage']['prompt_tokens'], 0)
+
+        _, _, body = await request(app, 'POST', '/openai/deployments/fake/chat/completions', body=chat_body(
+            f'Your task is to extract two things from the conversation with the user\n{transcript}'))
+        self.assertEqual({'location': 'Seattle, Washington', 'weather_category': 'DAILY_FORECAST'},
+                         json.loads(json.loads(body[0])['choices'][0]['message']['content']))
+
+    async def test_chat_stream(self):
+        app = FakeBackend(chat=BackendConfig(responses=[{'match': 'weather', 'content': 'Sunny and warm'}]),
+                          sleep=self.sleep)
+
+        status, headers, body = await request(app, 'POST', '/openai/deployments/fake/chat/completions',
+                                              body=chat_body('What is the weather?', stream=True))
+
+        self.assertEqual(200, status)
+        self.assertEqual('text/event-stream', headers['content-type'])
+        events = [chunk.decode()[len('data: '):].strip() for chunk in body]
+        self.assertEqual('[DONE]', events[-1])
+        self.assertEqual('Sunny and warm',
+                         ''.join(json.loads(event)['choices'][0]['delta']['content'] for event in events[:-1]))
+
+    async def test_search_address_scripted_and_default(self):
+        app = FakeBackend(maps=BackendConfig(responses=[
+            {'match': '^nowhere', 'results': []},
+            {'match': 'seattle', 'results': [{'address': 'Seattle, WA', 'lat': 47.6, 'lon': -122.3}]}]),
+            sleep=self.sleep)
+
+        _, _, body = await request(app, 'GET', '/search/address/json', 'api-version=1.0&query=Seattle')
+        self.assertEqual({'lat': 47.6, 'lon': -122.3}, json.loads(body[0])['results'][0]['position'])
+
+        _, _, body = await request(app, 'GET', '/search/address/json', 'query=Nowhere')
+        self.assertEqual([], json.loads(body[0])['results'])
+
+        _, _, first = await request(app, 'GET', '/search/address/json', 'query=Portland, Oregon')
+        _, _, second = await request(app, 'GET', '/search/address/json', 'query=portland, oregon')
+        self.assertEqual(json.loads(first[0])['results'][0]['position'],
+                         json.loads(second[0])['results'][0]['position'])
+
+    async def test_weather_endpoints(self):
+        app = FakeBackend(sleep=self.sleep)
+
+        for weather_type, field in ((WeatherType.CURRENT_CONDITIONS, 'results'),
+                                    (WeatherType.DAILY_FORECAST, 'forecasts'),
+                                    (WeatherType.SEVERE_ALERTS, 'results')):
+            status, _, body = await request(app, 'GET', f'/weather/{weather_type.value}json', 'query=47.6, -122.3')
+            self.assertEqual(200, status)
+            self.assertIn(field, json.loads(body[0]))
+
+        status, _, _ = await request(app, 'GET', '/weather/hourly/json')
+        self.assertEqual(404, status)
+
+    async def test_latency_errors_and_throttling(self):
+        app = FakeBackend(weather=BackendConfig(latency={'distribution': 'fixed', 'ms': 40},
+                                                error_rate=0.25, throttle_rate=0.25, retry_after=2),
+                          seed=7, sleep=self.sleep)
+
+        statuses = []
+        for _ in range(200):
+            status, headers, _ = await request(app, 'GET', '/weather/currentConditions/json')
+            statuses.append(status)
+            if status == 429:
+                self.assertEqual('2', headers['retry-after'])
+
+        stats = app.stats()['weather']
+        self.assertEqual(200, stats['requests'])
+        self.assertEqual(statuses.count(429), stats['throttled'])
+        self.assertEqual(statuses.count(500), stats['errors'])
+        self.assertTrue(30 < stats['throttled'] < 70 and 30 < stats['errors'] < 70)
+        # Throttled requests are refused straight away, the rest take the backend's latency
+        self.assertEqual([0.04] * (200 - stats['throttled']), self.sleeps)
+
+    def test_from_config(self):
+        app = FakeBackend.from_config({'seed': 1, 'chat': {'latency': {'distribution': 'uniform', 'min_ms': 1,
+                                                                       'max_ms': 2}, 'error_rate': 0.1}})
+
+        self.assertEqual('uniform', app.backends['chat'].latency.distribution)
+        self.assertEqual(0.1, app.backends['chat'].error_rate)
+        self.assertEqual('fixed', app.backends['maps'].latency.distribution)
+
+
+class TestClientsAgainstFakeBackend(unittest.TestCase):
+    """The chatbot's real clients, pointed at the fake over HTTP."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = BackgroundServer(FakeBackend(maps=BackendConfig(responses=[
+            {'match': 'seattle', 'results': [{'address': 'Seattle, WA', 'lat': 47.6, 'lon': -122.3}]}]))).start()
+        cls.environment = mock.patch.dict(os.environ, fake_environment(cls.server.base_url))
+        cls.environment.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.environment.stop()
+        cls.server.stop()
+
+    def test_chat_completions(self):
+        client = AzureOpenAI(azure_endpoint=os.environ['AZURE_OPENAI_ENDPOINT'])
+
+        response = client.chat.completions.create(
+            model=os.environ['OPENAI_DEPLOYMENT_NAME'], temperature=0,
+            messages=[{'role': 'system', 'content': 'Your task is to extract location information\n'
+                                                    'user: Paris, France please'}])
+
+        self.assertEqual('Paris, France', response.choices[0].message.content)
+
+    def test_geocoder(self):
+        result = Geocoder().geocode('Seattle')
+
+        self.assertEqual((47.6, -122.3), (result.lat, result.lon))
+        self.assertEqual('United States, Seattle, WA', result.description)
+
+    def test_weather_client(self):
+        client = WeatherClient()
+
+        forecast = json.loads(client.get_weather(47.6, -122.3, WeatherType.DAILY_FORECAST))
+
+        self.assertEqual(5, len(forecast['forecasts']))
+        client.close()
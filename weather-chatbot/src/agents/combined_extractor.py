@@ -0,0 +1,158 @@
+import json
+import logging
+import os
+
+from src.agents.location.location_extractor import LocationExtractor, location_unknown
+from src.agents.weather.weather_classifier import WeatherRuleClassifier
+from src.agents.weather.weather_extractor import UNKNOWN_CATEGORY, WeatherExtractor
+from src.clients.geocoding import Geocoder
+from src.clients.llm_interface import get_async_llm_client, get_llm_client
+from src.clients.weather import WeatherType
+from src.context import Context
+from src.deadline import skip_optional
+
+
+logger = logging.getLogger(__name__)
+
+
+class CombinedExtractor:
+    """
+    Extracts the location and the weather category with a single LLM call.
+
+    The model answers with a JSON object holding both, and the context is updated the
+    same way LocationExtractor and WeatherExtractor would update it. When the weather
+    fast path resolves the category on its own, only the location is extracted. The
+    location is always extracted from the full history, so LOCATION_EXTRACTION_MODE
+    doesn't apply. If the model's answer isn't valid JSON, the separate extractors are
+    used for that turn. Once both are known, extracting them again is skipped when the
+    turn's budget is nearly spent.
+    """
+    def __init__(self, geocoder: Geocoder | None = None, classifier: WeatherRuleClassifier | None = None):
+        self.location_extractor = LocationExtractor(geocoder=geocoder, incremental=False)
+        self.weather_extractor = WeatherExtractor(classifier=classifier)
+
+    @property
+    def geocoder(self) -> Geocoder:
+        return self.location_extractor.geocoder
+
+    def extract(self, context: Context):
+        if self.weather_extractor._fast_path(context):
+            self.location_extractor.extract(context)
+            return
+
+        if self._keep_extraction(context):
+            return
+
+        messages = self._build_messages(context)
+        if messages is None:
+            return
+
+        response = get_llm_client(agent="CombinedExtractor").chat.completions.create(
+            temperature=0,
+            model=os.environ["OPENAI_DEPLOYMENT_NAME"],
+            response_format={"type": "json_object"},
+            messages=messages)
+
+        extraction = self._parse(response.choices[0].message.content)
+        if extraction is None:
+            self.location_extractor.extract(context)
+            self.weather_extractor.extract(context)
+            return
+
+        location_description, weather_category = extraction
+        if location_description is not None:
+            LocationExtractor._apply(self.geocoder.geocode(location_description), location_description, context)
+        WeatherExtractor._apply(weather_category, context)
+
+    async def extract_async(self, context: Context):
+        if self.weather_extractor._fast_path(context):
+            await self.location_extractor.extract_async(context)
+            return
+
+        if self._keep_extraction(context):
+            return
+
+        messages = self._build_messages(context)
+        if messages is None:
+            return
+
+        response = await get_async_llm_client(agent="CombinedExtractor").chat.completions.create(
+            temperature=0,
+            model=os.environ["OPENAI_DEPLOYMENT_NAME"],
+            response_format={"type": "json_object"},
+            messages=messages)
+
+        extraction = self._parse(response.choices[0].message.content)
+        if extraction is None:
+            await self.location_extractor.extract_async(context)
+            await self.weather_extractor.extract_async(context)
+            return
+
+        location_description, weather_category = extraction
+        if location_description is not None:
+            LocationExtractor._apply(
+                await self.geocoder.geocode_async(location_description), location_description, context)
+        WeatherExtractor._apply(weather_category, context)
+
+    @staticmethod
+    def _keep_extraction(context: Context) -> bool:
+        return context.location is not None and context.weather_category is not None \
+            and skip_optional("re-extraction")
+
+    @staticmethod
+    def _parse(response: str | None) -> tuple[str | None, str] | None:
+        """Returns the location description (None if unknown) and weather category, or None if malformed."""
+        try:
+            extraction = json.loads(response or "")
+        except ValueError:
+            logger.warning(f"Combined extraction returned invalid JSON, using the separate extractors: {response}")
+            return None
+
+        if not isinstance(extraction, dict):
+            logger.warning(f"Combined extraction returned unexpected JSON, using the separate extractors: {response}")
+            return None
+
+        location_description = str(extraction.get("location") or "").strip()
+        if location_description == "" or location_unknown in location_description.upper():
+            location_description = None
+
+        return location_description, str(extraction.get("weather_category") or UNKNOWN_CATEGORY)
+
+    @staticmethod
+    def _build_messages(context: Context) -> list[dict] | None:
+        message_history = context.get_messages()
+        if len(message_history) == 0:
+            return None
+
+        flattened_history = context.transcript.render()
+        # The category follows the latest question, as in WeatherExtractor
+        recent_messages = context.transcript.render(start=-2)
+
+        system_prompt = f"""\
+Your task is to extract two things from the conversation with the user: the geographical location
+they are interested in and the type of weather question they are asking.
+Conversation transcript:
+```
+{flattened_history}
+```
+
+Most recent messages:
+```
+{recent_messages}
+```
+
+Location: you need to know country, city, state or province, street address, and zip code.
+The user can ask multiple questions, make sure you extract the latest geographical location of interest.
+If it is a well-known city, add its country to the result.
+Only list geographical attributes that are present in the conversation, as comma separated values on one line.
+If there is no geographical information in the conversation, use '{location_unknown}'.
+
+Weather category: based on the most recent messages, classify the user's question or questions into one of
+the following categories: {[enum.name for enum in WeatherType]}. If it's unclear what category to choose
+or the user hasn't asked any questions about the weather use '{UNKNOWN_CATEGORY}'.
+
+Reply with a JSON object only, of the form:
+{{"location": "<location>", "weather_category": "<category>"}}
+"""
+
+        return [{"role": "system", "content": system_prompt}]
@@ -1,20 +1,69 @@
+from typing import Iterator
+
+from src.agents.combined_extractor import CombinedExtractor
 from src.agents.location.location_assistant import LocationAssistant
 from src.agents.location.location_extractor import LocationExtractor
+from src.clients.weather_prefetch import WeatherPrefetcher, get_weather_prefetcher
 from src.context import Context
+from src.tracing import traced
 
 
 class LocationAgent:
-    """Identifies user's location."""
+    """
+    Identifies user's location.
 
-    def invoke(self, context: Context) -> str | None:
-        extractor = LocationExtractor()
+    The agent keeps no conversation state (that lives in the Context), so one instance
+    can serve many sessions at once.
+    """
 
-        extractor.extract(context)
+    def __init__(self,
+                 extractor: LocationExtractor | CombinedExtractor | None = None,
+                 assistant: LocationAssistant | None = None,
+                 prefetcher: WeatherPrefetcher | None = None):
+        """Uses a new LocationExtractor unless given another extractor, e.g. one that also extracts the weather category."""
+        self.extractor = extractor if extractor is not None else LocationExtractor()
+        self.assistant = assistant if assistant is not None else LocationAssistant()
+        self.prefetcher = prefetcher if prefetcher is not None else get_weather_prefetcher()
+
+    @traced("LocationAgent.invoke")
+    def invoke(self, context: Context) -> str | None:
+        self._extract(context)
 
         if context.location is not None:
             return None
 
-        assistant = LocationAssistant()
-        reply = assistant.invoke(context.get_messages())
+        reply = self.assistant.invoke(context.get_messages())
 
         return reply
+
+    @traced("LocationAgent.stream")
+    def stream(self, context: Context) -> Iterator[str] | None:
+        """Same as invoke, but the reply is yielded in chunks as it is generated."""
+        self._extract(context)
+
+        if context.location is not None:
+            return None
+
+        return self.assistant.stream(context.get_messages())
+
+    def _extract(self, context: Context):
+        previous_location = context.location
+        self.extractor.extract(context)
+
+        # The weather lookup follows once a location is known, so start it early
+        if context.location is not None and context.location != previous_location:
+            self.prefetcher.prefetch(*context.location)
+
+    @traced("LocationAgent.extract")
+    async def extract_async(self, context: Context):
+        """Extract step of invoke, run on its own so the orchestrator can overlap it with other agents."""
+        previous_location = context.location
+        await self.extractor.extract_async(context)
+
+        if context.location is not None and context.location != previous_location:
+            await self.prefetcher.prefetch_async(*context.location)
+
+    @traced("LocationAgent.reply")
+    async def reply_async(self, context: Context) -> str:
+        """Reply step of invoke, asking the user for their location."""
+        return await self.assistant.invoke_async(context.get_messages())
@@ -1,4 +1,6 @@
-from openai import AzureOpenAI
+from typing import Iterator
+
+from src.clients.llm_interface import get_async_llm_client, get_llm_client, iter_content
 import os
 
 
@@ -6,6 +8,39 @@ class LocationAssistant:
     """Class for asking user about their location."""
     def invoke(self, message_history: list[dict]) -> str:
 
+        response = get_llm_client(agent="LocationAssistant").chat.completions.create(
+            temperature=0,
+            model=os.environ["OPENAI_DEPLOYMENT_NAME"],
+            messages=self._build_messages(message_history))
+
+        result = response.choices[0].message.content
+
+        return result
+
+    def stream(self, message_history: list[dict]) -> Iterator[str]:
+        """Same as invoke, but yields the reply in chunks as they are generated."""
+        response = get_llm_client(agent="LocationAssistant").chat.completions.create(
+            temperature=0,
+            model=os.environ["OPENAI_DEPLOYMENT_NAME"],
+            messages=self._build_messages(message_history),
+            stream=True)
+
+        return iter_content(response)
+
+    async def invoke_async(self, message_history: list[dict]) -> str:
+
+        response = await get_async_llm_client(agent="LocationAssistant").chat.completions.create(
+            temperature=0,
+            model=os.environ["OPENAI_DEPLOYMENT_NAME"],
+            messages=self._build_messages(message_history))
+
+        result = response.choices[0].message.content
+
+        return result
+
+    @staticmethod
+    def _build_messages(message_history: list[dict]) -> list[dict]:
+
         system_prompt = """\
 You are a chatbot that can answer questions about weather at a location provided by the user.
 Talk to the user and ask them to provide their geographical location.
@@ -22,11 +57,4 @@ You can use only what the user has provided in the chat.
                 "content": system_prompt,
             }] + message_history
 
-        response = AzureOpenAI().chat.completions.create(
-            temperature=0,
-            model=os.environ["OPENAI_DEPLOYMENT_NAME"],
-            messages=messages)
-
-        result = response.choices[0].message.content
-
-        return result
+        return messages
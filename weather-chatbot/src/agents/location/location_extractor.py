@@ -1,29 +1,128 @@
 import os
-from azure.core.credentials import AzureKeyCredential
-from azure.maps.search import MapsSearchClient
-from openai import AzureOpenAI
 
+from src.clients.geocoding import GeocodeResult, Geocoder, get_geocoder
+from src.clients.llm_interface import get_async_llm_client, get_llm_client
 from src.context import Context
+from src.deadline import skip_optional
 
 
-geo_score_threshold = 0.7
 location_unknown = "LOCATION UNKNOWN"
+location_unchanged = "LOCATION UNCHANGED"
 
 
 class LocationExtractor:
     """Class for extracting location information from message history."""
-    def __init__(self):
-        """Initialize the search client for looking up the address of the latest message"""
-        credential = AzureKeyCredential(os.environ["MAPS_API_KEY"])
+    def __init__(self, geocoder: Geocoder | None = None, incremental: bool | None = None):
+        """
+        Use the shared geocoder for looking up the address of the latest message.
 
-        self.search_client = MapsSearchClient(credential=credential)
+        In incremental mode, once a location is resolved only the user messages sent since
+        are checked for a change of location, and the full history is only extracted again
+        when one is detected. Defaults to LOCATION_EXTRACTION_MODE=incremental.
+
+        Once a location is resolved, extracting it again is skipped when the turn's budget
+        is nearly spent, keeping the location already in the context.
+        """
+        self.geocoder = geocoder or get_geocoder()
+        self.incremental = incremental if incremental is not None \
+            else (os.environ.get("LOCATION_EXTRACTION_MODE") or "full").lower() == "incremental"
 
     def extract(self, context: Context):
+        if context.location is not None and skip_optional("location re-extraction"):
+            return
+
+        if self._is_settled(context):
+            new_messages = self._new_user_messages(context)
+            if len(new_messages) == 0:
+                return
+
+            response = self._complete(self._build_incremental_messages(context.location_summary, new_messages))
+            if self._is_unchanged(response, context):
+                return
+
+        messages = self._build_messages(context)
+        if messages is None:
+            return None
+
+        location_description = self._complete(messages)
+
+        if location_unknown in location_description.upper():
+            self._mark_checked(context)
+            return
+
+        self._apply(self.geocoder.geocode(location_description), location_description, context)
+
+    async def extract_async(self, context: Context):
+        if context.location is not None and skip_optional("location re-extraction"):
+            return
+
+        if self._is_settled(context):
+            new_messages = self._new_user_messages(context)
+            if len(new_messages) == 0:
+                return
+
+            response = await self._complete_async(
+                self._build_incremental_messages(context.location_summary, new_messages))
+            if self._is_unchanged(response, context):
+                return
+
+        messages = self._build_messages(context)
+        if messages is None:
+            return None
+
+        location_description = await self._complete_async(messages)
+
+        if location_unknown in location_description.upper():
+            self._mark_checked(context)
+            return
+
+        self._apply(await self.geocoder.geocode_async(location_description), location_description, context)
+
+    @staticmethod
+    def _complete(messages: list[dict]) -> str:
+        response = get_llm_client(agent="LocationExtractor").chat.completions.create(
+            temperature=0,
+            model=os.environ["OPENAI_DEPLOYMENT_NAME"],
+            messages=messages)
+
+        return response.choices[0].message.content or ""
+
+    @staticmethod
+    async def _complete_async(messages: list[dict]) -> str:
+        response = await get_async_llm_client(agent="LocationExtractor").chat.completions.create(
+            temperature=0,
+            model=os.environ["OPENAI_DEPLOYMENT_NAME"],
+            messages=messages)
+
+        return response.choices[0].message.content or ""
+
+    def _is_settled(self, context: Context) -> bool:
+        return self.incremental and context.location is not None and context.location_summary is not None
+
+    @staticmethod
+    def _new_user_messages(context: Context) -> str:
+        return context.transcript.render(start=context.location_checked_upto, roles=["user"])
+
+    @staticmethod
+    def _is_unchanged(response: str, context: Context) -> bool:
+        if location_unchanged not in response.upper():
+            return False
+
+        LocationExtractor._mark_checked(context)
+        return True
+
+    @staticmethod
+    def _mark_checked(context: Context):
+        # The messages so far won't be checked again, whether or not a new location came out of them
+        context.location_checked_upto = len(context.get_messages())
+
+    @staticmethod
+    def _build_messages(context: Context) -> list[dict] | None:
         message_history = context.get_messages()
         if len(message_history) == 0:
             return None
 
-        flattened_history = "\n".join([f"{m['role']}: {m['content']}" for m in message_history])
+        flattened_history = context.transcript.render()
 
         system_prompt = f"""\
 Your task is to extract location information from the conversation with the user.
@@ -42,22 +141,29 @@ If there is no geographical information in the history, then print '{location_un
 Print the answer on one single line as comma separated values.
 """
 
-        messages = [{"role": "system", "content": system_prompt}]
-
-        response = AzureOpenAI().chat.completions.create(
-            temperature=0,
-            model=os.environ["OPENAI_DEPLOYMENT_NAME"],
-            messages=messages)
+        return [{"role": "system", "content": system_prompt}]
 
-        location_description = response.choices[0].message.content or ""
+    @staticmethod
+    def _build_incremental_messages(location_summary: str, flattened_messages: str) -> list[dict]:
 
-        if location_unknown in location_description.upper():
-            return
+        system_prompt = f"""\
+Your task is to detect whether the user changed the geographical location they are interested in.
+The location known so far is: {location_summary}
+Newest user messages:
+```
+{flattened_messages}
+```
 
-        search_results = self.search_client.search_address(location_description)
+If the newest messages do not mention a location, or only mention the location known so far, print '{location_unchanged}'.
+Otherwise print 'LOCATION CHANGED'.
+"""
 
-        results = [result for result in search_results.results if result.score > geo_score_threshold]
+        return [{"role": "system", "content": system_prompt}]
 
-        if len(results) > 0:
-            context.location = (results[0].position.lat, results[0].position.lon)
-            context.location_description = f"{results[0].address.country}, {results[0].address.freeform_address}"
+    @staticmethod
+    def _apply(result: GeocodeResult | None, location_description: str, context: Context):
+        if result is not None:
+            context.location = (result.lat, result.lon)
+            context.location_description = result.description
+            context.location_summary = location_description.strip()
+        LocationExtractor._mark_checked(context)
@@ -1,18 +1,53 @@
+from typing import Iterator
+
 from src.agents.weather.weather_assistant import WeatherAssistant
 from src.agents.weather.weather_extractor import WeatherExtractor
 from src.context import Context
+from src.tracing import traced
 
 
 class WeatherAgent:
-    """Answers weather questions."""
+    """
+    Answers weather questions.
+
+    Like LocationAgent, it keeps no conversation state and can serve many sessions at once.
+    """
 
+    def __init__(self, extractor: WeatherExtractor | None = None, assistant: WeatherAssistant | None = None):
+        self.extractor = extractor if extractor is not None else WeatherExtractor()
+        self.assistant = assistant if assistant is not None else WeatherAssistant()
+
+    @traced("WeatherAgent.invoke")
     def invoke(self, context: Context) -> str:
 
-        extractor = WeatherExtractor()
+        self.extractor.extract(context)
+
+        return self.reply(context)
+
+    @traced("WeatherAgent.stream")
+    def stream(self, context: Context) -> Iterator[str]:
+        """Same as invoke, but the reply is yielded in chunks as it is generated."""
+
+        self.extractor.extract(context)
+
+        return self.stream_reply(context)
+
+    @traced("WeatherAgent.reply")
+    def reply(self, context: Context) -> str:
+        """Reply step of invoke, for when the weather category was already extracted."""
+        return self.assistant.invoke(context)
 
-        extractor.extract(context)
+    @traced("WeatherAgent.stream_reply")
+    def stream_reply(self, context: Context) -> Iterator[str]:
+        """Reply step of stream, for when the weather category was already extracted."""
+        return self.assistant.stream(context)
 
-        assistant = WeatherAssistant()
-        reply = assistant.invoke(context)
+    @traced("WeatherAgent.extract")
+    async def extract_async(self, context: Context):
+        """Extract step of invoke, run on its own so the orchestrator can overlap it with other agents."""
+        await self.extractor.extract_async(context)
 
-        return reply
+    @traced("WeatherAgent.reply")
+    async def reply_async(self, context: Context) -> str:
+        """Reply step of invoke, fetching the weather and answering the user's question."""
+        return await self.assistant.invoke_async(context)
@@ -1,28 +1,88 @@
 import inspect
-from openai import AzureOpenAI
 import os
+from typing import Iterator
 
-from src.clients.weather import Weather, WeatherType
+from src.clients.weather import WeatherType
+from src.clients.weather_prefetch import WeatherPrefetcher, get_weather_prefetcher
+from src.clients.weather_projection import project_weather
+from src.clients.llm_interface import get_async_llm_client, get_llm_client, iter_content
 from src.context import Context
+from src.history import HistoryManager, get_history_manager
 
 
 class WeatherAssistant:
     """Class for answering weather questions."""
+    def __init__(self, history: HistoryManager | None = None, prefetcher: WeatherPrefetcher | None = None):
+        """Use the shared history manager to fit the conversation into the prompt, and the shared prefetcher for the weather"""
+        self.history = history if history is not None else get_history_manager()
+        self.prefetcher = prefetcher if prefetcher is not None else get_weather_prefetcher()
+
     def invoke(self, context: Context) -> str:
 
         message_history = context.get_messages()
 
+        if len(message_history) == 0:
+            return
+
+        response = get_llm_client(agent="WeatherAssistant").chat.completions.create(
+            temperature=0,
+            model=os.environ["OPENAI_DEPLOYMENT_NAME"],
+            messages=self._build_messages(context, self._get_weather(context), self.history.render(context)))
+
+        response = response.choices[0].message.content
+
+        return response
+
+    def stream(self, context: Context) -> Iterator[str]:
+        """Same as invoke, but yields the reply in chunks as they are generated."""
+
+        if len(context.get_messages()) == 0:
+            return iter(())
+
+        response = get_llm_client(agent="WeatherAssistant").chat.completions.create(
+            temperature=0,
+            model=os.environ["OPENAI_DEPLOYMENT_NAME"],
+            messages=self._build_messages(context, self._get_weather(context), self.history.render(context)),
+            stream=True)
+
+        return iter_content(response)
+
+    def _get_weather(self, context: Context):
+
+        if not context.weather_category:
+            return None
+
+        weather_data = self.prefetcher.\
+            get_weather(lat=context.location[0], lon=context.location[1], weather_type=context.weather_category)
+
+        return project_weather(weather_data, context.weather_category)
+
+    async def invoke_async(self, context: Context) -> str:
+
+        message_history = context.get_messages()
+
         if len(message_history) == 0:
             return
 
         weather_data = None
 
         if context.weather_category:
-            weather_client = Weather()
-            weather_data = weather_client.\
-                get_weather(lat=context.location[0], lon=context.location[1], weather_type=context.weather_category)
+            weather_data = project_weather(
+                await self.prefetcher.get_weather_async(
+                    lat=context.location[0], lon=context.location[1], weather_type=context.weather_category),
+                context.weather_category)
 
-        flattened_history = "\n".join([f"{m['role']}: {m['content']}" for m in message_history])
+        response = await get_async_llm_client(agent="WeatherAssistant").chat.completions.create(
+            temperature=0,
+            model=os.environ["OPENAI_DEPLOYMENT_NAME"],
+            messages=self._build_messages(context, weather_data, await self.history.render_async(context)))
+
+        response = response.choices[0].message.content
+
+        return response
+
+    @staticmethod
+    def _build_messages(context: Context, weather_data, flattened_history: str) -> list[dict]:
 
         weather_data_suffix = ''
 
@@ -31,7 +91,7 @@ class WeatherAssistant:
 
         system_prompt = inspect.cleandoc(f"""
             You are a helpful assistant talking to a user. Your task is to try and determine what a user wants to know about the weather and
-            try to answer their questions. Use the following JSON formatted weather data and conversation transcript
+            try to answer their questions. Use the following weather data and conversation transcript
             to figure out what their questions are and answer them. You do not need to ask for their location.
 
             If the weather data is None, or they haven't  asked a question yet, ask the user what category of
@@ -51,13 +111,4 @@ class WeatherAssistant:
             ```
             """)
 
-        messages = [{"role": "system", "content": system_prompt}]
-
-        response = AzureOpenAI().chat.completions.create(
-            temperature=0,
-            model=os.environ["OPENAI_DEPLOYMENT_NAME"],
-            messages=messages)
-
-        response = response.choices[0].message.content
-
-        return response
+        return [{"role": "system", "content": system_prompt}]
@@ -0,0 +1,129 @@
+import json
+import os
+import re
+import threading
+from typing import NamedTuple, Optional
+
+from src.clients.weather import WeatherType
+
+
+DEFAULT_THRESHOLD = 0.7
+
+_DAYS = "monday|tuesday|wednesday|thursday|friday|saturday|sunday"
+_COUNTS = r"\d+|two|three|four|five|six|seven|ten"
+
+# Pattern and weight in (0, 1], the weight being how sure a match alone makes us of the category
+DEFAULT_PATTERNS: dict[WeatherType, list[tuple[str, float]]] = {
+    WeatherType.SEVERE_ALERTS: [
+        (r"\b(alerts?|warnings?|advisory|advisories|watch(es)?)\b", 0.9),
+        (r"\b(storms?|severe|tornado(es)?|hurricanes?|flood(s|ing)?|blizzards?|thunderstorms?|hail|wildfires?)\b", 0.6),
+        (r"\b(danger(ous)?|safe|emergency)\b", 0.4),
+    ],
+    WeatherType.DAILY_FORECAST: [
+        (r"\bforecasts?\b", 0.8),
+        (rf"\b(tomorrow|tonight|weekend|this week|next week|upcoming|later this week|{_DAYS})\b", 0.7),
+        (rf"\b(next|coming) (few|couple( of)?|{_COUNTS}) days\b", 0.8),
+        (r"\b(will it|going to|gonna)\b", 0.4),
+    ],
+    WeatherType.CURRENT_CONDITIONS: [
+        (r"\b(right now|currently|current|at the moment|as we speak)\b", 0.8),
+        (r"\b(now|outside|today|this (morning|afternoon|evening))\b", 0.5),
+        (r"\b(temperature|how (hot|cold|warm)|humid(ity)?)\b", 0.3),
+    ],
+}
+
+
+class Classification(NamedTuple):
+    weather_type: WeatherType | None
+    confidence: float
+
+
+class WeatherRuleClassifier:
+    """
+    Deterministic keyword classifier for the weather category a user is asking about.
+
+    Each category's matching pattern weights are combined as 1 - prod(1 - weight), and the
+    confidence is the best category's score discounted by the runner-up's, so phrasings
+    that point at two categories ("storm warnings for tomorrow") stay ambiguous. Only a
+    confidence of at least threshold resolves the category; anything else should go to
+    the LLM. classify() counts attempts and hits for the fast path hit rate.
+    """
+    def __init__(self,
+                 patterns: Optional[dict[WeatherType, list[tuple[str, float]]]] = None,
+                 threshold: float = DEFAULT_THRESHOLD):
+        self.threshold = threshold
+        self.patterns = {
+            weather_type: [(re.compile(pattern, re.IGNORECASE), weight) for pattern, weight in weather_patterns]
+            for weather_type, weather_patterns in (patterns if patterns is not None else DEFAULT_PATTERNS).items()}
+        self._lock = threading.Lock()
+        self.attempts = 0
+        self.hits = 0
+
+    @classmethod
+    def from_file(cls, path: str, threshold: float = DEFAULT_THRESHOLD) -> "WeatherRuleClassifier":
+        """Loads patterns from a JSON file of the form {"DAILY_FORECAST": [["\\\\bforecast\\\\b", 0.8], ...], ...}."""
+        with open(path) as patterns_file:
+            patterns = json.load(patterns_file)
+
+        return cls(patterns={WeatherType[name]: [(pattern, weight) for pattern, weight in weather_patterns]
+                             for name, weather_patterns in patterns.items()},
+                   threshold=threshold)
+
+    def score(self, text: str) -> dict[WeatherType, float]:
+        scores = {}
+        for weather_type, weather_patterns in self.patterns.items():
+            miss = 1.0
+            for pattern, weight in weather_patterns:
+                if pattern.search(text):
+                    miss *= 1 - weight
+            scores[weather_type] = 1 - miss
+
+        return scores
+
+    def classify(self, text: str) -> Classification:
+        """Returns the category when the text is clear enough, otherwise a Classification with no weather type."""
+        ranked = sorted(self.score(text).items(), key=lambda item: item[1], reverse=True) if text else []
+        best_type, best = ranked[0] if ranked else (None, 0.0)
+        runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+        confidence = best * (1 - runner_up)
+
+        resolved = confidence >= self.threshold
+        with self._lock:
+            self.attempts += 1
+            self.hits += int(resolved)
+
+        return Classification(best_type if resolved else None, confidence)
+
+    def stats(self) -> dict[str, int | float | None]:
+        with self._lock:
+            return {
+                "attempts": self.attempts,
+                "hits": self.hits,
+                "hit_rate": self.hits / self.attempts if self.attempts else None,
+            }
+
+
+_classifier: WeatherRuleClassifier | None = None
+_classifier_lock = threading.Lock()
+
+
+def get_weather_classifier() -> WeatherRuleClassifier | None:
+    """
+    Returns the process-wide fast path classifier if WEATHER_FAST_PATH is "true", loading
+    its patterns from WEATHER_FAST_PATH_PATTERNS and threshold from WEATHER_FAST_PATH_THRESHOLD
+    when they are set.
+    """
+    global _classifier
+
+    if (os.environ.get("WEATHER_FAST_PATH") or "false").lower() != "true":
+        return None
+
+    if _classifier is None:
+        with _classifier_lock:
+            if _classifier is None:
+                path = os.environ.get("WEATHER_FAST_PATH_PATTERNS")
+                threshold = float(os.environ.get("WEATHER_FAST_PATH_THRESHOLD") or DEFAULT_THRESHOLD)
+                _classifier = WeatherRuleClassifier.from_file(path, threshold) if path \
+                    else WeatherRuleClassifier(threshold=threshold)
+
+    return _classifier
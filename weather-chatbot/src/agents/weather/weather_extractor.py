@@ -1,8 +1,10 @@
 import os
 import inspect
-from openai import AzureOpenAI
 
+from src.agents.weather.weather_classifier import WeatherRuleClassifier, get_weather_classifier
+from src.clients.llm_interface import get_async_llm_client, get_llm_client
 from src.context import Context
+from src.deadline import skip_optional
 from src.clients.weather import WeatherType
 
 UNKNOWN_CATEGORY = "UNKNOWN"
@@ -13,19 +15,75 @@ class WeatherExtractor:
     Class for extracting what information about the weather
     a user wants to know so that an API call can be made.
     """
+    def __init__(self, classifier: WeatherRuleClassifier | None = None):
+        """
+        Clear requests are classified by the rule based classifier when one is given (or
+        enabled with WEATHER_FAST_PATH), only ambiguous ones are sent to the LLM. When the
+        turn's budget is nearly spent, a category already in the context is kept instead.
+        """
+        self.classifier = classifier if classifier is not None else get_weather_classifier()
 
     def extract(self, context: Context):
 
-        message_history = context.get_messages()
+        if self._fast_path(context) or self._keep_category(context):
+            return
 
-        # Grabbing the most recent two messages so that we can update
-        # the category as needed, without managing change detection
-        recent_history = message_history[-2:]
+        messages = self._build_messages(context)
+        if messages is None:
+            return
 
-        if len(message_history) == 0:
+        response = get_llm_client(agent="WeatherExtractor").chat.completions.create(
+            temperature=0,
+            model=os.environ["OPENAI_DEPLOYMENT_NAME"],
+            messages=messages)
+
+        self._apply(response.choices[0].message.content, context)
+
+    async def extract_async(self, context: Context):
+
+        if self._fast_path(context) or self._keep_category(context):
+            return
+
+        messages = self._build_messages(context)
+        if messages is None:
             return
 
-        flattened_history = "\n".join([f"{m['role']}: {m['content']}" for m in recent_history])
+        response = await get_async_llm_client(agent="WeatherExtractor").chat.completions.create(
+            temperature=0,
+            model=os.environ["OPENAI_DEPLOYMENT_NAME"],
+            messages=messages)
+
+        self._apply(response.choices[0].message.content, context)
+
+    def _fast_path(self, context: Context) -> bool:
+        """Sets the category from the rule based classifier and returns True if it was clear enough."""
+        if self.classifier is None:
+            return False
+
+        # The same two messages the LLM looks at, but only what the user said: the
+        # assistant's questions list every category
+        classification = self.classifier.classify(context.transcript.render(start=-2, roles=["user"]))
+        if classification.weather_type is None:
+            return False
+
+        context.weather_category = classification.weather_type
+        return True
+
+    @staticmethod
+    def _keep_category(context: Context) -> bool:
+        return context.weather_category is not None and skip_optional("weather re-extraction")
+
+    @staticmethod
+    def _build_messages(context: Context) -> list[dict] | None:
+
+        message_history = context.get_messages()
+
+        if len(message_history) == 0:
+            return None
+
+        # Grabbing the most recent two messages so that we can update
+        # the category as needed, without managing change detection
+        flattened_history = context.transcript.render(start=-2)
 
         system_prompt = inspect.cleandoc(f"""
             Your task is to try and determine what type of question or questions a user is asking about the weather
@@ -38,14 +96,10 @@ class WeatherExtractor:
             ```
             """)
 
-        messages = [{"role": "system", "content": system_prompt}]
-
-        response = AzureOpenAI().chat.completions.create(
-            temperature=0,
-            model=os.environ["OPENAI_DEPLOYMENT_NAME"],
-            messages=messages)
+        return [{"role": "system", "content": system_prompt}]
 
-        weather_category_response = response.choices[0].message.content
+    @staticmethod
+    def _apply(weather_category_response: str, context: Context):
 
         if UNKNOWN_CATEGORY in weather_category_response.upper():
             return
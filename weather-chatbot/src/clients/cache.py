@@ -0,0 +1,171 @@
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class Missing:
+    """Type of MISSING, so return annotations can tell a miss apart from a cached None."""
+    def __repr__(self) -> str:
+        return "MISSING"
+
+
+MISSING = Missing()
+
+# How many writes a SqliteStore takes between checks of its row cap
+DEFAULT_PRUNE_EVERY = 100
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries also expire after a time-to-live.
+
+    The least recently used entry is evicted once max_size is reached. A value of
+    None is a valid cached value, so callers that cache negative results should pass
+    MISSING as the default to tell a miss apart from a cached None.
+    """
+    def __init__(self, max_size: int = 1024, ttl: float = 300.0, clock: Callable[[], float] = time.monotonic):
+        if max_size <= 0:
+            raise ValueError(f"max_size must be positive: received {max_size}")
+
+        self.max_size = max_size
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Returns the cached value for key, or default if it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Caches value under key for ttl seconds (defaults to the cache ttl)."""
+        expires_at = self._clock() + (self.ttl if ttl is None else ttl)
+
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: Hashable):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict[str, int]:
+        """Returns hit, miss, eviction and expiration counters along with the current size."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "size": len(self._entries),
+            }
+
+
+class SqliteStore:
+    """
+    On-disk key/value table with an expiry per entry, used as the persistent tier of a cache.
+
+    The connection is shared between threads behind a lock, so a single store can back a
+    process-wide cache.
+
+    With max_entries, the table is trimmed back to that many rows every prune_every
+    writes, evicting the entries closest to expiry (expired ones first), so it may
+    briefly hold up to prune_every - 1 rows more.
+    """
+    def __init__(self,
+                 path: str,
+                 table: str,
+                 max_entries: Optional[int] = None,
+                 prune_every: int = DEFAULT_PRUNE_EVERY):
+        if not table.isidentifier():
+            raise ValueError(f"table must be a valid identifier: received {table}")
+        if max_entries is not None and max_entries <= 0:
+            raise ValueError(f"max_entries must be positive: received {max_entries}")
+
+        self.path = path
+        self.table = table
+        self.max_entries = max_entries
+        self.prune_every = prune_every
+        self.evictions = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} (key TEXT PRIMARY KEY, expires_at REAL, data BLOB)")
+
+    def get(self, key: str, now: float) -> tuple[float, Any] | None:
+        with self._lock:
+            row = self._connection.execute(
+                f"SELECT expires_at, data FROM {self.table} WHERE key = ? AND expires_at > ?", (key, now)).fetchone()
+
+        return row
+
+    def set(self, key: str, data: Any, expires_at: float):
+        with self._lock, self._connection:
+            self._connection.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, expires_at, data) VALUES (?, ?, ?)",
+                (key, expires_at, data))
+
+            self._writes += 1
+            if self.max_entries is not None and self._writes % self.prune_every == 0:
+                self._trim()
+
+    def _trim(self):
+        # Called with the lock held, inside the write's transaction
+        size = self._connection.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+        if size > self.max_entries:
+            self.evictions += self._connection.execute(
+                f"DELETE FROM {self.table} WHERE key IN "
+                f"(SELECT key FROM {self.table} ORDER BY expires_at LIMIT ?)", (size - self.max_entries,)).rowcount
+
+    def delete(self, key: str):
+        with self._lock, self._connection:
+            self._connection.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+
+    def prune(self, now: float) -> int:
+        """Deletes expired entries and returns how many were removed."""
+        with self._lock, self._connection:
+            return self._connection.execute(f"DELETE FROM {self.table} WHERE expires_at <= ?", (now,)).rowcount
+
+    def stats(self) -> dict[str, int]:
+        """Returns the number of rows (expired ones included) and how many were evicted by the cap."""
+        with self._lock:
+            size = self._connection.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+            return {"size": size, "evictions": self.evictions}
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,213 @@
+import contextlib
+import contextvars
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Iterator, Optional
+
+from src.clients.cache import MISSING, SqliteStore, TTLCache
+from src.lazy import lazy_import
+from src.tracing import current_span
+
+
+ChatCompletion = lazy_import("openai.types.chat", "ChatCompletion")
+
+DEFAULT_CACHE_SIZE = 1024
+DEFAULT_CACHE_TTL = 24 * 60 * 60.0
+DEFAULT_STORE_MAX_ENTRIES = 50000
+
+_bypass: contextvars.ContextVar[bool] = contextvars.ContextVar("completion_cache_bypass", default=False)
+
+
+@contextlib.contextmanager
+def bypass_completion_cache() -> Iterator[None]:
+    """Completions requested inside the block (and the tasks it starts) always go to the model."""
+    token = _bypass.set(True)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+def is_bypassed() -> bool:
+    return _bypass.get() or (os.environ.get("COMPLETION_CACHE_BYPASS") or "false").lower() == "true"
+
+
+def is_cacheable(params: dict) -> bool:
+    """Only single, non-streamed completions at temperature 0 are deterministic enough to reuse."""
+    return params.get("temperature") == 0 and not params.get("stream") and params.get("n", 1) == 1
+
+
+def completion_key(params: dict) -> str:
+    """Hashes the deployment, messages and every other request parameter into a cache key."""
+    return hashlib.sha256(json.dumps(params, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class SqliteCompletionStore(SqliteStore):
+    """On-disk backend for the completion cache so entries are shared between runs, capped at max_entries rows."""
+    def __init__(self, path: str, max_entries: int = DEFAULT_STORE_MAX_ENTRIES, **kwargs):
+        super().__init__(path, table="completion_cache", max_entries=max_entries, **kwargs)
+
+
+class CompletionCache:
+    """
+    Two tier cache of chat completions keyed on a hash of the request.
+
+    The in-memory tier is a bounded LRU; an optional SqliteCompletionStore keeps
+    entries across runs, so repeated regression and eval runs with the same prompts
+    don't call the model again. Both tiers expire entries after ttl seconds and are
+    capped in size.
+    """
+    def __init__(self,
+                 max_size: int = DEFAULT_CACHE_SIZE,
+                 ttl: float = DEFAULT_CACHE_TTL,
+                 store: Optional[SqliteCompletionStore] = None,
+                 clock: Callable[[], float] = time.time):
+        self.ttl = ttl
+        self.store = store
+        self._clock = clock
+        self._memory = TTLCache(max_size=max_size, ttl=ttl, clock=clock)
+        self._lock = threading.Lock()
+        self.disk_hits = 0
+        self.bypassed = 0
+
+        if self.store is not None:
+            self.store.prune(self._clock())
+
+    def get(self, key: str) -> Any:
+        """Returns the cached completion, or None on a miss."""
+        response = self._memory.get(key, MISSING)
+        if response is not MISSING:
+            return response
+
+        if self.store is not None:
+            row = self.store.get(key, self._clock())
+            if row is not None:
+                expires_at, data = row
+                response = ChatCompletion.model_validate_json(data)
+                with self._lock:
+                    self.disk_hits += 1
+                self._memory.set(key, response, ttl=expires_at - self._clock())
+                return response
+
+        return None
+
+    def set(self, key: str, response: Any):
+        self._memory.set(key, response)
+        # Only real completions can be written to disk, test doubles stay in memory
+        if self.store is not None and isinstance(response, ChatCompletion):
+            self.store.set(key, response.model_dump_json(), self._clock() + self.ttl)
+
+    def count_bypass(self):
+        with self._lock:
+            self.bypassed += 1
+
+    def stats(self) -> dict[str, int]:
+        """
+        Returns hit, miss and eviction counters for the cache, the size and evictions of
+        the disk tier if there is one, and how many requests bypassed the cache.
+        """
+        stats = self._memory.stats()
+        with self._lock:
+            stats["misses"] -= self.disk_hits
+            stats["disk_hits"] = self.disk_hits
+            stats["bypassed"] = self.bypassed
+        if self.store is not None:
+            disk = self.store.stats()
+            stats["disk_size"] = disk["size"]
+            stats["disk_evictions"] = disk["evictions"]
+
+        return stats
+
+
+def _record_cache_hit(hit: bool):
+    span = current_span()
+    if span is not None:
+        span.set_attribute("cache_hit", hit)
+
+
+class CachedCompletions:
+    """Drop-in for client.chat.completions that answers repeated deterministic requests from the cache."""
+    def __init__(self, completions, cache: CompletionCache):
+        self._completions = completions
+        self._cache = cache
+
+    def create(self, **params):
+        if not is_cacheable(params) or is_bypassed():
+            self._cache.count_bypass()
+            return self._completions.create(**params)
+
+        key = completion_key(params)
+        response = self._cache.get(key)
+        _record_cache_hit(response is not None)
+        if response is None:
+            response = self._completions.create(**params)
+            self._cache.set(key, response)
+
+        return response
+
+
+class AsyncCachedCompletions(CachedCompletions):
+    async def create(self, **params):
+        if not is_cacheable(params) or is_bypassed():
+            self._cache.count_bypass()
+            return await self._completions.create(**params)
+
+        key = completion_key(params)
+        response = self._cache.get(key)
+        _record_cache_hit(response is not None)
+        if response is None:
+            response = await self._completions.create(**params)
+            self._cache.set(key, response)
+
+        return response
+
+
+class _Chat:
+    def __init__(self, completions: CachedCompletions):
+        self.completions = completions
+
+
+class CachedLLMClient:
+    """Wraps an Azure OpenAI client (sync or async) so chat completions go through the completion cache."""
+    def __init__(self, client, cache: CompletionCache, is_async: bool = False):
+        self._client = client
+        completions_type = AsyncCachedCompletions if is_async else CachedCompletions
+        self.chat = _Chat(completions_type(client.chat.completions, cache))
+
+    def __getattr__(self, name: str):
+        return getattr(self._client, name)
+
+
+def is_cache_enabled(agent: str) -> bool:
+    """Returns True if agent is listed in COMPLETION_CACHE_AGENTS (a comma separated list, or * for all)."""
+    agents = {name.strip() for name in (os.environ.get("COMPLETION_CACHE_AGENTS") or "").split(",")}
+
+    return "*" in agents or agent in agents
+
+
+_completion_cache: CompletionCache | None = None
+_completion_cache_lock = threading.Lock()
+
+
+def get_completion_cache() -> CompletionCache:
+    """
+    Returns the process-wide completion cache, sized from COMPLETION_CACHE_SIZE and
+    COMPLETION_CACHE_TTL and persisted to COMPLETION_CACHE_PATH (capped at
+    COMPLETION_CACHE_MAX_ENTRIES rows) if it is set.
+    """
+    global _completion_cache
+
+    if _completion_cache is None:
+        with _completion_cache_lock:
+            if _completion_cache is None:
+                path = os.environ.get("COMPLETION_CACHE_PATH")
+                max_entries = int(os.environ.get("COMPLETION_CACHE_MAX_ENTRIES") or DEFAULT_STORE_MAX_ENTRIES)
+                _completion_cache = CompletionCache(
+                    max_size=int(os.environ.get("COMPLETION_CACHE_SIZE") or DEFAULT_CACHE_SIZE),
+                    ttl=float(os.environ.get("COMPLETION_CACHE_TTL") or DEFAULT_CACHE_TTL),
+                    store=SqliteCompletionStore(path, max_entries=max_entries) if path else None)
+
+    return _completion_cache
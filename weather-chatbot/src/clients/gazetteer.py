@@ -0,0 +1,260 @@
+"""
+Offline index of well-known places, consulted before the Maps search service.
+
+The index is a tab separated file of place name, latitude, longitude and description,
+one place per line. Seed or extend it from a file of place names (one "City, State" per
+line, like the conversation generator's places.txt) by geocoding each new place once
+with Maps, from the weather-chatbot folder:
+
+    python -m src.clients.gazetteer --places eval/library/conversation_generator/customer_profile_data/places.txt \
+        --output data/gazetteer.tsv
+"""
+import argparse
+import difflib
+import os
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import Iterable, Optional
+
+from src.clients.geocoding import GeocodeResult, Geocoder, get_geocoder
+
+
+DEFAULT_FUZZY_CUTOFF = 0.85
+
+US_STATES = {
+    "al": "alabama", "ak": "alaska", "az": "arizona", "ar": "arkansas", "ca": "california", "co": "colorado",
+    "ct": "connecticut", "de": "delaware", "dc": "district of columbia", "fl": "florida", "ga": "georgia",
+    "hi": "hawaii", "id": "idaho", "il": "illinois", "in": "indiana", "ia": "iowa", "ks": "kansas",
+    "ky": "kentucky", "la": "louisiana", "me": "maine", "md": "maryland", "ma": "massachusetts", "mi": "michigan",
+    "mn": "minnesota", "ms": "mississippi", "mo": "missouri", "mt": "montana", "ne": "nebraska", "nv": "nevada",
+    "nh": "new hampshire", "nj": "new jersey", "nm": "new mexico", "ny": "new york", "nc": "north carolina",
+    "nd": "north dakota", "oh": "ohio", "ok": "oklahoma", "or": "oregon", "pa": "pennsylvania",
+    "ri": "rhode island", "sc": "south carolina", "sd": "south dakota", "tn": "tennessee", "tx": "texas",
+    "ut": "utah", "vt": "vermont", "va": "virginia", "wa": "washington", "wv": "west virginia",
+    "wi": "wisconsin", "wy": "wyoming",
+}
+STATE_NAMES = set(US_STATES.values())
+COUNTRY_NAMES = {"united states", "united states of america", "usa", "us", "america"}
+
+
+def place_parts(description: str) -> tuple[str, ...] | None:
+    """
+    Splits a location description into normalized, sorted parts, so "Marfa, TX",
+    "marfa texas" and "United States, Texas, Marfa" all give ("marfa", "texas").
+    Returns None for descriptions with a street address or zip code, which are more
+    specific than the places in the index.
+    """
+    if re.search(r"\d", description):
+        return None
+
+    parts = [" ".join(part.lower().replace(".", "").split()) for part in description.split(",")]
+    parts = [US_STATES.get(part, part) for part in parts if part and part not in COUNTRY_NAMES]
+
+    # "City State" without the comma
+    if len(parts) == 1:
+        tokens = parts[0].split()
+        for length in (2, 1):
+            tail = " ".join(tokens[-length:])
+            if len(tokens) > length and (tail in STATE_NAMES or (length == 1 and tail in US_STATES)):
+                parts = [" ".join(tokens[:-length]), US_STATES.get(tail, tail)]
+                break
+
+    return tuple(sorted(parts)) if parts else None
+
+
+class Gazetteer:
+    """
+    In-memory index of place names to coordinates, loaded from one or more index files.
+
+    Lookups are dictionary hits on the normalized parts of the description. A misspelled
+    city is matched fuzzily against the cities of the same state, so the state must be
+    spelled out or abbreviated correctly; only the city is compared, a shared state name
+    would make different cities ("Austin" and "Justin", Texas) look alike. A place can also
+    be found by its city alone when no other place has the same city.
+
+    Adding places builds new indexes and swaps them in, so lookups running meanwhile
+    keep reading the old ones.
+    """
+    def __init__(self, fuzzy_cutoff: float = DEFAULT_FUZZY_CUTOFF):
+        self.fuzzy_cutoff = fuzzy_cutoff
+        self._places: dict[str, GeocodeResult] = {}
+        self._index: dict[str, GeocodeResult] = {}
+        self._cities_by_state: dict[str, dict[str, str]] = defaultdict(dict)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.fuzzy_hits = 0
+        self.misses = 0
+
+    @classmethod
+    def load(cls, paths: Iterable[str], fuzzy_cutoff: float = DEFAULT_FUZZY_CUTOFF) -> "Gazetteer":
+        places = {}
+        for path in paths:
+            with open(path, encoding="utf-8") as index_file:
+                for line in index_file:
+                    if line.strip() == "" or line.startswith("#"):
+                        continue
+                    name, lat, lon, description = line.rstrip("\n").split("\t")
+                    places[name] = GeocodeResult(float(lat), float(lon), description)
+
+        gazetteer = cls(fuzzy_cutoff=fuzzy_cutoff)
+        gazetteer.add_all(places)
+
+        return gazetteer
+
+    def add(self, name: str, result: GeocodeResult):
+        """Adds a place, replacing an existing one with the same name."""
+        self.add_all({name: result})
+
+    def add_all(self, places: dict[str, GeocodeResult]):
+        for name in places:
+            if place_parts(name) is None:
+                raise ValueError(f"Place names can't contain street addresses or zip codes: received {name}")
+
+        with self._lock:
+            self._places.update(places)
+            self._index, self._cities_by_state = self._build_indexes()
+
+    def _build_indexes(self) -> tuple[dict[str, GeocodeResult], dict[str, dict[str, str]]]:
+        index: dict[str, GeocodeResult] = {}
+        cities_by_state: dict[str, dict[str, str]] = defaultdict(dict)
+
+        places = {place_parts(name): result for name, result in self._places.items()}
+        cities = {parts: [part for part in parts if part not in STATE_NAMES] for parts in places}
+        city_counts = Counter(city for parts in places for city in cities[parts])
+
+        for parts, result in places.items():
+            key = "|".join(parts)
+            index[key] = result
+            states = [part for part in parts if part in STATE_NAMES]
+            if len(parts) == 2 and len(states) == 1 and len(cities[parts]) == 1:
+                cities_by_state[states[0]][cities[parts][0]] = key
+
+            # "Marfa" alone finds "Marfa, Texas" as long as there is no other Marfa
+            if len(parts) == 2 and len(cities[parts]) == 1 and city_counts[cities[parts][0]] == 1:
+                index.setdefault(cities[parts][0], result)
+
+        return index, cities_by_state
+
+    def save(self, path: str):
+        with self._lock:
+            places = sorted(self._places.items())
+
+        with open(path, "w", encoding="utf-8") as index_file:
+            for name, result in places:
+                index_file.write(f"{name}\t{result.lat}\t{result.lon}\t{result.description}\n")
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._places
+
+    def __len__(self) -> int:
+        return len(self._places)
+
+    def lookup(self, location_description: str) -> GeocodeResult | None:
+        """Returns the indexed place matching the description, or None if there isn't one."""
+        parts = place_parts(location_description)
+        if parts is None:
+            self._count("misses")
+            return None
+
+        # Both indexes from the same add, they are replaced together
+        with self._lock:
+            index, cities_by_state = self._index, self._cities_by_state
+
+        key = "|".join(parts)
+        result = index.get(key)
+        if result is not None:
+            self._count("hits")
+            return result
+
+        match = self._fuzzy_match(parts, cities_by_state)
+        if match is None:
+            self._count("misses")
+            return None
+
+        self._count("fuzzy_hits")
+        return index[match]
+
+    def _fuzzy_match(self, parts: tuple[str, ...], cities_by_state: dict[str, dict[str, str]]) -> str | None:
+        """Returns the key of the place in the same state whose city is closest to the described one."""
+        states = [part for part in parts if part in STATE_NAMES]
+        cities = [part for part in parts if part not in STATE_NAMES]
+        if len(states) != 1 or len(cities) != 1:
+            return None
+
+        state_cities = cities_by_state.get(states[0], {})
+        matches = difflib.get_close_matches(cities[0], state_cities, n=1, cutoff=self.fuzzy_cutoff)
+
+        return state_cities[matches[0]] if matches else None
+
+    def _count(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"places": len(self._places), "hits": self.hits, "fuzzy_hits": self.fuzzy_hits,
+                    "misses": self.misses}
+
+
+_gazetteer: Gazetteer | None = None
+_gazetteer_lock = threading.Lock()
+
+
+def get_gazetteer() -> Gazetteer | None:
+    """Returns the process-wide gazetteer loaded from GAZETTEER_PATH (a comma separated list), or None if unset."""
+    global _gazetteer
+
+    paths = os.environ.get("GAZETTEER_PATH")
+    if not paths:
+        return None
+
+    if _gazetteer is None:
+        with _gazetteer_lock:
+            if _gazetteer is None:
+                _gazetteer = Gazetteer.load(path.strip() for path in paths.split(","))
+
+    return _gazetteer
+
+
+def build(places_paths: list[str], output: str, geocoder: Optional[Geocoder] = None) -> Gazetteer:
+    """Adds the places listed in places_paths to the index at output, geocoding the ones it doesn't have yet."""
+    geocoder = geocoder if geocoder is not None else get_geocoder()
+
+    gazetteer = Gazetteer.load([output]) if os.path.exists(output) else Gazetteer()
+
+    for places_path in places_paths:
+        with open(places_path, encoding="utf-8") as places_file:
+            names = [line.strip() for line in places_file if line.strip()]
+
+        for name in names:
+            if name in gazetteer:
+                continue
+
+            result = geocoder.geocode(name)
+            if result is None:
+                print(f"No match for {name}, skipping")
+                continue
+
+            gazetteer.add(name, result)
+
+    gazetteer.save(output)
+
+    return gazetteer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--places", nargs="+", required=True, help="Files with one place name per line")
+    parser.add_argument("--output", required=True, help="Index file to create or extend")
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    gazetteer = build(args.places, args.output)
+    print(f"{len(gazetteer)} places in {args.output}")
+
+
+if __name__ == "__main__":
+    main()
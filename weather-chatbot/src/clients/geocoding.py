@@ -0,0 +1,188 @@
+import os
+import re
+import threading
+from typing import TYPE_CHECKING, NamedTuple, Optional
+
+from src.clients.cache import MISSING, Missing, TTLCache
+from src.clients.loop_local import LoopLocal
+from src.clients.single_flight import SingleFlight
+from src.lazy import lazy_import
+from src.tracing import SPAN_KIND_CLIENT, Span, get_tracer
+
+if TYPE_CHECKING:
+    from src.clients.gazetteer import Gazetteer
+
+
+AzureKeyCredential = lazy_import("azure.core.credentials", "AzureKeyCredential")
+MapsSearchClient = lazy_import("azure.maps.search", "MapsSearchClient")
+AsyncMapsSearchClient = lazy_import("azure.maps.search.aio", "MapsSearchClient")
+
+geo_score_threshold = 0.7
+
+DEFAULT_CACHE_SIZE = 1024
+DEFAULT_CACHE_TTL = 24 * 60 * 60.0
+DEFAULT_NEGATIVE_CACHE_TTL = 10 * 60.0
+
+
+class GeocodeResult(NamedTuple):
+    lat: float
+    lon: float
+    description: str
+
+
+def normalize_description(location_description: str) -> str:
+    """Normalizes a location description so trivially different spellings share a cache entry."""
+    description = " ".join(location_description.lower().split())
+    description = re.sub(r"\s*,\s*", ", ", description)
+    return description.strip(" ,.")
+
+
+def _endpoint_settings() -> dict:
+    """Points the Maps search clients at MAPS_ENDPOINT (e.g. a local fake) if it is set."""
+    endpoint = os.environ.get("MAPS_ENDPOINT")
+    return {"base_url": endpoint} if endpoint else {}
+
+
+def _close_search_client(client):
+    # The preview Maps SDK only has close() on the generated client it wraps
+    close = getattr(client, "close", None)
+    return close() if close is not None else client._maps_client.close()
+
+
+class Geocoder:
+    """
+    Resolves location descriptions to coordinates with a shared Maps search client.
+
+    Results are kept in an LRU+TTL cache keyed on the normalized description. Lookups
+    with no result above the score threshold are cached too (for a shorter time), so a
+    repeated miss doesn't cost another Maps round trip. With a gazetteer, well-known
+    places are resolved from it without going to Maps at all. Concurrent misses for the
+    same description share one Maps search, which each caller waits for no longer than
+    its turn's remaining budget.
+    """
+    def __init__(self,
+                 search_client: Optional[MapsSearchClient] = None,
+                 gazetteer: Optional["Gazetteer"] = None,
+                 cache: Optional[TTLCache] = None,
+                 negative_ttl: float = DEFAULT_NEGATIVE_CACHE_TTL,
+                 score_threshold: float = geo_score_threshold,
+                 single_flight: Optional[SingleFlight] = None):
+        self._search_client = search_client
+        self.gazetteer = gazetteer
+        self._client_lock = threading.Lock()
+        self._async_search_clients = LoopLocal(self._create_async_search_client)
+        self.cache = cache if cache is not None else TTLCache(max_size=DEFAULT_CACHE_SIZE, ttl=DEFAULT_CACHE_TTL)
+        self.negative_ttl = negative_ttl
+        self.score_threshold = score_threshold
+        self.single_flight = single_flight if single_flight is not None else SingleFlight()
+
+    @property
+    def search_client(self) -> MapsSearchClient:
+        """The Maps search client, created once on first use."""
+        if self._search_client is None:
+            with self._client_lock:
+                if self._search_client is None:
+                    credential = AzureKeyCredential(os.environ["MAPS_API_KEY"])
+                    self._search_client = MapsSearchClient(credential=credential, **_endpoint_settings())
+
+        return self._search_client
+
+    @staticmethod
+    def _create_async_search_client() -> AsyncMapsSearchClient:
+        return AsyncMapsSearchClient(credential=AzureKeyCredential(os.environ["MAPS_API_KEY"]), **_endpoint_settings())
+
+    @property
+    def async_search_client(self) -> AsyncMapsSearchClient:
+        """The async Maps search client for the running event loop, created once on first use."""
+        return self._async_search_clients.get()
+
+    def close(self):
+        """Closes the Maps search clients, the async ones on their event loop if it is still running."""
+        if self._search_client is not None:
+            _close_search_client(self._search_client)
+        self._async_search_clients.close(_close_search_client)
+
+    async def aclose(self):
+        """Closes the async Maps search client of the running event loop, call it before the loop ends."""
+        await self._async_search_clients.aclose(_close_search_client)
+
+    def geocode(self, location_description: str) -> GeocodeResult | None:
+        """Returns the best match above the score threshold, or None if there isn't one."""
+        with get_tracer().span("maps.geocode", SPAN_KIND_CLIENT) as span:
+            result = self._lookup(location_description, span)
+            if result is not MISSING:
+                return result
+
+            key = normalize_description(location_description)
+            search_results = self.single_flight.do(
+                key, lambda: self.search_client.search_address(location_description))
+
+            return self._store(key, search_results, span)
+
+    async def geocode_async(self, location_description: str) -> GeocodeResult | None:
+        """Async version of geocode, using the async Maps search client on a cache miss."""
+        with get_tracer().span("maps.geocode", SPAN_KIND_CLIENT) as span:
+            result = self._lookup(location_description, span)
+            if result is not MISSING:
+                return result
+
+            key = normalize_description(location_description)
+            search_results = await self.single_flight.do_async(
+                key, lambda: self.async_search_client.search_address(location_description))
+
+            return self._store(key, search_results, span)
+
+    def _lookup(self, location_description: str, span: Span) -> GeocodeResult | None | Missing:
+        """Returns the gazetteer or cached result, or MISSING if Maps has to be searched."""
+        result = self.gazetteer.lookup(location_description) if self.gazetteer is not None else None
+        if result is not None:
+            span.set_attributes(source="gazetteer", found=True)
+            return result
+
+        cached = self.cache.get(normalize_description(location_description), MISSING)
+        if cached is not MISSING:
+            span.set_attributes(source="cache", found=cached is not None)
+
+        return cached
+
+    def _store(self, key: str, search_results, span: Span) -> GeocodeResult | None:
+        """Caches and returns the best search result above the score threshold."""
+        results = [result for result in search_results.results if result.score > self.score_threshold]
+        span.set_attributes(source="maps", found=len(results) > 0)
+
+        if len(results) == 0:
+            self.cache.set(key, None, ttl=self.negative_ttl)
+            return None
+
+        result = GeocodeResult(
+            lat=results[0].position.lat,
+            lon=results[0].position.lon,
+            description=f"{results[0].address.country}, {results[0].address.freeform_address}")
+        self.cache.set(key, result)
+
+        return result
+
+    def stats(self) -> dict[str, int]:
+        """Returns the cache counters and how many Maps searches were coalesced into one in flight."""
+        stats = self.cache.stats()
+        stats["coalesced"] = self.single_flight.stats()["coalesced"]
+
+        return stats
+
+
+_geocoder: Geocoder | None = None
+_geocoder_lock = threading.Lock()
+
+
+def get_geocoder() -> Geocoder:
+    """Returns the process-wide geocoder, backed by the gazetteer at GAZETTEER_PATH if it is set."""
+    global _geocoder
+
+    if _geocoder is None:
+        with _geocoder_lock:
+            if _geocoder is None:
+                # Imported here as the gazetteer module builds on this one
+                from src.clients.gazetteer import get_gazetteer
+                _geocoder = Geocoder(gazetteer=get_gazetteer())
+
+    return _geocoder
@@ -1,7 +1,235 @@
-from openai import AzureOpenAI
 from dotenv import load_dotenv
-from typing import Optional
+from typing import Iterable, Iterator, Optional
+import httpx
 import os
+import threading
+
+from src.clients.completion_cache import CachedLLMClient, get_completion_cache, is_cache_enabled
+from src.clients.loop_local import LoopLocal
+from src.clients.resilience import ResilientLLMClient, get_llm_resilience
+from src.lazy import lazy_import
+from src.tracing import SPAN_KIND_CLIENT, Span, get_tracer
+
+
+AzureOpenAI = lazy_import("openai", "AzureOpenAI")
+AsyncAzureOpenAI = lazy_import("openai", "AsyncAzureOpenAI")
+
+DEFAULT_MAX_CONNECTIONS = 20
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 10
+DEFAULT_KEEPALIVE_EXPIRY = 30.0
+
+
+class LLMClientRegistry:
+    """
+    Process-wide registry of long-lived Azure OpenAI clients.
+
+    Clients are keyed by endpoint and deployment and each one owns a keep-alive
+    connection pool, so agent calls reuse open connections instead of building
+    a new HTTP client (and TLS handshake) on every request. Async clients are
+    additionally kept per event loop, since their connections are bound to it.
+    """
+    def __init__(self,
+                 max_connections: int = DEFAULT_MAX_CONNECTIONS,
+                 max_keepalive_connections: int = DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+                 keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY):
+        self._limits = httpx.Limits(max_connections=max_connections,
+                                    max_keepalive_connections=max_keepalive_connections,
+                                    keepalive_expiry=keepalive_expiry)
+        self._clients: dict[tuple, AzureOpenAI] = {}
+        self._async_clients: LoopLocal[dict[tuple, AsyncAzureOpenAI]] = LoopLocal(dict)
+        self._stats: dict[tuple, dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def get_client(self, endpoint: Optional[str] = None, deployment: Optional[str] = None) -> AzureOpenAI:
+        """Returns the pooled client for the endpoint and deployment, creating it on first use.
+
+        Args:
+            endpoint (Optional[str]): Azure OpenAI endpoint. Defaults to AZURE_OPENAI_ENDPOINT.
+            deployment (Optional[str]): Deployment name. Defaults to OPENAI_DEPLOYMENT_NAME.
+        """
+        endpoint = endpoint or os.environ.get("AZURE_OPENAI_ENDPOINT")
+        deployment = deployment or os.environ.get("OPENAI_DEPLOYMENT_NAME")
+        key = (endpoint, deployment)
+
+        with self._lock:
+            client = self._clients.get(key)
+            if client is not None:
+                self._stats[key]["hits"] += 1
+                return client
+
+            client = AzureOpenAI(
+                azure_endpoint=endpoint,
+                http_client=httpx.Client(limits=self._limits))
+            self._clients[key] = client
+            self._stats[key] = {"hits": 0, "misses": 1}
+
+        return client
+
+    def get_async_client(self, endpoint: Optional[str] = None, deployment: Optional[str] = None) -> AsyncAzureOpenAI:
+        """Returns the pooled async client for the endpoint, deployment and running event loop.
+
+        Args:
+            endpoint (Optional[str]): Azure OpenAI endpoint. Defaults to AZURE_OPENAI_ENDPOINT.
+            deployment (Optional[str]): Deployment name. Defaults to OPENAI_DEPLOYMENT_NAME.
+        """
+        endpoint = endpoint or os.environ.get("AZURE_OPENAI_ENDPOINT")
+        deployment = deployment or os.environ.get("OPENAI_DEPLOYMENT_NAME")
+        key = (endpoint, deployment)
+        stats_key = (endpoint, deployment, "async")
+        clients = self._async_clients.get()
+
+        with self._lock:
+            client = clients.get(key)
+            if client is not None:
+                self._stats[stats_key]["hits"] += 1
+                return client
+
+            client = AsyncAzureOpenAI(
+                azure_endpoint=endpoint,
+                http_client=httpx.AsyncClient(limits=self._limits))
+            clients[key] = client
+            counts = self._stats.setdefault(stats_key, {"hits": 0, "misses": 0})
+            counts["misses"] += 1
+
+        return client
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """Returns the pool hit and miss counts for each 'endpoint|deployment' key ('|async' for async clients)."""
+        with self._lock:
+            return {"|".join(str(part) for part in key): dict(counts) for key, counts in self._stats.items()}
+
+    def close(self):
+        """
+        Closes every pooled client and forgets the hit counts. Async clients are closed on
+        their event loop if it is still running, see aclose for the others.
+        """
+        with self._lock:
+            for client in self._clients.values():
+                client.close()
+            self._clients.clear()
+            self._stats.clear()
+
+        self._async_clients.close(_close_async_clients)
+
+    async def aclose(self):
+        """Closes the async clients of the running event loop, call it before the loop ends."""
+        await self._async_clients.aclose(_close_async_clients)
+
+
+async def _close_async_clients(clients: dict[tuple, AsyncAzureOpenAI]):
+    for client in clients.values():
+        await client.close()
+
+
+def _record_usage(span: Span, response):
+    usage = getattr(response, "usage", None)
+    for name in ("prompt_tokens", "completion_tokens", "total_tokens"):
+        value = getattr(usage, name, None)
+        if isinstance(value, int):
+            span.set_attribute(f"llm.{name}", value)
+
+
+class _TracedCompletions:
+    def __init__(self, completions, agent: str):
+        self._completions = completions
+        self._agent = agent
+
+    def create(self, **params):
+        with get_tracer().span("llm.chat", SPAN_KIND_CLIENT, agent=self._agent, model=params.get("model"),
+                               stream=bool(params.get("stream"))) as span:
+            response = self._completions.create(**params)
+            _record_usage(span, response)
+
+            return response
+
+
+class _AsyncTracedCompletions(_TracedCompletions):
+    async def create(self, **params):
+        with get_tracer().span("llm.chat", SPAN_KIND_CLIENT, agent=self._agent, model=params.get("model"),
+                               stream=bool(params.get("stream"))) as span:
+            response = await self._completions.create(**params)
+            _record_usage(span, response)
+
+            return response
+
+
+class _Chat:
+    def __init__(self, completions):
+        self.completions = completions
+
+
+class TracedLLMClient:
+    """
+    Wraps an Azure OpenAI client (sync or async) so each chat completion is traced as an
+    llm.chat span with the calling agent, the model and the token usage. Streamed
+    completions are only timed until the stream is opened.
+    """
+    def __init__(self, client, agent: str, is_async: bool = False):
+        self._client = client
+        completions_type = _AsyncTracedCompletions if is_async else _TracedCompletions
+        self.chat = _Chat(completions_type(client.chat.completions, agent))
+
+    def __getattr__(self, name: str):
+        return getattr(self._client, name)
+
+
+_registry = LLMClientRegistry()
+
+
+def get_client_registry() -> LLMClientRegistry:
+    """Returns the process-wide client registry."""
+    return _registry
+
+
+def get_llm_client(endpoint: Optional[str] = None, deployment: Optional[str] = None,
+                   agent: Optional[str] = None) -> AzureOpenAI:
+    """Returns a long-lived client from the process-wide registry.
+
+    Args:
+        agent (Optional[str]): Name of the calling agent. Its completions are traced, bounded by
+            the turn's remaining budget, get the timeout, hedging and circuit breaking set by
+            the LLM_* settings, and if the agent
+            is listed in COMPLETION_CACHE_AGENTS its temperature 0 completions go through the
+            completion cache (so cache hits are neither hedged nor counted by the breaker).
+    """
+    client = _registry.get_client(endpoint=endpoint, deployment=deployment)
+    if agent is None:
+        return client
+
+    client = ResilientLLMClient(client, agent, get_llm_resilience())
+
+    if is_cache_enabled(agent):
+        client = CachedLLMClient(client, get_completion_cache())
+
+    return TracedLLMClient(client, agent)
+
+
+def get_async_llm_client(endpoint: Optional[str] = None, deployment: Optional[str] = None,
+                         agent: Optional[str] = None) -> AsyncAzureOpenAI:
+    """Returns a long-lived async client for the running event loop from the process-wide registry,
+    traced, made resilient and going through the completion cache like get_llm_client."""
+    client = _registry.get_async_client(endpoint=endpoint, deployment=deployment)
+    if agent is None:
+        return client
+
+    client = ResilientLLMClient(client, agent, get_llm_resilience(), is_async=True)
+
+    if is_cache_enabled(agent):
+        client = CachedLLMClient(client, get_completion_cache(), is_async=True)
+
+    return TracedLLMClient(client, agent, is_async=True)
+
+
+def iter_content(stream: Iterable) -> Iterator[str]:
+    """Yields the text of each chunk of a streamed chat completion, skipping chunks without any."""
+    for chunk in stream:
+        # Azure sends a first chunk with only the content filter results and no choices
+        if len(chunk.choices) == 0:
+            continue
+
+        content = chunk.choices[0].delta.content
+        if content:
+            yield content
 
 
 def get_completion(messages, temperature, max_tokens: Optional[int] = None):
@@ -14,12 +242,7 @@ def get_completion(messages, temperature, max_tokens: Optional[int] = None):
     """
     load_dotenv()
 
-    # Set the API key of azure openai
-    client = AzureOpenAI(
-        api_key=os.environ["AZURE_OPENAI_API_KEY"],
-        azure_endpoint=os.environ["AZURE_OPENAI_ENDPOINT"],
-        api_version=os.environ["OPENAI_API_VERSION"]
-    )
+    client = get_llm_client()
     deployment_name = os.environ["OPENAI_DEPLOYMENT_NAME"]
 
     response = client.chat.completions.create(
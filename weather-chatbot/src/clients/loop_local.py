@@ -0,0 +1,63 @@
+import asyncio
+import threading
+import weakref
+from typing import Awaitable, Callable, Generic, TypeVar
+
+
+T = TypeVar("T")
+
+
+class LoopLocal(Generic[T]):
+    """
+    Lazily creates one instance of a resource per running event loop.
+
+    Async HTTP clients keep connections bound to the loop that opened them, so a
+    long-lived client can only be shared by coroutines running on the same loop.
+    """
+    def __init__(self, factory: Callable[[], T]):
+        self._factory = factory
+        self._instances: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, T] = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def get(self) -> T:
+        """Returns the instance for the running loop. Must be called from a coroutine."""
+        loop = asyncio.get_running_loop()
+
+        with self._lock:
+            instance = self._instances.get(loop)
+            if instance is None:
+                instance = self._factory()
+                self._instances[loop] = instance
+
+        return instance
+
+    def values(self) -> list[T]:
+        with self._lock:
+            return list(self._instances.values())
+
+    def clear(self):
+        with self._lock:
+            self._instances.clear()
+
+    async def aclose(self, close: Callable[[T], Awaitable[None]]):
+        """Closes the running loop's instance, if it has one, with close(instance) and forgets it."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            instance = self._instances.pop(loop, None)
+
+        if instance is not None:
+            await close(instance)
+
+    def close(self, close: Callable[[T], Awaitable[None]]):
+        """
+        Forgets every instance, scheduling close(instance) on the loops that are still
+        running. Instances of a stopped loop can't be closed from here; close them with
+        aclose before the loop ends.
+        """
+        with self._lock:
+            instances = list(self._instances.items())
+            self._instances.clear()
+
+        for loop, instance in instances:
+            if loop.is_running():
+                asyncio.run_coroutine_threadsafe(close(instance), loop)
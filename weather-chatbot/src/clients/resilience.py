@@ -0,0 +1,465 @@
+import asyncio
+import contextvars
+import logging
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Optional
+
+from src.deadline import DeadlineExceeded, check_deadline, current_deadline, remaining_timeout
+from src.lazy import lazy_import
+from src.metrics import LatencyRecorder
+from src.tracing import current_span
+
+
+logger = logging.getLogger(__name__)
+
+openai = lazy_import("openai")
+
+DEFAULT_HEDGE_MIN_SAMPLES = 20
+DEFAULT_RESET_TIMEOUT = 30.0
+DEFAULT_MAX_WORKERS = 64
+
+# Recent latencies of each agent that the hedge delay is picked from
+LATENCY_WINDOW = 200
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class LLMUnavailableError(Exception):
+    """The model could not answer in time, or is not being called because it is degraded."""
+
+
+class LLMTimeoutError(LLMUnavailableError):
+    pass
+
+
+class CircuitOpenError(LLMUnavailableError):
+    pass
+
+
+def is_backend_failure(error: Exception) -> bool:
+    """Errors caused by the request itself (4xx other than throttling) don't say anything about the backend."""
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code == 429 or error.status_code >= 500
+
+    return True
+
+
+class CircuitBreaker:
+    """
+    Stops calling a degraded backend until it has had time to recover.
+
+    The circuit opens after failure_threshold consecutive failures, and calls are
+    refused while it is open. Once reset_timeout has passed a single trial call is let
+    through (the circuit is half open): if it succeeds the circuit closes, otherwise it
+    stays open for another reset_timeout.
+    """
+    def __init__(self,
+                 failure_threshold: int = 5,
+                 reset_timeout: float = DEFAULT_RESET_TIMEOUT,
+                 clock: Callable[[], float] = time.monotonic):
+        if failure_threshold <= 0:
+            raise ValueError(f"failure_threshold must be positive: received {failure_threshold}")
+
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial = False
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.short_circuits = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and (self._trial or self._clock() - self._opened_at >= self.reset_timeout):
+                return HALF_OPEN
+
+            return self._state
+
+    def allow(self) -> bool:
+        """Returns True if a call may go to the backend, counting the calls refused."""
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+
+            now = self._clock()
+            if now - self._opened_at >= self.reset_timeout:
+                # Other calls are refused until the trial call is back, or for another reset_timeout
+                self._opened_at = now
+                self._trial = True
+                return True
+
+            self.short_circuits += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == CLOSED and self._failures >= self.failure_threshold:
+                self._state = OPEN
+                self.opened += 1
+                logger.warning(f"Circuit opened after {self._failures} consecutive LLM failures")
+            if self._state == OPEN:
+                self._opened_at = self._clock()
+                self._trial = False
+
+    def stats(self) -> dict[str, Any]:
+        state = self.state
+        with self._lock:
+            return {"state": state, "opened": self.opened, "short_circuits": self.short_circuits}
+
+
+class ResiliencePolicy:
+    """
+    Deadline, hedging and circuit breaking settings for agent LLM calls. Each part is
+    off while its setting is None.
+
+    Args:
+        timeout (Optional[float]): Seconds an agent waits for a completion, hedge included.
+        hedge_percentile (Optional[float]): A duplicate request is sent once a call has taken
+            longer than this percentile of the agent's recent latencies.
+        hedge_min_samples (int): Calls an agent makes before its calls are hedged.
+        failure_threshold (Optional[int]): Consecutive failures that open the circuit.
+        reset_timeout (float): Seconds the circuit stays open before a trial call.
+    """
+    def __init__(self,
+                 timeout: Optional[float] = None,
+                 hedge_percentile: Optional[float] = None,
+                 hedge_min_samples: int = DEFAULT_HEDGE_MIN_SAMPLES,
+                 failure_threshold: Optional[int] = None,
+                 reset_timeout: float = DEFAULT_RESET_TIMEOUT):
+        if timeout is not None and timeout <= 0:
+            raise ValueError(f"timeout must be positive: received {timeout}")
+        if hedge_percentile is not None and not 0 < hedge_percentile <= 100:
+            raise ValueError(f"hedge_percentile must be between 0 and 100: received {hedge_percentile}")
+
+        self.timeout = timeout
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+    @classmethod
+    def from_env(cls) -> "ResiliencePolicy":
+        """
+        Reads the policy from LLM_TIMEOUT, LLM_HEDGE_PERCENTILE, LLM_HEDGE_MIN_SAMPLES,
+        LLM_BREAKER_FAILURES and LLM_BREAKER_RESET.
+        """
+        timeout = os.environ.get("LLM_TIMEOUT")
+        hedge_percentile = os.environ.get("LLM_HEDGE_PERCENTILE")
+        failure_threshold = os.environ.get("LLM_BREAKER_FAILURES")
+
+        return cls(timeout=float(timeout) if timeout else None,
+                   hedge_percentile=float(hedge_percentile) if hedge_percentile else None,
+                   hedge_min_samples=int(os.environ.get("LLM_HEDGE_MIN_SAMPLES") or DEFAULT_HEDGE_MIN_SAMPLES),
+                   failure_threshold=int(failure_threshold) if failure_threshold else None,
+                   reset_timeout=float(os.environ.get("LLM_BREAKER_RESET") or DEFAULT_RESET_TIMEOUT))
+
+
+class LLMResilience:
+    """
+    Process-wide state of the resilience layer: the circuit breaker shared by every
+    agent (they all call the same deployment), each agent's recent latencies to pick
+    its hedge delay from, the worker threads of sync calls and the counters.
+    """
+    def __init__(self,
+                 policy: Optional[ResiliencePolicy] = None,
+                 breaker: Optional[CircuitBreaker] = None,
+                 executor: Optional[ThreadPoolExecutor] = None):
+        self.policy = policy if policy is not None else ResiliencePolicy()
+        if breaker is None and self.policy.failure_threshold is not None:
+            breaker = CircuitBreaker(self.policy.failure_threshold, self.policy.reset_timeout)
+        self.breaker = breaker
+        self._executor = executor
+        self._executor_lock = threading.Lock()
+        self._latencies: dict[str, LatencyRecorder] = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.hedges_fired = 0
+        self.hedges_won = 0
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        # Sync calls run on a worker so the caller can stop waiting at the deadline
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=DEFAULT_MAX_WORKERS,
+                                                        thread_name_prefix="LLMResilience")
+
+        return self._executor
+
+    def _recorder(self, agent: str) -> LatencyRecorder:
+        with self._lock:
+            recorder = self._latencies.get(agent)
+            if recorder is None:
+                recorder = self._latencies[agent] = LatencyRecorder(max_samples=LATENCY_WINDOW)
+
+            return recorder
+
+    def hedge_delay(self, agent: str, timeout: float | None = None) -> float | None:
+        """
+        Returns how many seconds to wait for the agent's call before hedging it, or None to
+        not hedge. timeout is the call's deadline, the policy's by default.
+        """
+        if self.policy.hedge_percentile is None:
+            return None
+
+        recorder = self._recorder(agent)
+        if recorder.count < self.policy.hedge_min_samples:
+            return None
+
+        delay = recorder.percentile(self.policy.hedge_percentile) / 1000
+        timeout = timeout if timeout is not None else self.policy.timeout
+        # A hedge that could only be sent at the deadline would be wasted
+        if timeout is not None and delay >= timeout:
+            return None
+
+        return delay
+
+    def before_call(self, agent: str):
+        """Raises CircuitOpenError instead of letting the call through while the circuit is open."""
+        with self._lock:
+            self.calls += 1
+
+        if self.breaker is not None and not self.breaker.allow():
+            raise CircuitOpenError(f"Not calling the model for {agent}: the circuit is open")
+
+    def record_success(self, agent: str, latency_s: Optional[float] = None):
+        if latency_s is not None:
+            self._recorder(agent).record(latency_s * 1000)
+        if self.breaker is not None:
+            self.breaker.record_success()
+
+    def record_failure(self, error: Exception):
+        if not is_backend_failure(error):
+            if self.breaker is not None:
+                self.breaker.record_success()
+            return
+
+        with self._lock:
+            self.failures += 1
+            if isinstance(error, LLMTimeoutError):
+                self.timeouts += 1
+        if self.breaker is not None:
+            self.breaker.record_failure()
+
+    def record_hedge(self, won: Optional[bool] = None):
+        """Counts a hedge sent (won is None) or the result of one."""
+        with self._lock:
+            if won is None:
+                self.hedges_fired += 1
+            elif won:
+                self.hedges_won += 1
+
+        span = current_span()
+        if span is not None:
+            span.set_attribute("llm.hedged", True)
+            if won is not None:
+                span.set_attribute("llm.hedge_won", won)
+
+    def stats(self) -> dict[str, Any]:
+        """Returns the call, failure, timeout and hedge counters, and the state of the circuit."""
+        with self._lock:
+            stats = {"calls": self.calls, "failures": self.failures, "timeouts": self.timeouts,
+                     "hedges_fired": self.hedges_fired, "hedges_won": self.hedges_won}
+        stats["circuit"] = self.breaker.stats() if self.breaker is not None else None
+
+        return stats
+
+
+def _remaining(deadline: float | None) -> float | None:
+    return None if deadline is None else max(deadline - time.monotonic(), 0)
+
+
+def _timeout_error(agent: str, timeout: float | None, error: Exception) -> Exception:
+    """Returns the error to raise for a call that timed out, or error itself if it didn't."""
+    if not isinstance(error, (LLMTimeoutError, asyncio.TimeoutError, openai.APITimeoutError)):
+        return error
+
+    deadline = current_deadline()
+    # Running out of turn budget says nothing about the backend, so the breaker doesn't count it
+    if deadline is not None and deadline.expired:
+        return DeadlineExceeded(f"The model did not answer {agent} within the turn's {deadline.budget}s budget")
+
+    return LLMTimeoutError(f"The model did not answer {agent} within {timeout}s")
+
+
+class ResilientCompletions:
+    """
+    Drop-in for client.chat.completions that applies the resilience policy to each request.
+
+    Streamed requests are only given the deadline to open the stream; they are not
+    hedged, as the first chunks would already be on their way to the user.
+    """
+    def __init__(self, completions, agent: str, resilience: LLMResilience):
+        self._completions = completions
+        self._agent = agent
+        self._resilience = resilience
+
+    def create(self, **params):
+        check_deadline(f"the {self._agent} completion")
+        self._resilience.before_call(self._agent)
+        timeout = remaining_timeout(self._resilience.policy.timeout)
+        if timeout is not None:
+            # Also bounds the request itself, so an abandoned call doesn't keep its worker for long
+            params.setdefault("timeout", timeout)
+
+        start = time.monotonic()
+        try:
+            if params.get("stream"):
+                response = self._completions.create(**params)
+            else:
+                response = self._create(params, self._resilience.hedge_delay(self._agent, timeout), timeout)
+        except Exception as error:
+            error = _timeout_error(self._agent, timeout, error)
+            if not isinstance(error, DeadlineExceeded):
+                self._resilience.record_failure(error)
+            raise error
+
+        self._resilience.record_success(self._agent, None if params.get("stream") else time.monotonic() - start)
+        return response
+
+    def _submit(self, params: dict) -> Future:
+        return self._resilience.executor.submit(contextvars.copy_context().run, self._completions.create, **params)
+
+    def _create(self, params: dict, hedge_delay: float | None, timeout: float | None):
+        if timeout is None and hedge_delay is None:
+            return self._completions.create(**params)
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        primary = self._submit(params)
+        attempts = [primary]
+        if hedge_delay is not None and not wait(attempts, timeout=hedge_delay).done:
+            attempts.append(self._submit(params))
+            self._resilience.record_hedge()
+
+        pending = set(attempts)
+        error = None
+        while pending:
+            done, pending = wait(pending, timeout=_remaining(deadline), return_when=FIRST_COMPLETED)
+            if not done:
+                # A running request can't be interrupted, it finishes on its worker and is dropped
+                for attempt in pending:
+                    attempt.cancel()
+                raise LLMTimeoutError(f"The model did not answer {self._agent} within {timeout}s")
+
+            for attempt in done:
+                if attempt.exception() is None:
+                    if len(attempts) > 1:
+                        self._resilience.record_hedge(won=attempt is not primary)
+                    return attempt.result()
+
+                error = attempt.exception()
+
+        raise error
+
+
+class AsyncResilientCompletions(ResilientCompletions):
+    async def create(self, **params):
+        check_deadline(f"the {self._agent} completion")
+        self._resilience.before_call(self._agent)
+        timeout = remaining_timeout(self._resilience.policy.timeout)
+
+        start = time.monotonic()
+        try:
+            if params.get("stream"):
+                response = await asyncio.wait_for(self._completions.create(**params), timeout)
+            else:
+                response = await self._create(params, self._resilience.hedge_delay(self._agent, timeout), timeout)
+        except Exception as error:
+            error = _timeout_error(self._agent, timeout, error)
+            if not isinstance(error, DeadlineExceeded):
+                self._resilience.record_failure(error)
+            raise error
+
+        self._resilience.record_success(self._agent, None if params.get("stream") else time.monotonic() - start)
+        return response
+
+    async def _create(self, params: dict, hedge_delay: float | None, timeout: float | None):
+        if timeout is None and hedge_delay is None:
+            return await self._completions.create(**params)
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        primary = asyncio.ensure_future(self._completions.create(**params))
+        attempts = [primary]
+        try:
+            if hedge_delay is not None:
+                done, _ = await asyncio.wait(attempts, timeout=hedge_delay)
+                if not done:
+                    attempts.append(asyncio.ensure_future(self._completions.create(**params)))
+                    self._resilience.record_hedge()
+
+            pending = set(attempts)
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, timeout=_remaining(deadline),
+                                                   return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    raise LLMTimeoutError(f"The model did not answer {self._agent} within {timeout}s")
+
+                for attempt in done:
+                    if attempt.exception() is None:
+                        if len(attempts) > 1:
+                            self._resilience.record_hedge(won=attempt is not primary)
+                        return attempt.result()
+
+                    error = attempt.exception()
+
+            raise error
+        finally:
+            # Unlike threads, the losing request can be cancelled
+            for attempt in attempts:
+                attempt.cancel()
+
+
+class _Chat:
+    def __init__(self, completions: ResilientCompletions):
+        self.completions = completions
+
+
+class ResilientLLMClient:
+    """
+    Wraps an Azure OpenAI client (sync or async) so an agent's chat completions have a
+    deadline, are hedged with a duplicate request when they take unusually long, and
+    fail fast with CircuitOpenError while the backend is degraded.
+    """
+    def __init__(self, client, agent: str, resilience: LLMResilience, is_async: bool = False):
+        self._client = client
+        completions_type = AsyncResilientCompletions if is_async else ResilientCompletions
+        self.chat = _Chat(completions_type(client.chat.completions, agent, resilience))
+
+    def __getattr__(self, name: str):
+        return getattr(self._client, name)
+
+
+_llm_resilience: LLMResilience | None = None
+_llm_resilience_lock = threading.Lock()
+
+
+def get_llm_resilience() -> LLMResilience:
+    """Returns the process-wide resilience state, configured from the LLM_* environment variables."""
+    global _llm_resilience
+
+    if _llm_resilience is None:
+        with _llm_resilience_lock:
+            if _llm_resilience is None:
+                _llm_resilience = LLMResilience(policy=ResiliencePolicy.from_env())
+
+    return _llm_resilience
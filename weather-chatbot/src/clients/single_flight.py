@@ -0,0 +1,136 @@
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+from src.clients.loop_local import LoopLocal
+from src.deadline import DeadlineExceeded, check_deadline, current_deadline, deadline_scope, remaining_timeout
+from src.tracing import current_span
+
+
+DEFAULT_MAX_WORKERS = 32
+
+
+def _record_coalesced(coalesced: bool):
+    span = current_span()
+    if span is not None:
+        span.set_attribute("coalesced", coalesced)
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key into one.
+
+    The first caller for a key makes the call; callers arriving while it is in flight
+    wait for it and get its result (or its exception) instead of making their own.
+    Nothing is kept once the call completes, caching is left to the caller.
+
+    The shared call belongs to no turn in particular: it runs outside the first caller's
+    deadline (see src.deadline), bounded by the client's own timeouts, and each caller
+    waits for it only as long as its own turn's budget allows. A sync call made under a
+    deadline runs on a worker thread so its caller can stop waiting.
+
+    Threads share in-flight calls through do(). Coroutines share them through
+    do_async(), per event loop since an in-flight task can only be awaited on its own
+    loop. The shared task runs on its own, so a cancelled caller doesn't cancel it for
+    the others.
+    """
+    def __init__(self, executor: Optional[ThreadPoolExecutor] = None):
+        self._calls: dict[Hashable, Future] = {}
+        self._async_calls: LoopLocal[dict[Hashable, asyncio.Task]] = LoopLocal(dict)
+        self._executor = executor
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.coalesced = 0
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=DEFAULT_MAX_WORKERS,
+                                                        thread_name_prefix="SingleFlight")
+
+        return self._executor
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Returns fn(), or the result of the call already in flight for key."""
+        check_deadline(f"the call for {key}")
+
+        with self._lock:
+            future = self._calls.get(key)
+            coalesced = future is not None
+            if coalesced:
+                self.coalesced += 1
+            else:
+                future = self._calls[key] = Future()
+                self.calls += 1
+
+        _record_coalesced(coalesced)
+        if not coalesced:
+            if current_deadline() is None:
+                self._run(key, future, fn)
+            else:
+                self.executor.submit(contextvars.copy_context().run, self._run, key, future, fn)
+
+        done, _ = wait([future], timeout=remaining_timeout())
+        if not done:
+            raise DeadlineExceeded(f"No time left to wait for the call for {key}")
+
+        return future.result()
+
+    def _run(self, key: Hashable, future: Future, fn: Callable[[], Any]):
+        try:
+            with deadline_scope(None):
+                future.set_result(fn())
+        except BaseException as error:
+            future.set_exception(error)
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Async version of do, fn returns the awaitable to share."""
+        check_deadline(f"the call for {key}")
+
+        calls = self._async_calls.get()
+        task = calls.get(key)
+        coalesced = task is not None
+        if task is None:
+            task = asyncio.ensure_future(self._run_async(fn))
+            calls[key] = task
+            task.add_done_callback(lambda done: self._forget(calls, key, done))
+
+        with self._lock:
+            if coalesced:
+                self.coalesced += 1
+            else:
+                self.calls += 1
+
+        _record_coalesced(coalesced)
+        # Unlike wait_for, wait leaves the shared task running when this caller gives up
+        done, _ = await asyncio.wait([task], timeout=remaining_timeout())
+        if not done:
+            raise DeadlineExceeded(f"No time left to wait for the call for {key}")
+
+        return task.result()
+
+    @staticmethod
+    async def _run_async(fn: Callable[[], Awaitable[Any]]) -> Any:
+        # The task has its own copy of the context, this doesn't touch the caller's deadline
+        with deadline_scope(None):
+            return await fn()
+
+    @staticmethod
+    def _forget(calls: dict[Hashable, asyncio.Task], key: Hashable, task: asyncio.Task):
+        if calls.get(key) is task:
+            del calls[key]
+        # Marks the exception as retrieved in case every caller gave up on the task
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict[str, int]:
+        """Returns how many calls were made and how many requests were coalesced into them."""
+        with self._lock:
+            return {"calls": self.calls, "coalesced": self.coalesced}
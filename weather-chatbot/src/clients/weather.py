@@ -1,8 +1,20 @@
+import asyncio
+import httpx
 import requests
 import os
 import logging
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
 from enum import Enum
-from requests.exceptions import HTTPError
+from typing import Awaitable, Callable, Optional
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError as RequestsConnectionError, HTTPError, Timeout
+
+from src.clients.loop_local import LoopLocal
+from src.deadline import DeadlineExceeded, check_deadline, remaining_timeout
+from src.metrics import LatencyRecorder
 
 logger = logging.getLogger(__name__)
 
@@ -10,6 +22,16 @@ BASE_WEATHER_URI = "https://atlas.microsoft.com/weather/"
 FORMAT = "json"
 API_VERSION = "1.0"
 
+DEFAULT_CONNECT_TIMEOUT = 3.05
+DEFAULT_READ_TIMEOUT = 10.0
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF_FACTOR = 0.5
+DEFAULT_MAX_BACKOFF = 8.0
+# Longer Retry-After delays are given up on rather than waited for
+DEFAULT_MAX_RETRY_AFTER = 10.0
+DEFAULT_POOL_SIZE = 10
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
 
 class WeatherType(Enum):
     CURRENT_CONDITIONS = "currentConditions/"
@@ -17,10 +39,29 @@ class WeatherType(Enum):
     SEVERE_ALERTS = "severe/alerts/"
 
 
-class Weather():
-    @staticmethod
-    def get_weather(lat: float, lon: float, weather_type: WeatherType) -> str:
+class _RetryingWeatherClient:
+    """Timeouts, retry policy and metrics shared by the sync and async weather clients."""
+    def __init__(self,
+                 connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+                 read_timeout: float = DEFAULT_READ_TIMEOUT,
+                 max_retries: int = DEFAULT_MAX_RETRIES,
+                 backoff_factor: float = DEFAULT_BACKOFF_FACTOR,
+                 max_backoff: float = DEFAULT_MAX_BACKOFF,
+                 max_retry_after: float = DEFAULT_MAX_RETRY_AFTER):
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.max_retry_after = max_retry_after
+        self.latency = LatencyRecorder()
+        self._lock = threading.Lock()
+        self.retries = 0
+        self.errors = 0
 
+    @staticmethod
+    def _validate(lat: float, lon: float) -> str | None:
+        """Returns a message describing invalid coordinates, or None if they are valid."""
         if not Weather._is_float(lat) or not Weather._is_float(lon):
             return f"Coordinates must be valid floats: received lat: {lat} lon: {lon}"
 
@@ -28,19 +69,275 @@ class Weather():
             return f"Coordinates out of range: received lat {lat} lon {lon}, " \
                 "range for lat -90 - 90, range for lon -180 - 180"
 
+        return None
+
+    @staticmethod
+    def _request(lat: float, lon: float, weather_type: WeatherType) -> tuple[str, dict]:
+        # MAPS_ENDPOINT points the client at another Azure Maps host, like a local fake
+        endpoint = os.environ.get("MAPS_ENDPOINT")
+        base_uri = f"{endpoint.rstrip('/')}/weather/" if endpoint else BASE_WEATHER_URI
+
+        return base_uri + weather_type.value + FORMAT, {"api-version": API_VERSION,
+                                                         "query": f"{lat}, {lon}",
+                                                         "subscription-key": os.environ['MAPS_API_KEY']}
+
+    def _timeouts(self) -> tuple[float, float]:
+        """Connect and read timeouts of the next attempt, capped by the turn's remaining budget."""
+        check_deadline("the weather request")
+        return remaining_timeout(self.connect_timeout), remaining_timeout(self.read_timeout)
+
+    def _retry_delay(self, attempt: int, response=None) -> float | None:
+        """
+        Returns how long to wait before retrying, or None if the attempt shouldn't be retried.
+        Raises DeadlineExceeded if the retry doesn't fit in the turn's remaining budget.
+        """
+        if attempt >= self.max_retries:
+            return None
+
+        delay = None
+        if response is not None:
+            if response.status_code not in RETRY_STATUS_CODES:
+                return None
+
+            delay = self._retry_after(response)
+            if delay is not None and delay > self.max_retry_after:
+                logger.warning(f"Not retrying weather request, Retry-After of {delay:.2f}s is longer than "
+                               f"{self.max_retry_after}s")
+                return None
+
+        if delay is None:
+            delay = self._backoff(attempt)
+
+        remaining = remaining_timeout()
+        if remaining is not None and delay >= remaining:
+            raise DeadlineExceeded(f"No time left to retry the weather request in {delay:.2f}s")
+
+        return delay
+
+    def _backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff."""
+        return random.uniform(0, min(self.max_backoff, self.backoff_factor * (2 ** attempt)))
+
+    def _retry_after(self, response) -> float | None:
+        """Returns the Retry-After delay in seconds (plus a little jitter), or None if absent or unparsable."""
+        retry_after = response.headers.get("Retry-After") if response.headers else None
+        if not retry_after:
+            return None
+
         try:
-            response = requests.get(BASE_WEATHER_URI + weather_type.value + FORMAT,
-                                    params={"api-version": API_VERSION,
-                                            "query": f"{lat}, {lon}",
-                                            "subscription-key": os.environ['MAPS_API_KEY']})
+            delay = float(retry_after)
+        except ValueError:
+            try:
+                delay = parsedate_to_datetime(retry_after).timestamp() - time.time()
+            except (TypeError, ValueError):
+                return None
+
+        return max(delay, 0) + random.uniform(0, self.backoff_factor)
+
+    def _record_retry(self, attempt: int, delay: float):
+        self._count("retries")
+        logger.warning(f"Retrying weather request in {delay:.2f}s (attempt {attempt} of {self.max_retries})")
+
+    def _count(self, counter: str):
+        # One client is shared by every session's thread (and the prefetcher's)
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def stats(self) -> dict:
+        """Returns per-call latency percentiles along with retry and error counts."""
+        with self._lock:
+            counts = {"retries": self.retries, "errors": self.errors}
+
+        return {**self.latency.summary(), **counts}
+
+
+class WeatherClient(_RetryingWeatherClient):
+    """
+    Weather API client built around a persistent, pooled HTTP session.
+
+    Every call has connect and read timeouts, cut short by the turn's remaining budget
+    (see src.deadline). Connection errors, timeouts, 429s and 5xx responses are retried
+    with jittered exponential backoff, honouring Retry-After when the service sends it,
+    as long as the retry fits in the turn's budget and max_retry_after. Per-call latency is recorded for
+    monitoring.
+    """
+    def __init__(self,
+                 session: Optional[requests.Session] = None,
+                 pool_size: int = DEFAULT_POOL_SIZE,
+                 sleep: Callable[[float], None] = time.sleep,
+                 **kwargs):
+        super().__init__(**kwargs)
+        self.session = session if session is not None else self._create_session(pool_size)
+        self._sleep = sleep
+
+    @staticmethod
+    def _create_session(pool_size: int) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def get_weather(self, lat: float, lon: float, weather_type: WeatherType) -> str:
+
+        error = self._validate(lat, lon)
+        if error is not None:
+            return error
+
+        try:
+            response = self._get_with_retries(*self._request(lat, lon, weather_type))
             response.raise_for_status()
 
-        except HTTPError as ex:
+        except (HTTPError, RequestsConnectionError, Timeout) as ex:
+            self._count("errors")
             logger.exception(ex)
             raise ex
 
         return response.content
 
+    def _get_with_retries(self, url: str, params: dict) -> requests.Response:
+        attempt = 0
+        while True:
+            timeouts = self._timeouts()
+            start = time.perf_counter()
+            try:
+                response = self.session.get(url, params=params, timeout=timeouts)
+            except (RequestsConnectionError, Timeout):
+                delay = self._retry_delay(attempt)
+                if delay is None:
+                    raise
+            else:
+                delay = self._retry_delay(attempt, response)
+                if delay is None:
+                    return response
+            finally:
+                self.latency.record((time.perf_counter() - start) * 1000)
+
+            attempt += 1
+            self._record_retry(attempt, delay)
+            self._sleep(delay)
+
+    def close(self):
+        self.session.close()
+
+
+class AsyncWeatherClient(_RetryingWeatherClient):
+    """
+    Async counterpart of WeatherClient built on a pooled httpx.AsyncClient per event loop.
+
+    Errors are raised as httpx.HTTPStatusError or httpx.TransportError.
+    """
+    def __init__(self,
+                 pool_size: int = DEFAULT_POOL_SIZE,
+                 transport: Optional[httpx.AsyncBaseTransport] = None,
+                 sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+                 **kwargs):
+        super().__init__(**kwargs)
+        limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+        timeout = httpx.Timeout(self.read_timeout, connect=self.connect_timeout)
+        self._clients = LoopLocal(lambda: httpx.AsyncClient(limits=limits, timeout=timeout, transport=transport))
+        self._sleep = sleep
+
+    async def get_weather(self, lat: float, lon: float, weather_type: WeatherType) -> bytes | str:
+
+        error = self._validate(lat, lon)
+        if error is not None:
+            return error
+
+        try:
+            response = await self._get_with_retries(*self._request(lat, lon, weather_type))
+            response.raise_for_status()
+
+        except (httpx.HTTPStatusError, httpx.TransportError) as ex:
+            self._count("errors")
+            logger.exception(ex)
+            raise ex
+
+        return response.content
+
+    async def _get_with_retries(self, url: str, params: dict) -> httpx.Response:
+        client = self._clients.get()
+        attempt = 0
+        while True:
+            connect_timeout, read_timeout = self._timeouts()
+            start = time.perf_counter()
+            try:
+                response = await client.get(url, params=params,
+                                            timeout=httpx.Timeout(read_timeout, connect=connect_timeout))
+            except httpx.TransportError:
+                delay = self._retry_delay(attempt)
+                if delay is None:
+                    raise
+            else:
+                delay = self._retry_delay(attempt, response)
+                if delay is None:
+                    return response
+            finally:
+                self.latency.record((time.perf_counter() - start) * 1000)
+
+            attempt += 1
+            self._record_retry(attempt, delay)
+            await self._sleep(delay)
+
+    def close(self):
+        """Closes the HTTP clients on their event loop if it is still running."""
+        self._clients.close(lambda client: client.aclose())
+
+    async def aclose(self):
+        """Closes the HTTP client of the running event loop, call it before the loop ends."""
+        await self._clients.aclose(lambda client: client.aclose())
+
+
+_weather_client: WeatherClient | None = None
+_weather_client_lock = threading.Lock()
+
+
+_async_weather_client: AsyncWeatherClient | None = None
+
+
+def _client_settings() -> dict:
+    """Timeout and retry settings from the WEATHER_* environment variables."""
+    return {
+        "connect_timeout": float(os.environ.get("WEATHER_CONNECT_TIMEOUT") or DEFAULT_CONNECT_TIMEOUT),
+        "read_timeout": float(os.environ.get("WEATHER_READ_TIMEOUT") or DEFAULT_READ_TIMEOUT),
+        "max_retries": int(os.environ.get("WEATHER_MAX_RETRIES") or DEFAULT_MAX_RETRIES),
+        "max_retry_after": float(os.environ.get("WEATHER_MAX_RETRY_AFTER") or DEFAULT_MAX_RETRY_AFTER),
+    }
+
+
+def get_weather_client() -> WeatherClient:
+    """Returns the process-wide weather client, configured from the WEATHER_* environment variables."""
+    global _weather_client
+
+    if _weather_client is None:
+        with _weather_client_lock:
+            if _weather_client is None:
+                _weather_client = WeatherClient(**_client_settings())
+
+    return _weather_client
+
+
+def get_async_weather_client() -> AsyncWeatherClient:
+    """Returns the process-wide async weather client, configured from the WEATHER_* environment variables."""
+    global _async_weather_client
+
+    if _async_weather_client is None:
+        with _weather_client_lock:
+            if _async_weather_client is None:
+                _async_weather_client = AsyncWeatherClient(**_client_settings())
+
+    return _async_weather_client
+
+
+class Weather():
+    @staticmethod
+    def get_weather(lat: float, lon: float, weather_type: WeatherType) -> str:
+        return get_weather_client().get_weather(lat=lat, lon=lon, weather_type=weather_type)
+
+    @staticmethod
+    async def get_weather_async(lat: float, lon: float, weather_type: WeatherType) -> bytes | str:
+        return await get_async_weather_client().get_weather(lat=lat, lon=lon, weather_type=weather_type)
+
     @staticmethod
     def _is_float(num: str) -> bool:
         """
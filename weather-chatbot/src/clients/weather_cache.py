@@ -0,0 +1,234 @@
+import os
+import threading
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+from src.clients.cache import MISSING, SqliteStore, TTLCache
+from src.clients.single_flight import SingleFlight
+from src.clients.weather import Weather, WeatherType
+from src.deadline import skip_optional
+from src.tracing import SPAN_KIND_CLIENT, get_tracer
+
+
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+# A precision 5 cell is roughly 5km x 5km, so users in the same town share an entry
+DEFAULT_GEOHASH_PRECISION = 5
+DEFAULT_CACHE_SIZE = 2048
+DEFAULT_STORE_MAX_ENTRIES = 100000
+
+# Expired entries are kept this long to answer from when a turn has no time for a refresh
+DEFAULT_STALE_TTL = 6 * 60 * 60.0
+
+DEFAULT_TTLS = {
+    WeatherType.SEVERE_ALERTS: 5 * 60.0,
+    WeatherType.CURRENT_CONDITIONS: 15 * 60.0,
+    WeatherType.DAILY_FORECAST: 3 * 60 * 60.0,
+}
+
+
+def geohash(lat: float, lon: float, precision: int = DEFAULT_GEOHASH_PRECISION) -> str:
+    """Encodes coordinates as a geohash string of the given length."""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    use_lon = True
+
+    while len(chars) < precision:
+        value, value_range = (lon, lon_range) if use_lon else (lat, lat_range)
+        mid = (value_range[0] + value_range[1]) / 2
+
+        bits <<= 1
+        if value >= mid:
+            bits |= 1
+            value_range[0] = mid
+        else:
+            value_range[1] = mid
+
+        use_lon = not use_lon
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(GEOHASH_ALPHABET[bits])
+            bits = 0
+            bit_count = 0
+
+    return "".join(chars)
+
+
+class SqliteWeatherStore(SqliteStore):
+    """On-disk backend for the weather cache so entries survive restarts, capped at max_entries rows."""
+    def __init__(self, path: str, max_entries: int = DEFAULT_STORE_MAX_ENTRIES, **kwargs):
+        super().__init__(path, table="weather_cache", max_entries=max_entries, **kwargs)
+
+
+class WeatherCache:
+    """
+    Shared cache in front of the weather client.
+
+    Entries are keyed on the geohash cell of the coordinates plus the WeatherType, so
+    users asking about the same area share one upstream call. Each WeatherType has its
+    own TTL. The in-memory tier is a bounded LRU; an optional SqliteWeatherStore keeps
+    entries across restarts. Concurrent misses for the same entry share one fetch.
+
+    Expired entries are kept in memory for stale_ttl more seconds: when the turn's
+    budget is nearly spent (see src.deadline), the refresh is skipped and the stale
+    entry is used instead.
+    """
+    def __init__(self,
+                 ttls: Optional[dict[WeatherType, float]] = None,
+                 max_size: int = DEFAULT_CACHE_SIZE,
+                 precision: int = DEFAULT_GEOHASH_PRECISION,
+                 store: Optional[SqliteWeatherStore] = None,
+                 fetch: Callable[..., Any] = Weather.get_weather,
+                 async_fetch: Callable[..., Awaitable[Any]] = Weather.get_weather_async,
+                 clock: Callable[[], float] = time.time,
+                 single_flight: Optional[SingleFlight] = None,
+                 stale_ttl: float = DEFAULT_STALE_TTL):
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.precision = precision
+        self.store = store
+        self._fetch = fetch
+        self._async_fetch = async_fetch
+        self._clock = clock
+        self._memory = TTLCache(max_size=max_size, clock=clock)
+        self._stale = TTLCache(max_size=max_size, clock=clock)
+        self.stale_ttl = stale_ttl
+        self.single_flight = single_flight if single_flight is not None else SingleFlight()
+        self.disk_hits = 0
+
+        if self.store is not None:
+            self.store.prune(self._clock())
+
+    def key(self, lat: float, lon: float, weather_type: WeatherType) -> str:
+        return f"{weather_type.name}:{geohash(float(lat), float(lon), self.precision)}"
+
+    def get(self, lat: float, lon: float, weather_type: WeatherType) -> Any:
+        """Returns the cached weather data for the cell, or None on a miss."""
+        key = self.key(lat, lon, weather_type)
+
+        data = self._memory.get(key, MISSING)
+        if data is not MISSING:
+            return data
+
+        if self.store is not None:
+            row = self.store.get(key, self._clock())
+            if row is not None:
+                expires_at, data = row
+                self.disk_hits += 1
+                self._memory.set(key, data, ttl=expires_at - self._clock())
+                return data
+
+        return None
+
+    def set(self, lat: float, lon: float, weather_type: WeatherType, data: Any):
+        key = self.key(lat, lon, weather_type)
+        ttl = self.ttls[weather_type]
+
+        self._memory.set(key, data, ttl=ttl)
+        self._stale.set(key, data, ttl=ttl + self.stale_ttl)
+        if self.store is not None:
+            self.store.set(key, data, self._clock() + ttl)
+
+    @staticmethod
+    def _is_cacheable(lat: float, lon: float) -> bool:
+        # Invalid coordinates are left to the client to report, there is nothing to cache
+        return Weather._is_float(lat) and Weather._is_float(lon) \
+            and -90 <= float(lat) <= 90 and -180 <= float(lon) <= 180
+
+    def get_weather(self, lat: float, lon: float, weather_type: WeatherType) -> Any:
+        """Returns cached weather data for the cell, fetching it from the weather client on a miss."""
+        with get_tracer().span("weather.cache", SPAN_KIND_CLIENT, weather_type=weather_type.name) as span:
+            if not self._is_cacheable(lat, lon):
+                return self._fetch(lat=lat, lon=lon, weather_type=weather_type)
+
+            data = self.get(lat, lon, weather_type)
+            span.set_attribute("cache_hit", data is not None)
+            if data is not None:
+                return data
+
+            data = self._stale_data(lat, lon, weather_type)
+            span.set_attribute("stale", data is not None)
+            if data is not None:
+                return data
+
+            return self.single_flight.do(self.key(lat, lon, weather_type),
+                                         lambda: self._fetch_and_set(lat, lon, weather_type))
+
+    async def get_weather_async(self, lat: float, lon: float, weather_type: WeatherType) -> Any:
+        """Async version of get_weather, fetching from the async weather client on a miss."""
+        with get_tracer().span("weather.cache", SPAN_KIND_CLIENT, weather_type=weather_type.name) as span:
+            if not self._is_cacheable(lat, lon):
+                return await self._async_fetch(lat=lat, lon=lon, weather_type=weather_type)
+
+            data = self.get(lat, lon, weather_type)
+            span.set_attribute("cache_hit", data is not None)
+            if data is not None:
+                return data
+
+            data = self._stale_data(lat, lon, weather_type)
+            span.set_attribute("stale", data is not None)
+            if data is not None:
+                return data
+
+            return await self.single_flight.do_async(self.key(lat, lon, weather_type),
+                                                     lambda: self._fetch_and_set_async(lat, lon, weather_type))
+
+    def _stale_data(self, lat: float, lon: float, weather_type: WeatherType) -> Any:
+        """Returns the expired entry if there is one and the turn has no time to refresh it, otherwise None."""
+        data = self._stale.get(self.key(lat, lon, weather_type))
+        if data is None or not skip_optional("weather refresh"):
+            return None
+
+        return data
+
+    def _fetch_and_set(self, lat: float, lon: float, weather_type: WeatherType) -> Any:
+        data = self._fetch(lat=lat, lon=lon, weather_type=weather_type)
+        self.set(lat, lon, weather_type, data)
+
+        return data
+
+    async def _fetch_and_set_async(self, lat: float, lon: float, weather_type: WeatherType) -> Any:
+        data = await self._async_fetch(lat=lat, lon=lon, weather_type=weather_type)
+        self.set(lat, lon, weather_type, data)
+
+        return data
+
+    def stats(self) -> dict[str, int]:
+        """
+        Returns hit, miss and eviction counters for the cache, the size and evictions of
+        the disk tier if there is one, and how many fetches were coalesced.
+        """
+        stats = self._memory.stats()
+        stats["misses"] -= self.disk_hits
+        stats["disk_hits"] = self.disk_hits
+        if self.store is not None:
+            disk = self.store.stats()
+            stats["disk_size"] = disk["size"]
+            stats["disk_evictions"] = disk["evictions"]
+        stats["coalesced"] = self.single_flight.stats()["coalesced"]
+
+        return stats
+
+
+_weather_cache: WeatherCache | None = None
+_weather_cache_lock = threading.Lock()
+
+
+def get_weather_cache() -> WeatherCache:
+    """
+    Returns the process-wide weather cache, persisted to WEATHER_CACHE_PATH (capped at
+    WEATHER_CACHE_MAX_ENTRIES rows) if it is set.
+    """
+    global _weather_cache
+
+    if _weather_cache is None:
+        with _weather_cache_lock:
+            if _weather_cache is None:
+                path = os.environ.get("WEATHER_CACHE_PATH")
+                max_entries = int(os.environ.get("WEATHER_CACHE_MAX_ENTRIES") or DEFAULT_STORE_MAX_ENTRIES)
+                store = SqliteWeatherStore(path, max_entries=max_entries) if path else None
+                _weather_cache = WeatherCache(store=store)
+
+    return _weather_cache
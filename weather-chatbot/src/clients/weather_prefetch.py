@@ -0,0 +1,212 @@
+import asyncio
+import contextvars
+import logging
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Iterable, Optional
+
+from src.clients.cache import TTLCache
+from src.clients.loop_local import LoopLocal
+from src.clients.weather import WeatherType
+from src.clients.weather_cache import WeatherCache, get_weather_cache
+from src.deadline import remaining_timeout
+from src.tracing import get_tracer
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_IN_FLIGHT = 3
+
+# Prefetched results that nobody asks for are dropped after this long
+DEFAULT_PENDING_TTL = 5 * 60.0
+DEFAULT_PENDING_SIZE = 1024
+
+
+class PrefetchPolicy:
+    """Which weather types to fetch ahead of time, and how many fetches may run at once."""
+    def __init__(self,
+                 enabled: bool = True,
+                 weather_types: Iterable[WeatherType] = tuple(WeatherType),
+                 max_in_flight: int = DEFAULT_MAX_IN_FLIGHT):
+        if max_in_flight <= 0:
+            raise ValueError(f"max_in_flight must be positive: received {max_in_flight}")
+
+        self.enabled = enabled
+        self.weather_types = tuple(weather_types)
+        self.max_in_flight = max_in_flight
+
+    @classmethod
+    def from_env(cls) -> "PrefetchPolicy":
+        """
+        Reads the policy from WEATHER_PREFETCH ("true" to enable), WEATHER_PREFETCH_TYPES
+        (comma separated WeatherType names) and WEATHER_PREFETCH_MAX_IN_FLIGHT.
+        """
+        enabled = (os.environ.get("WEATHER_PREFETCH") or "false").lower() == "true"
+        types = os.environ.get("WEATHER_PREFETCH_TYPES")
+        weather_types = [WeatherType[name.strip().upper()] for name in types.split(",")] if types \
+            else tuple(WeatherType)
+        max_in_flight = int(os.environ.get("WEATHER_PREFETCH_MAX_IN_FLIGHT") or DEFAULT_MAX_IN_FLIGHT)
+
+        return cls(enabled=enabled, weather_types=weather_types, max_in_flight=max_in_flight)
+
+
+class WeatherPrefetcher:
+    """
+    Speculatively fetches weather data as soon as a user's location is known.
+
+    Once a location resolves, the next step is a weather lookup for one of a few
+    WeatherTypes, so prefetch() starts fetches for all of the policy's types in the
+    background. get_weather() then picks up the in-flight or finished result instead
+    of starting its own call, and falls back to the weather cache for anything that
+    was not prefetched. When the policy is disabled prefetch() does nothing.
+    """
+    def __init__(self,
+                 policy: Optional[PrefetchPolicy] = None,
+                 cache: Optional[WeatherCache] = None,
+                 executor: Optional[ThreadPoolExecutor] = None):
+        self.policy = policy if policy is not None else PrefetchPolicy()
+        self.cache = cache if cache is not None else get_weather_cache()
+        self._executor = executor
+        self._executor_lock = threading.Lock()
+        self._semaphores = LoopLocal(lambda: asyncio.Semaphore(self.policy.max_in_flight))
+        self._pending = TTLCache(max_size=DEFAULT_PENDING_SIZE, ttl=DEFAULT_PENDING_TTL)
+        self._lock = threading.Lock()
+        self.prefetched = 0
+        self.used = 0
+        self.failed = 0
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        # The pool size is what bounds the number of in-flight fetches
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.policy.max_in_flight,
+                                                        thread_name_prefix="WeatherPrefetcher")
+
+        return self._executor
+
+    def _keys(self, lat: float, lon: float) -> list[tuple[WeatherType, str]]:
+        if not self.policy.enabled or not self.cache._is_cacheable(lat, lon):
+            return []
+
+        return [(weather_type, self.cache.key(lat, lon, weather_type)) for weather_type in self.policy.weather_types]
+
+    def _add_pending(self, key: str, pending: Any):
+        self._pending.set(key, pending)
+        with self._lock:
+            self.prefetched += 1
+
+    def _take_pending(self, key: str) -> Any:
+        pending = self._pending.get(key)
+        if pending is not None:
+            self._pending.delete(key)
+
+        return pending
+
+    def prefetch(self, lat: float, lon: float):
+        """Starts background fetches for the policy's weather types at the given coordinates."""
+        for weather_type, key in self._keys(lat, lon):
+            if self._pending.get(key) is not None:
+                continue
+
+            # Run in a copy of the caller's context so the fetch is traced as part of the turn
+            self._add_pending(key, self.executor.submit(
+                contextvars.copy_context().run, self.cache.get_weather, lat=lat, lon=lon, weather_type=weather_type))
+
+    async def prefetch_async(self, lat: float, lon: float):
+        """Starts background tasks on the running loop for the policy's weather types."""
+        for weather_type, key in self._keys(lat, lon):
+            if self._pending.get(key) is not None:
+                continue
+
+            self._add_pending(key, asyncio.ensure_future(self._fetch_async(lat, lon, weather_type)))
+
+    async def _fetch_async(self, lat: float, lon: float, weather_type: WeatherType) -> Any:
+        async with self._semaphores.get():
+            return await self.cache.get_weather_async(lat=lat, lon=lon, weather_type=weather_type)
+
+    def _record_use(self, key: str, error: Exception | None):
+        with self._lock:
+            if error is None:
+                self.used += 1
+            else:
+                self.failed += 1
+
+        if error is not None:
+            logger.warning(f"Prefetch of {key} failed, fetching again: {error}")
+
+    def get_weather(self, lat: float, lon: float, weather_type: WeatherType) -> Any:
+        """Returns the prefetched weather data if there is any, otherwise reads through the weather cache."""
+        with get_tracer().span("weather.get", weather_type=weather_type.name) as span:
+            key = self.cache.key(lat, lon, weather_type) if self.cache._is_cacheable(lat, lon) else None
+            pending = self._take_pending(key) if key is not None else None
+
+            # Tasks scheduled by prefetch_async belong to an event loop and cannot be waited on here
+            span.set_attribute("prefetched", isinstance(pending, Future))
+            if isinstance(pending, Future):
+                try:
+                    data = pending.result(timeout=remaining_timeout())
+                    self._record_use(key, None)
+                    return data
+                except Exception as error:
+                    self._record_use(key, error)
+
+            return self.cache.get_weather(lat=lat, lon=lon, weather_type=weather_type)
+
+    async def get_weather_async(self, lat: float, lon: float, weather_type: WeatherType) -> Any:
+        """Async version of get_weather."""
+        with get_tracer().span("weather.get", weather_type=weather_type.name) as span:
+            key = self.cache.key(lat, lon, weather_type) if self.cache._is_cacheable(lat, lon) else None
+            pending = self._take_pending(key) if key is not None else None
+
+            if isinstance(pending, Future):
+                pending = asyncio.wrap_future(pending)
+
+            span.set_attribute("prefetched", pending is not None)
+            if pending is not None:
+                try:
+                    data = await asyncio.wait_for(pending, remaining_timeout())
+                    self._record_use(key, None)
+                    return data
+                except Exception as error:
+                    self._record_use(key, error)
+
+            return await self.cache.get_weather_async(lat=lat, lon=lon, weather_type=weather_type)
+
+    def stats(self) -> dict[str, int | float | None]:
+        """Returns how many fetches were prefetched, how many were used, and the resulting usage rate."""
+        with self._lock:
+            prefetched, used, failed = self.prefetched, self.used, self.failed
+
+        pending = len(self._pending)
+
+        return {
+            "prefetched": prefetched,
+            "used": used,
+            "failed": failed,
+            "pending": pending,
+            "wasted": prefetched - used - failed - pending,
+            "usage_rate": used / prefetched if prefetched else None,
+        }
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_weather_prefetcher: WeatherPrefetcher | None = None
+_weather_prefetcher_lock = threading.Lock()
+
+
+def get_weather_prefetcher() -> WeatherPrefetcher:
+    """Returns the process-wide prefetcher, configured from the WEATHER_PREFETCH* environment variables."""
+    global _weather_prefetcher
+
+    if _weather_prefetcher is None:
+        with _weather_prefetcher_lock:
+            if _weather_prefetcher is None:
+                _weather_prefetcher = WeatherPrefetcher(policy=PrefetchPolicy.from_env())
+
+    return _weather_prefetcher
@@ -0,0 +1,149 @@
+import json
+import logging
+from typing import Any, Callable
+
+from src.clients.weather import WeatherType
+
+
+logger = logging.getLogger(__name__)
+
+
+def _get(data: Any, *path: str | int) -> Any:
+    """Returns the value at path in nested dicts and lists, or None if any part is missing."""
+    for key in path:
+        try:
+            data = data[key]
+        except (KeyError, IndexError, TypeError):
+            return None
+
+    return data
+
+
+def _measure(data: Any) -> str | None:
+    """Renders an Azure Maps {"value": ..., "unit": ...} measurement, e.g. 15.2C."""
+    value = _get(data, "value")
+    if value is None:
+        return None
+
+    return f"{value}{_get(data, 'unit') or ''}"
+
+
+def _join(parts: list[str | None], separator: str = ", ") -> str:
+    return separator.join(part for part in parts if part)
+
+
+def _labelled(label: str, value: Any, suffix: str = "") -> str | None:
+    return f"{label} {value}{suffix}" if value is not None else None
+
+
+def _project_current_conditions(data: dict) -> str:
+    lines = []
+    for result in _get(data, "results") or []:
+        wind = _join([_get(result, "wind", "direction", "localizedDescription"), _measure(_get(result, "wind", "speed"))],
+                     " ")
+        lines.append(_join([
+            _get(result, "dateTime"),
+            _get(result, "phrase"),
+            _measure(_get(result, "temperature")),
+            _labelled("feels like", _measure(_get(result, "realFeelTemperature"))),
+            _labelled("humidity", _get(result, "relativeHumidity"), "%"),
+            _labelled("wind", wind or None),
+            _labelled("gusts", _measure(_get(result, "windGust", "speed"))),
+            _labelled("UV", _get(result, "uvIndexPhrase")),
+            _labelled("cloud cover", _get(result, "cloudCover"), "%"),
+            _labelled("precipitation past hour", _measure(_get(result, "precipitationSummary", "pastHour"))),
+            _labelled("past 24h", _measure(_get(result, "precipitationSummary", "past24Hours"))),
+        ]))
+
+    return "\n".join(lines) or "No current conditions available"
+
+
+def _project_half_day(label: str, half_day: dict | None) -> str | None:
+    if not half_day:
+        return None
+
+    precipitation = None
+    if _get(half_day, "hasPrecipitation"):
+        precipitation = _join([_get(half_day, "precipitationIntensity"), _get(half_day, "precipitationType")], " ")
+
+    return f"{label}: " + _join([
+        _get(half_day, "iconPhrase"),
+        _labelled("precipitation", _get(half_day, "precipitationProbability"), "%"),
+        precipitation,
+        _labelled("total", _measure(_get(half_day, "totalLiquid"))),
+        _labelled("thunderstorms", _get(half_day, "thunderstormProbability"), "%"),
+        _labelled("wind", _measure(_get(half_day, "wind", "speed"))),
+    ])
+
+
+def _project_daily_forecast(data: dict) -> str:
+    lines = []
+
+    summary = _get(data, "summary", "phrase")
+    if summary:
+        lines.append(f"Summary: {summary}")
+
+    for forecast in _get(data, "forecasts") or []:
+        minimum = _measure(_get(forecast, "temperature", "minimum"))
+        maximum = _measure(_get(forecast, "temperature", "maximum"))
+        date = (_get(forecast, "date") or "")[:10]
+        lines.append(f"{date}: " + _join([
+            f"{minimum} to {maximum}" if minimum and maximum else None,
+            _labelled("sun", _get(forecast, "hoursOfSun"), "h"),
+            _project_half_day("day", _get(forecast, "day")),
+            _project_half_day("night", _get(forecast, "night")),
+        ], "; "))
+
+    return "\n".join(lines) or "No forecast available"
+
+
+def _project_severe_alerts(data: dict) -> str:
+    lines = []
+    for alert in _get(data, "results") or []:
+        description = _get(alert, "description", "english") or _get(alert, "description", "localized")
+        header = _join([description, _get(alert, "category"), _labelled("priority", _get(alert, "priority"))])
+        for area in _get(alert, "alertAreas") or [None]:
+            lines.append(_join([
+                header,
+                _get(area, "name"),
+                _get(area, "summary"),
+                _labelled("from", _get(area, "startTime")),
+                _labelled("until", _get(area, "endTime")),
+            ]))
+
+    return "\n".join(lines) or "No active severe weather alerts"
+
+
+PROJECTIONS: dict[WeatherType, Callable[[dict], str]] = {
+    WeatherType.CURRENT_CONDITIONS: _project_current_conditions,
+    WeatherType.DAILY_FORECAST: _project_daily_forecast,
+    WeatherType.SEVERE_ALERTS: _project_severe_alerts,
+}
+
+
+def project_weather(weather_data: bytes | str | None, weather_type: WeatherType) -> str | None:
+    """
+    Reduces a raw Azure Maps weather response to the fields that help answer questions
+    about the WeatherType (temperatures, precipitation, alert summaries, day ranges),
+    rendered as one compact line per result. Anything that is not a JSON response, like
+    the client's coordinate validation messages, is passed through as text.
+    """
+    if weather_data is None:
+        return None
+
+    text = weather_data.decode("utf-8", errors="replace") if isinstance(weather_data, bytes) else weather_data
+
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return text
+
+    if not isinstance(data, dict):
+        return text
+
+    try:
+        return PROJECTIONS[weather_type](data)
+    except Exception:
+        # The raw payload still answers the question, just less efficiently
+        logger.exception(f"Failed to project {weather_type.name} weather data")
+        return text
@@ -1,20 +1,56 @@
+import json
+import struct
+import sys
+import zlib
+
 from src.clients.weather import WeatherType
+from src.transcript import Transcript
+
+
+SNAPSHOT_MAGIC = b"CTX"
+SNAPSHOT_VERSION = 1
+# Magic, schema version and flags
+SNAPSHOT_HEADER = struct.Struct("!3sBB")
+SNAPSHOT_COMPRESSED = 0x01
+# Smaller payloads are stored as is, compressing them saves little and costs time
+SNAPSHOT_COMPRESS_THRESHOLD = 1024
 
 
 class Context:
-    """Holds the conversation context."""
+    """
+    Holds the conversation context.
+
+    A context can be snapshotted with to_bytes and restored with from_bytes, so a
+    session can be kept in an external store and resumed by any worker. Snapshots
+    carry a schema version; from_bytes rejects versions it does not know.
+    """
+    __slots__ = ("_messages", "_transcript", "_location", "_location_description", "_weather_category",
+                 "_location_summary", "_location_checked_upto", "_history_summary", "_history_summary_upto")
+
     def __init__(self):
         self._messages = []
+        self._transcript = Transcript(self._messages)
         self._location: tuple[float, float] | None = None
         self._location_description: str | None = None
         self._weather_category: WeatherType | None = None
+        self._location_summary: str | None = None
+        self._location_checked_upto = 0
+        self._history_summary: str | None = None
+        self._history_summary_upto = 0
 
     def add_message(self, role: str, message: str):
-        self._messages += [{"role": role, "content": message}]
+        # Roles repeat on every message, interning them keeps a single copy of each
+        self._messages += [{"role": sys.intern(role), "content": message}]
+        self._transcript.sync(self._messages)
 
     def get_messages(self):
         return self._messages
 
+    @property
+    def transcript(self) -> Transcript:
+        """Rendered message history, use this rather than flattening get_messages() again."""
+        return self._transcript.sync(self._messages)
+
     @property
     def location(self):
         return self._location
@@ -38,3 +74,92 @@ class Context:
     @weather_category.setter
     def weather_category(self, value: str):
         self._weather_category = value
+
+    @property
+    def location_summary(self):
+        """Compact description of the resolved location, as last extracted from the conversation."""
+        return self._location_summary
+
+    @location_summary.setter
+    def location_summary(self, value: str):
+        self._location_summary = value
+
+    @property
+    def location_checked_upto(self):
+        """Number of messages already taken into account when extracting the location."""
+        return self._location_checked_upto
+
+    @location_checked_upto.setter
+    def location_checked_upto(self, value: int):
+        self._location_checked_upto = value
+
+    @property
+    def history_summary(self):
+        """Rolling summary of the messages before history_summary_upto."""
+        return self._history_summary
+
+    @history_summary.setter
+    def history_summary(self, value: str):
+        self._history_summary = value
+
+    @property
+    def history_summary_upto(self):
+        """Number of messages folded into history_summary."""
+        return self._history_summary_upto
+
+    @history_summary_upto.setter
+    def history_summary_upto(self, value: int):
+        self._history_summary_upto = value
+
+    def to_bytes(self) -> bytes:
+        """Serializes the context into a versioned binary snapshot."""
+        state = {
+            "messages": [[m["role"], m["content"]] for m in self._messages],
+            "location": self._location,
+            "location_description": self._location_description,
+            "weather_category": self._weather_category.name if self._weather_category is not None else None,
+            "location_summary": self._location_summary,
+            "location_checked_upto": self._location_checked_upto,
+            "history_summary": self._history_summary,
+            "history_summary_upto": self._history_summary_upto,
+        }
+        payload = json.dumps(state, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+        flags = 0
+        if len(payload) > SNAPSHOT_COMPRESS_THRESHOLD:
+            payload = zlib.compress(payload, 1)
+            flags |= SNAPSHOT_COMPRESSED
+
+        return SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, flags) + payload
+
+    @classmethod
+    def from_bytes(cls, snapshot: bytes) -> "Context":
+        """Restores a context from a snapshot made by to_bytes."""
+        if len(snapshot) < SNAPSHOT_HEADER.size:
+            raise ValueError("Context snapshot is truncated")
+
+        magic, version, flags = SNAPSHOT_HEADER.unpack_from(snapshot)
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError("Not a context snapshot")
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported context snapshot version: received {version}, "
+                             f"supported {SNAPSHOT_VERSION}")
+
+        payload = snapshot[SNAPSHOT_HEADER.size:]
+        if flags & SNAPSHOT_COMPRESSED:
+            payload = zlib.decompress(payload)
+        state = json.loads(payload)
+
+        context = cls()
+        context._messages += [{"role": sys.intern(role), "content": content} for role, content in state["messages"]]
+        context._location = tuple(state["location"]) if state["location"] is not None else None
+        context._location_description = state["location_description"]
+        context._weather_category = WeatherType[state["weather_category"]] \
+            if state["weather_category"] is not None else None
+        context._location_summary = state["location_summary"]
+        context._location_checked_upto = state["location_checked_upto"]
+        # Added without a version bump, older snapshots simply have no summary yet
+        context._history_summary = state.get("history_summary")
+        context._history_summary_upto = state.get("history_summary_upto", 0)
+
+        return context
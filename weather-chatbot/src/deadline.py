@@ -0,0 +1,113 @@
+import contextlib
+import contextvars
+import logging
+import threading
+import time
+from typing import Callable, Iterator, Optional
+
+from src.tracing import current_span
+
+
+logger = logging.getLogger(__name__)
+
+# Share of the turn budget kept for the steps that produce the reply, see skip_optional
+DEFAULT_RESERVE_FRACTION = 0.25
+
+_deadline: contextvars.ContextVar[Optional["Deadline"]] = contextvars.ContextVar("turn_deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """The turn's latency budget ran out before a downstream call could be made."""
+
+
+class Deadline:
+    """
+    Point in time by which the current turn should be answered.
+
+    Downstream calls take the remaining budget (capped by their own timeout) as their
+    timeout. Optional steps are skipped once less than reserve seconds are left, keeping
+    that time for the steps the reply can't do without.
+    """
+    def __init__(self,
+                 budget: float,
+                 reserve: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        if budget <= 0:
+            raise ValueError(f"budget must be positive: received {budget}")
+
+        self.budget = budget
+        self.reserve = reserve if reserve is not None else budget * DEFAULT_RESERVE_FRACTION
+        self._clock = clock
+        self.expires_at = clock() + budget
+        self._lock = threading.Lock()
+        self.skipped: list[str] = []
+
+    def remaining(self) -> float:
+        return max(self.expires_at - self._clock(), 0.0)
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def timeout(self, default: Optional[float] = None) -> float:
+        """Returns the remaining budget, or default if that is shorter."""
+        remaining = self.remaining()
+        return remaining if default is None else min(default, remaining)
+
+    def check(self, step: str):
+        """Raises DeadlineExceeded if there is no budget left for step."""
+        if self.expired:
+            raise DeadlineExceeded(f"No time left for {step}: the turn's {self.budget}s budget is spent")
+
+    def nearly_spent(self) -> bool:
+        return self.remaining() < self.reserve
+
+    def record_skip(self, step: str):
+        with self._lock:
+            self.skipped.append(step)
+
+
+@contextlib.contextmanager
+def deadline_scope(deadline: Optional[Deadline]) -> Iterator[Optional[Deadline]]:
+    """Makes deadline the current one inside the block (and the tasks and worker calls it starts)."""
+    token = _deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _deadline.reset(token)
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _deadline.get()
+
+
+def remaining_timeout(default: Optional[float] = None) -> Optional[float]:
+    """Returns the timeout for a downstream call: default, capped by the current turn's remaining budget."""
+    deadline = current_deadline()
+    return default if deadline is None else deadline.timeout(default)
+
+
+def check_deadline(step: str):
+    """Raises DeadlineExceeded if the current turn has no budget left for step."""
+    deadline = current_deadline()
+    if deadline is not None:
+        deadline.check(step)
+
+
+def skip_optional(step: str) -> bool:
+    """
+    Returns True if step, which the turn can do without, should be skipped because the
+    current turn's budget is nearly spent. Skips are recorded on the deadline and the
+    current span.
+    """
+    deadline = current_deadline()
+    if deadline is None or not deadline.nearly_spent():
+        return False
+
+    deadline.record_skip(step)
+    logger.info(f"Skipping {step}, {deadline.remaining() * 1000:.0f}ms of the turn budget left")
+    span = current_span()
+    if span is not None:
+        span.set_attribute("skipped", step)
+
+    return True
@@ -11,8 +11,9 @@ def main():
 
     user_message = None
     while user_message != '':
-        reply = orchestrator.get_reply(user_message, context)
-        print(reply)
+        for chunk in orchestrator.stream_reply(user_message, context):
+            print(chunk, end='', flush=True)
+        print()
         user_message = input(">")
 
 
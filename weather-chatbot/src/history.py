@@ -0,0 +1,182 @@
+import inspect
+import logging
+import os
+import threading
+from typing import Awaitable, Callable
+
+from src.clients.llm_interface import get_async_llm_client, get_llm_client
+from src.context import Context
+from src.deadline import skip_optional
+from src.metrics import estimate_tokens
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_KEEP_TURNS = 4
+DEFAULT_TOKEN_BUDGET = 1500
+
+Summarize = Callable[[str | None, str], str]
+SummarizeAsync = Callable[[str | None, str], Awaitable[str]]
+
+
+def _summary_messages(summary: str | None, transcript: str) -> list[dict]:
+
+    system_prompt = inspect.cleandoc(f"""
+        You are summarizing a conversation between a user and a weather assistant so that it
+        can be continued without the full transcript. Update the summary so far with the new
+        messages. Keep the user's location, the weather topics they asked about, the answers
+        they were given and any open questions. Reply with the summary only, in at most a few sentences.
+
+        Summary so far:
+        ```
+        {summary or 'None'}
+        ```
+
+        New messages:
+        ```
+        {transcript}
+        ```
+        """)
+
+    return [{"role": "system", "content": system_prompt}]
+
+
+def summarize(summary: str | None, transcript: str) -> str:
+    """Folds transcript into the summary with the LLM."""
+    response = get_llm_client(agent="HistoryManager").chat.completions.create(
+        temperature=0,
+        model=os.environ["OPENAI_DEPLOYMENT_NAME"],
+        messages=_summary_messages(summary, transcript))
+
+    return response.choices[0].message.content
+
+
+async def summarize_async(summary: str | None, transcript: str) -> str:
+    response = await get_async_llm_client(agent="HistoryManager").chat.completions.create(
+        temperature=0,
+        model=os.environ["OPENAI_DEPLOYMENT_NAME"],
+        messages=_summary_messages(summary, transcript))
+
+    return response.choices[0].message.content
+
+
+class HistoryManager:
+    """
+    Renders the message history for a prompt within a token budget.
+
+    The most recent messages are kept verbatim and older ones are folded into a rolling
+    summary kept in the Context. The verbatim window grows to twice keep_turns before
+    the oldest keep_turns are folded, so the summary is refreshed once every keep_turns
+    turns rather than on every message. If the window exceeds token_budget anyway
+    (long messages), more of it is folded, always keeping the latest turn verbatim.
+    Folding is put off to a later turn when the turn's budget is nearly spent.
+    """
+    def __init__(self,
+                 keep_turns: int = DEFAULT_KEEP_TURNS,
+                 token_budget: int = DEFAULT_TOKEN_BUDGET,
+                 summarize: Summarize = summarize,
+                 summarize_async: SummarizeAsync = summarize_async):
+        if keep_turns <= 0:
+            raise ValueError(f"keep_turns must be positive: received {keep_turns}")
+
+        # A turn is a user message and the assistant's reply
+        self.keep_messages = 2 * keep_turns
+        self.token_budget = token_budget
+        self._summarize = summarize
+        self._summarize_async = summarize_async
+        self._lock = threading.Lock()
+        self.turns = 0
+        self.summaries = 0
+        self.prompt_tokens = 0
+        self.full_history_tokens = 0
+
+    def render(self, context: Context) -> str:
+        """Returns the summary (if any) followed by the verbatim window, folding the history first if needed."""
+        fold_upto = self._fold_upto(context)
+        if fold_upto is not None:
+            self._apply(context, fold_upto, self._summarize(
+                context.history_summary, context.transcript.render(start=context.history_summary_upto, end=fold_upto)))
+
+        return self._render(context)
+
+    async def render_async(self, context: Context) -> str:
+        fold_upto = self._fold_upto(context)
+        if fold_upto is not None:
+            self._apply(context, fold_upto, await self._summarize_async(
+                context.history_summary, context.transcript.render(start=context.history_summary_upto, end=fold_upto)))
+
+        return self._render(context)
+
+    def _fold_upto(self, context: Context) -> int | None:
+        """Returns how many messages the summary should cover after this turn, or None to keep it as is."""
+        transcript = context.transcript
+        message_count = len(transcript)
+        fold_upto = context.history_summary_upto
+
+        if message_count - fold_upto >= 2 * self.keep_messages:
+            fold_upto = message_count - self.keep_messages
+
+        # The summary is budgeted at its current size, the new one is expected to be similar
+        summary_tokens = estimate_tokens(context.history_summary or "")
+        lines = transcript.lines()
+        window_tokens = sum(estimate_tokens(line) for line in lines[fold_upto:])
+        while summary_tokens + window_tokens > self.token_budget and fold_upto < message_count - 2:
+            window_tokens -= estimate_tokens(lines[fold_upto])
+            fold_upto += 1
+
+        if fold_upto <= context.history_summary_upto or skip_optional("history summary"):
+            return None
+
+        return fold_upto
+
+    def _apply(self, context: Context, fold_upto: int, summary: str):
+        context.history_summary = summary
+        context.history_summary_upto = fold_upto
+
+        with self._lock:
+            self.summaries += 1
+
+    def _render(self, context: Context) -> str:
+        window = context.transcript.render(start=context.history_summary_upto)
+        rendered = f"Summary of the earlier conversation: {context.history_summary}\n{window}" \
+            if context.history_summary else window
+
+        prompt_tokens = estimate_tokens(rendered)
+        full_history_tokens = estimate_tokens(context.transcript.render())
+        logger.debug(f"History prompt tokens: {prompt_tokens} (full history {full_history_tokens})")
+
+        with self._lock:
+            self.turns += 1
+            self.prompt_tokens += prompt_tokens
+            self.full_history_tokens += full_history_tokens
+
+        return rendered
+
+    def stats(self) -> dict[str, int | float | None]:
+        """Returns the history tokens sent so far against what the full history would have cost."""
+        with self._lock:
+            return {
+                "turns": self.turns,
+                "summaries": self.summaries,
+                "prompt_tokens": self.prompt_tokens,
+                "full_history_tokens": self.full_history_tokens,
+                "saved_ratio": 1 - self.prompt_tokens / self.full_history_tokens if self.full_history_tokens else None,
+            }
+
+
+_history_manager: HistoryManager | None = None
+_history_manager_lock = threading.Lock()
+
+
+def get_history_manager() -> HistoryManager:
+    """Returns the process-wide history manager, configured from HISTORY_KEEP_TURNS and HISTORY_TOKEN_BUDGET."""
+    global _history_manager
+
+    if _history_manager is None:
+        with _history_manager_lock:
+            if _history_manager is None:
+                _history_manager = HistoryManager(
+                    keep_turns=int(os.environ.get("HISTORY_KEEP_TURNS") or DEFAULT_KEEP_TURNS),
+                    token_budget=int(os.environ.get("HISTORY_TOKEN_BUDGET") or DEFAULT_TOKEN_BUDGET))
+
+    return _history_manager
@@ -0,0 +1,76 @@
+"""
+Deferred imports of heavy SDKs (openai, azure.maps.search, mlflow, azureml, pandas).
+
+    mlflow = lazy_import("mlflow")
+    AzureOpenAI = lazy_import("openai", "AzureOpenAI")
+
+binds a module level name to a placeholder that imports the module (and looks up the
+attribute) the first time it is used, so importing an entry point or collecting tests
+doesn't pay for SDKs the run never touches. The placeholder forwards calls, attribute
+access and isinstance checks to the real object, and stays a module attribute that
+unittest.mock.patch can replace. Annotations and except clauses need the real object;
+use string annotations and import inside the function respectively.
+"""
+import importlib
+import threading
+from typing import Any, Optional
+
+
+class LazyImport:
+    """Placeholder for a module, or an attribute of a module, imported on first use."""
+    __slots__ = ("_module", "_attribute", "_target", "_lock")
+
+    def __init__(self, module: str, attribute: Optional[str] = None):
+        object.__setattr__(self, "_module", module)
+        object.__setattr__(self, "_attribute", attribute)
+        object.__setattr__(self, "_target", None)
+        object.__setattr__(self, "_lock", threading.Lock())
+
+    def _load(self) -> Any:
+        target = object.__getattribute__(self, "_target")
+        if target is None:
+            with object.__getattribute__(self, "_lock"):
+                target = object.__getattribute__(self, "_target")
+                if target is None:
+                    target = importlib.import_module(self._module)
+                    if self._attribute is not None:
+                        target = getattr(target, self._attribute)
+                    object.__setattr__(self, "_target", target)
+
+        return target
+
+    @property
+    def is_loaded(self) -> bool:
+        return object.__getattribute__(self, "_target") is not None
+
+    def __getattr__(self, name: str) -> Any:
+        # typing and other introspection probe for dunders (like __typing_subst__ when the
+        # placeholder is used in an annotation); that shouldn't trigger the import
+        if name.startswith("__") and name.endswith("__") and not self.is_loaded:
+            raise AttributeError(name)
+
+        return getattr(self._load(), name)
+
+    def __setattr__(self, name: str, value: Any):
+        setattr(self._load(), name, value)
+
+    def __delattr__(self, name: str):
+        delattr(self._load(), name)
+
+    def __call__(self, *args, **kwargs) -> Any:
+        return self._load()(*args, **kwargs)
+
+    def __instancecheck__(self, instance: Any) -> bool:
+        return isinstance(instance, self._load())
+
+    def __subclasscheck__(self, subclass: type) -> bool:
+        return issubclass(subclass, self._load())
+
+    def __repr__(self) -> str:
+        name = self._module if self._attribute is None else f"{self._module}.{self._attribute}"
+        return f"<lazy import {name}{'' if self.is_loaded else ' (not loaded)'}>"
+
+
+def lazy_import(module: str, attribute: Optional[str] = None) -> Any:
+    """Returns a placeholder for module (or module.attribute) that imports it on first use."""
+    return LazyImport(module, attribute)
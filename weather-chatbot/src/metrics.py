@@ -0,0 +1,62 @@
+import math
+import threading
+from collections import deque
+from typing import Iterable
+
+
+# Rough average for English text with the GPT tokenizers, used when tiktoken is not installed
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Counts the tokens in text with tiktoken if it is installed, otherwise estimates them from its length."""
+    try:
+        import tiktoken
+    except ImportError:
+        return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+    return len(tiktoken.get_encoding("cl100k_base").encode(text))
+
+
+def percentile(values: Iterable[float], pct: float) -> float | None:
+    """Returns the nearest-rank percentile of values, or None if there are none."""
+    ordered = sorted(values)
+    if len(ordered) == 0:
+        return None
+
+    rank = max(math.ceil(pct / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+class LatencyRecorder:
+    """Thread-safe, bounded record of recent latencies in milliseconds."""
+    def __init__(self, max_samples: int = 1000):
+        self._samples: deque[float] = deque(maxlen=max_samples)
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def record(self, latency_ms: float):
+        with self._lock:
+            self._samples.append(latency_ms)
+            self.count += 1
+
+    def percentile(self, pct: float) -> float | None:
+        """Returns the nearest-rank percentile of the retained samples, or None if there are none."""
+        with self._lock:
+            samples = list(self._samples)
+
+        return percentile(samples, pct)
+
+    def summary(self) -> dict[str, float | int | None]:
+        """Returns the total count and the p50/p95/p99/max of the retained samples."""
+        with self._lock:
+            samples = list(self._samples)
+            count = self.count
+
+        return {
+            "count": count,
+            "p50_ms": percentile(samples, 50),
+            "p95_ms": percentile(samples, 95),
+            "p99_ms": percentile(samples, 99),
+            "max_ms": max(samples) if samples else None,
+        }
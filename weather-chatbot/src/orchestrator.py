@@ -1,22 +1,322 @@
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+from typing import Callable, Coroutine, Iterator
+
+from src.agents.combined_extractor import CombinedExtractor
 from src.agents.location.location_agent import LocationAgent
 from src.agents.weather.weather_agent import WeatherAgent
+from src.clients.resilience import LLMUnavailableError
 from src.context import Context
+from src.deadline import Deadline, deadline_scope
+from src.metrics import LatencyRecorder
+from src.tracing import Span, Tracer, get_tracer
+
+
+logger = logging.getLogger(__name__)
+
+SEPARATE_EXTRACTION = "separate"
+COMBINED_EXTRACTION = "combined"
+
+# Answered when the model timed out, the circuit to it is open (see src.clients.resilience)
+# or the turn ran out of budget
+FALLBACK_REPLY = "Sorry, I'm having trouble answering right now. Please try again in a moment."
+
+# Timeouts raised by the HTTP clients behind the agents, by module so the SDKs aren't imported to check them
+TRANSPORT_TIMEOUTS = [
+    ("requests", "Timeout"),
+    ("httpx", "TimeoutException"),
+    ("openai", "APITimeoutError"),
+    ("azure.core.exceptions", "ServiceRequestTimeoutError"),
+    ("azure.core.exceptions", "ServiceResponseTimeoutError"),
+]
+
+
+def _extraction_mode(extraction_mode: str | None) -> str:
+    extraction_mode = (extraction_mode or os.environ.get("EXTRACTION_MODE") or SEPARATE_EXTRACTION).lower()
+    if extraction_mode not in (SEPARATE_EXTRACTION, COMBINED_EXTRACTION):
+        raise ValueError(f"Unknown extraction mode: received {extraction_mode}, "
+                         f"expected {SEPARATE_EXTRACTION} or {COMBINED_EXTRACTION}")
+
+    return extraction_mode
+
+
+def _build_agents(extraction_mode: str, location_agent: LocationAgent | None,
+                  weather_agent: WeatherAgent | None) -> tuple[LocationAgent, WeatherAgent]:
+    """Builds the agents not given, extracting with a CombinedExtractor in combined mode."""
+    if location_agent is None:
+        location_agent = LocationAgent(extractor=CombinedExtractor() if extraction_mode == COMBINED_EXTRACTION else None)
+
+    return location_agent, weather_agent if weather_agent is not None else WeatherAgent()
+
+
+def _turn_budget(turn_budget: float | None, reserve: float | None) -> tuple[float | None, float | None]:
+    """Returns the turn budget and reserve in seconds, defaulting to TURN_BUDGET and TURN_BUDGET_RESERVE."""
+    turn_budget = turn_budget if turn_budget is not None else float(os.environ.get("TURN_BUDGET") or 0) or None
+    reserve = reserve if reserve is not None else float(os.environ.get("TURN_BUDGET_RESERVE") or 0) or None
+
+    return turn_budget, reserve
+
+
+def _start_deadline(turn_budget: float | None, reserve: float | None) -> Deadline | None:
+    return Deadline(turn_budget, reserve=reserve) if turn_budget is not None else None
+
+
+def _is_unavailable(error: Exception) -> bool:
+    """
+    Whether error means a backend didn't answer in time (or at all), which the turn
+    answers with the fallback reply. Any other error is a bug and is raised.
+    """
+    # DeadlineExceeded and asyncio timeouts are TimeoutErrors too
+    if isinstance(error, (LLMUnavailableError, TimeoutError)):
+        return True
+
+    # An SDK that was never imported can't have raised the error
+    for module, name in TRANSPORT_TIMEOUTS:
+        loaded = sys.modules.get(module)
+        if loaded is not None and isinstance(error, getattr(loaded, name)):
+            return True
+
+    return False
+
+
+def _fallback(span: Span, error: Exception) -> str:
+    logger.warning(f"Answering with the fallback reply: {error!r}")
+    span.set_attribute("fallback", type(error).__name__)
+
+    return FALLBACK_REPLY
+
+
+def _record_budget(span: Span, deadline: Deadline | None):
+    if deadline is not None:
+        span.set_attribute("budget_remaining_ms", deadline.remaining() * 1000)
+        if deadline.skipped:
+            span.set_attribute("skipped_steps", ",".join(deadline.skipped))
 
 
 class Orchestrator:
-    """Drives the conversation flow."""
+    """
+    Drives the conversation flow.
+
+    In separate extraction mode (the default) the location and the weather category
+    are extracted by each agent with its own LLM call. In combined mode a single call
+    extracts both before the agents reply. Defaults to EXTRACTION_MODE.
+
+    Each turn is traced as a "turn" span; the id of the last turn's trace is kept in
+    last_trace_id and logged, to find the turn in the exported traces.
+
+    With a turn_budget (defaulting to TURN_BUDGET) each turn gets a Deadline: every LLM,
+    Maps and weather call takes the remaining budget as its timeout, and optional steps
+    (re-extraction, weather refresh, history summary) are skipped in favour of what is
+    already known once less than the reserve (TURN_BUDGET_RESERVE, a quarter of the
+    budget by default) is left. If the model times out, its circuit is open or the budget
+    runs out, the turn is answered with FALLBACK_REPLY instead of failing.
+
+    The agents are built once, with their extractors, assistants and shared clients, and
+    reused for every turn; pass them in to swap their dependencies. They keep no state
+    between turns, so the orchestrator can serve many conversations, from several
+    threads at once. last_trace_id and last_time_to_first_token_ms are then overwritten
+    by whichever turn ran last and only mean something to a single caller; concurrent
+    callers can run each turn inside a span of their own, which the turn's trace joins
+    (as the chat server does), and read time to first token from the recorder.
+    """
+
+    def __init__(self,
+                 extraction_mode: str | None = None,
+                 tracer: Tracer | None = None,
+                 location_agent: LocationAgent | None = None,
+                 weather_agent: WeatherAgent | None = None,
+                 clock: Callable[[], float] = time.perf_counter,
+                 turn_budget: float | None = None,
+                 turn_budget_reserve: float | None = None):
+        self.extraction_mode = _extraction_mode(extraction_mode)
+        self.tracer = tracer if tracer is not None else get_tracer()
+        self.location_agent, self.weather_agent = _build_agents(self.extraction_mode, location_agent, weather_agent)
+        self.turn_budget, self.turn_budget_reserve = _turn_budget(turn_budget, turn_budget_reserve)
+        self._clock = clock
+        self.time_to_first_token = LatencyRecorder()
+        self.last_time_to_first_token_ms: float | None = None
+        self.last_trace_id: str | None = None
 
     def get_reply(self, user_message: str | None, context: Context) -> str:
-        if user_message:
-            context.add_message("user", user_message)
+        deadline = _start_deadline(self.turn_budget, self.turn_budget_reserve)
+        with self.tracer.span("turn", extraction_mode=self.extraction_mode) as span, deadline_scope(deadline):
+            self.last_trace_id = span.trace_id
+            logger.info(f"Turn trace id: {span.trace_id}")
+
+            if user_message:
+                context.add_message("user", user_message)
+
+            try:
+                reply = self.location_agent.invoke(context)
+                if reply is None:
+                    # In combined mode the weather category was extracted along with the location
+                    if self.extraction_mode == COMBINED_EXTRACTION:
+                        reply = self.weather_agent.reply(context)
+                    else:
+                        reply = self.weather_agent.invoke(context)
+            except Exception as error:
+                if not _is_unavailable(error):
+                    raise
+                reply = _fallback(span, error)
+
+            _record_budget(span, deadline)
+
+            context.add_message("assistant", reply)
+
+        return reply
+
+    def stream_reply(self, user_message: str | None, context: Context) -> Iterator[str]:
+        """
+        Same as get_reply, but yields the reply in chunks as the final assistant call generates
+        them. The complete reply is added to the context once the stream is exhausted. If the
+        caller closes the stream early or it fails partway, the chunks yielded so far (or
+        FALLBACK_REPLY if there were none) are added instead, so the context never ends on an
+        unanswered user message. The turn budget applies until the stream is opened.
+
+        The time from the user's message to the first chunk is what the user perceives as
+        latency; it is recorded in time_to_first_token, set on the turn's span and kept in
+        last_time_to_first_token_ms.
+        """
+        start = self._clock()
+        time_to_first_token_ms = None
+        deadline = _start_deadline(self.turn_budget, self.turn_budget_reserve)
+
+        # The span can't be current while chunks are yielded to the caller, only while the
+        # agents run up to the start of the stream
+        span = self.tracer.start_span("turn", extraction_mode=self.extraction_mode, stream=True)
+        self.last_trace_id = span.trace_id
+        logger.info(f"Turn trace id: {span.trace_id}")
+
+        try:
+            with self.tracer.use_span(span), deadline_scope(deadline):
+                if user_message:
+                    context.add_message("user", user_message)
+
+                try:
+                    chunks = self.location_agent.stream(context)
+                    if chunks is None:
+                        if self.extraction_mode == COMBINED_EXTRACTION:
+                            chunks = self.weather_agent.stream_reply(context)
+                        else:
+                            chunks = self.weather_agent.stream(context)
+                except Exception as error:
+                    if not _is_unavailable(error):
+                        raise
+                    chunks = [_fallback(span, error)]
+
+                _record_budget(span, deadline)
+
+            reply = []
+            try:
+                for chunk in chunks:
+                    if time_to_first_token_ms is None:
+                        time_to_first_token_ms = (self._clock() - start) * 1000
+                        self.last_time_to_first_token_ms = time_to_first_token_ms
+                        self.time_to_first_token.record(time_to_first_token_ms)
+                        span.set_attribute("time_to_first_token_ms", time_to_first_token_ms)
+                        logger.debug(f"Time to first token: {time_to_first_token_ms:.0f}ms")
+
+                    reply.append(chunk)
+                    yield chunk
+            except BaseException:
+                # GeneratorExit when the caller stops reading
+                span.set_attribute("interrupted", True)
+                context.add_message("assistant", "".join(reply) or FALLBACK_REPLY)
+                raise
 
-        location_agent = LocationAgent()
-        reply = location_agent.invoke(context)
+            context.add_message("assistant", "".join(reply))
+        except Exception as error:
+            span.record_error(error)
+            raise
+        finally:
+            self.tracer.end_span(span)
 
-        if reply is None:
-            weather_agent = WeatherAgent()
-            reply = weather_agent.invoke(context)
 
-        context.add_message("assistant", reply)
+class AsyncOrchestrator:
+    """
+    Drives the conversation flow with the async clients, overlapping independent steps.
+
+    The location and weather extract steps only read the message history and write
+    separate context fields, so they run concurrently. In combined extraction mode a
+    single call extracts both instead. The orchestrator then decides which agent
+    replies, and that agent fetches the weather (if needed) and answers.
+
+    Turns are traced, bounded by the turn budget and fall back to FALLBACK_REPLY like in
+    Orchestrator. As turns of many sessions may run at once,
+    last_trace_id is only meaningful to a single caller; the chat server reports each
+    turn's trace id in its response instead.
+
+    As in Orchestrator, the agents are built once and shared by all the turns, including
+    those of concurrent sessions.
+    """
+
+    def __init__(self,
+                 extraction_mode: str | None = None,
+                 tracer: Tracer | None = None,
+                 location_agent: LocationAgent | None = None,
+                 weather_agent: WeatherAgent | None = None,
+                 turn_budget: float | None = None,
+                 turn_budget_reserve: float | None = None):
+        self.extraction_mode = _extraction_mode(extraction_mode)
+        self.tracer = tracer if tracer is not None else get_tracer()
+        self.location_agent, self.weather_agent = _build_agents(self.extraction_mode, location_agent, weather_agent)
+        self.turn_budget, self.turn_budget_reserve = _turn_budget(turn_budget, turn_budget_reserve)
+        self.last_trace_id: str | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_lock = threading.Lock()
+
+    async def get_reply_async(self, user_message: str | None, context: Context) -> str:
+        deadline = _start_deadline(self.turn_budget, self.turn_budget_reserve)
+        with self.tracer.span("turn", extraction_mode=self.extraction_mode) as span, deadline_scope(deadline):
+            self.last_trace_id = span.trace_id
+            logger.info(f"Turn trace id: {span.trace_id}")
+
+            if user_message:
+                context.add_message("user", user_message)
+
+            try:
+                if self.extraction_mode == COMBINED_EXTRACTION:
+                    await self.location_agent.extract_async(context)
+                else:
+                    await asyncio.gather(self.location_agent.extract_async(context),
+                                         self.weather_agent.extract_async(context))
+
+                if context.location is None:
+                    reply = await self.location_agent.reply_async(context)
+                else:
+                    reply = await self.weather_agent.reply_async(context)
+            except Exception as error:
+                if not _is_unavailable(error):
+                    raise
+                reply = _fallback(span, error)
+
+            _record_budget(span, deadline)
+
+            context.add_message("assistant", reply)
 
         return reply
+
+    def get_reply(self, user_message: str | None, context: Context) -> str:
+        """Blocking wrapper around get_reply_async for synchronous callers."""
+        return self._run(self.get_reply_async(user_message, context))
+
+    def _run(self, coroutine: Coroutine):
+        # A single long-lived loop keeps the pooled async clients (which are bound to
+        # the loop that created them) reusable across calls
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="AsyncOrchestrator", daemon=True).start()
+
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def close(self):
+        """Stops the event loop used by get_reply."""
+        with self._loop_lock:
+            if self._loop is not None:
+                self._loop.call_soon_threadsafe(self._loop.stop)
+                self._loop = None
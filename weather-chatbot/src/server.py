@@ -0,0 +1,305 @@
+"""
+HTTP chat server hosting the orchestrator for many concurrent sessions.
+
+The server is a plain ASGI application, run it from the weather-chatbot folder with:
+
+    python -m src.server --port 8000
+
+Endpoints:
+    POST   /sessions                 starts a session, returns its id, the greeting and its trace id
+    POST   /sessions/{id}/messages   {"message": "..."}, returns the reply and its trace id
+    DELETE /sessions/{id}            ends a session
+    GET    /metrics                  in-flight turns, queue length, sessions, turn latency and LLM hedges/circuit
+    GET    /health
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+import weakref
+from typing import Any, Awaitable, Callable, Optional
+
+from dotenv import load_dotenv
+
+from src.clients.loop_local import LoopLocal
+from src.context import Context
+from src.clients.resilience import get_llm_resilience
+from src.metrics import LatencyRecorder
+from src.orchestrator import AsyncOrchestrator
+from src.sessions import SessionStore, get_session_store
+from src.tracing import SPAN_KIND_SERVER, Span, Tracer, get_tracer
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONCURRENCY = 32
+DEFAULT_MAX_QUEUE = 128
+DEFAULT_QUEUE_TIMEOUT = 30.0
+MAX_BODY_SIZE = 64 * 1024
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str, headers: Optional[dict[str, str]] = None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.headers = headers or {}
+
+
+async def _close_async_clients():
+    """Closes the shared async clients bound to the server's event loop before it ends."""
+    from src.clients.geocoding import get_geocoder
+    from src.clients.llm_interface import get_client_registry
+    from src.clients.weather import get_async_weather_client
+
+    await get_client_registry().aclose()
+    await get_geocoder().aclose()
+    await get_async_weather_client().aclose()
+
+
+class ChatServer:
+    """
+    ASGI application serving chat sessions.
+
+    At most max_concurrency turns run at once; further turns wait in a queue of up to
+    max_queue turns for at most queue_timeout seconds. When the queue is full, or the
+    wait times out, the request is rejected with 503 and a Retry-After header so
+    clients back off instead of piling up. Turns of the same session run one at a time,
+    and wait in the queue for the previous one without holding a slot. Session store
+    reads and writes run in worker threads, off the event loop.
+    """
+    def __init__(self,
+                 orchestrator: Optional[AsyncOrchestrator] = None,
+                 sessions: Optional[SessionStore] = None,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 max_queue: int = DEFAULT_MAX_QUEUE,
+                 queue_timeout: float = DEFAULT_QUEUE_TIMEOUT,
+                 tracer: Optional[Tracer] = None):
+        if max_concurrency <= 0:
+            raise ValueError(f"max_concurrency must be positive: received {max_concurrency}")
+
+        self.orchestrator = orchestrator if orchestrator is not None else AsyncOrchestrator()
+        self.sessions = sessions if sessions is not None else get_session_store()
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.tracer = tracer if tracer is not None else get_tracer()
+        self.turn_latency = LatencyRecorder()
+        self.in_flight = 0
+        self.queued = 0
+        self.rejected = 0
+        self._slots = LoopLocal(lambda: asyncio.Semaphore(self.max_concurrency))
+        self._session_locks = LoopLocal(weakref.WeakValueDictionary)
+
+    async def __call__(self, scope: dict, receive: Callable[[], Awaitable[dict]],
+                       send: Callable[[dict], Awaitable[None]]):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+
+        if scope["type"] != "http":
+            return
+
+        try:
+            body = await self._read_body(receive)
+            status, payload = await self._route(scope["method"], scope["path"].rstrip("/"), body)
+            await self._respond(send, status, payload)
+        except HTTPError as error:
+            await self._respond(send, error.status, {"error": error.message}, error.headers)
+        except Exception:
+            logger.exception(f"Failed to handle {scope['method']} {scope['path']}")
+            await self._respond(send, 500, {"error": "Internal server error"})
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self.sessions.close()
+                await _close_async_clients()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _route(self, method: str, path: str, body: bytes) -> tuple[int, Any]:
+        parts = path.strip("/").split("/")
+
+        if method == "GET" and path == "/health":
+            return 200, {"status": "ok"}
+
+        if method == "GET" and path == "/metrics":
+            return 200, self.metrics()
+
+        if method == "POST" and path == "/sessions":
+            session_id, context = await asyncio.to_thread(self.sessions.create)
+            reply, trace_id = await self._turn(session_id, None, context)
+            return 201, {"session_id": session_id, "reply": reply, "trace_id": trace_id}
+
+        if len(parts) == 3 and parts[0] == "sessions" and parts[2] == "messages" and method == "POST":
+            message = self._parse_message(body)
+            await self._get_session(parts[1])
+            reply, trace_id = await self._turn(parts[1], message)
+            return 200, {"session_id": parts[1], "reply": reply, "trace_id": trace_id}
+
+        if len(parts) == 2 and parts[0] == "sessions" and method == "DELETE":
+            # Waits for a running turn of the session, which would save it again once deleted
+            async with self._session_lock(parts[1]):
+                await self._get_session(parts[1])
+                await asyncio.to_thread(self.sessions.delete, parts[1])
+            return 200, {"session_id": parts[1]}
+
+        raise HTTPError(404, f"Not found: {method} {path}")
+
+    async def _get_session(self, session_id: str) -> Context:
+        # A session no longer in memory is read from SQLite, which would block the event loop
+        context = await asyncio.to_thread(self.sessions.get, session_id)
+        if context is None:
+            raise HTTPError(404, f"Unknown or expired session: {session_id}")
+
+        return context
+
+    @staticmethod
+    def _parse_message(body: bytes) -> str:
+        try:
+            message = json.loads(body)["message"]
+        except (ValueError, KeyError, TypeError):
+            raise HTTPError(400, 'Expected a JSON body of the form {"message": "..."}')
+
+        if not isinstance(message, str) or message == "":
+            raise HTTPError(400, "message must be a non-empty string")
+
+        return message
+
+    async def _turn(self, session_id: str, message: str | None,
+                    context: Optional[Context] = None) -> tuple[str, str]:
+        """Runs a turn of the session and returns the reply and the id of the turn's trace."""
+        with self.tracer.span("http.turn", SPAN_KIND_SERVER, session_id=session_id) as span:
+            slots = self._slots.get()
+            lock = self._session_lock(session_id)
+
+            if slots.locked() or lock.locked():
+                await self._wait_in_queue(lock, slots, span)
+            else:
+                # Both are free, so they are taken without waiting (or counting as queued)
+                await self._acquire(lock, slots)
+                span.set_attribute("queue_wait_ms", 0.0)
+
+            self.in_flight += 1
+            start = time.perf_counter()
+            try:
+                # Looked up again under the lock in case the previous turn replaced it
+                if context is None:
+                    context = await self._get_session(session_id)
+                reply = await self.orchestrator.get_reply_async(message, context)
+                await asyncio.to_thread(self.sessions.save, session_id, context)
+            finally:
+                self.in_flight -= 1
+                slots.release()
+                lock.release()
+                self.turn_latency.record((time.perf_counter() - start) * 1000)
+
+        return reply, span.trace_id
+
+    async def _wait_in_queue(self, lock: asyncio.Lock, slots: asyncio.Semaphore, span: Span):
+        if self.queued >= self.max_queue:
+            self.rejected += 1
+            raise HTTPError(503, "Server is busy, try again later", {"Retry-After": "1"})
+
+        self.queued += 1
+        queued_at = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._acquire(lock, slots), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise HTTPError(503, "Timed out waiting for a free slot, try again later", {"Retry-After": "1"})
+        finally:
+            self.queued -= 1
+            span.set_attribute("queue_wait_ms", (time.perf_counter() - queued_at) * 1000)
+
+    @staticmethod
+    async def _acquire(lock: asyncio.Lock, slots: asyncio.Semaphore):
+        """
+        Takes the session's lock, then a slot. Messages waiting for an earlier turn of
+        their session don't hold a slot, so one client can't take up every slot.
+        """
+        await lock.acquire()
+        try:
+            await slots.acquire()
+        except BaseException:
+            lock.release()
+            raise
+
+    def _session_lock(self, session_id: str) -> asyncio.Lock:
+        # The lock only lives as long as a turn of the session holds on to it
+        locks = self._session_locks.get()
+        lock = locks.get(session_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            locks[session_id] = lock
+
+        return lock
+
+    def metrics(self) -> dict[str, Any]:
+        latency = self.turn_latency.summary()
+
+        return {
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "rejected": self.rejected,
+            "sessions": len(self.sessions),
+            "turns": latency["count"],
+            "turn_latency_p50_ms": latency["p50_ms"],
+            "turn_latency_p95_ms": latency["p95_ms"],
+            "llm": get_llm_resilience().stats(),
+        }
+
+    @staticmethod
+    async def _read_body(receive) -> bytes:
+        body = b""
+        more_body = True
+        while more_body:
+            message = await receive()
+            body += message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if len(body) > MAX_BODY_SIZE:
+                raise HTTPError(413, "Request body is too large")
+
+        return body
+
+    @staticmethod
+    async def _respond(send, status: int, payload: Any, headers: Optional[dict[str, str]] = None):
+        body = json.dumps(payload).encode("utf-8")
+        raw_headers = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+        raw_headers += [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()]
+
+        await send({"type": "http.response.start", "status": status, "headers": raw_headers})
+        await send({"type": "http.response.body", "body": body})
+
+
+def create_app() -> ChatServer:
+    """
+    Creates the server from SERVER_MAX_CONCURRENCY, SERVER_MAX_QUEUE and SERVER_QUEUE_TIMEOUT,
+    with the process-wide session store.
+    """
+    return ChatServer(
+        max_concurrency=int(os.environ.get("SERVER_MAX_CONCURRENCY") or DEFAULT_MAX_CONCURRENCY),
+        max_queue=int(os.environ.get("SERVER_MAX_QUEUE") or DEFAULT_MAX_QUEUE),
+        queue_timeout=float(os.environ.get("SERVER_QUEUE_TIMEOUT") or DEFAULT_QUEUE_TIMEOUT))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serves the weather chatbot over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    load_dotenv()
+
+    import uvicorn
+    uvicorn.run(create_app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+import os
+import threading
+import time
+import uuid
+from typing import Callable, Optional
+
+from src.clients.cache import SqliteStore, TTLCache
+from src.context import Context
+
+
+DEFAULT_MAX_SESSIONS = 10000
+# Sessions idle for longer than this are dropped
+DEFAULT_SESSION_TTL = 30 * 60.0
+DEFAULT_STORE_MAX_ENTRIES = 100000
+
+
+class SessionStore:
+    """
+    Keeps the Context of every chat session by session id.
+
+    Contexts live in an in-memory LRU whose entries expire once a session has been idle
+    for the ttl; saving a session after each turn restarts its ttl. With a SqliteStore
+    every save is also written as a Context snapshot, so sessions survive restarts and
+    are resumed from disk when they are no longer in memory. The memory tier is per
+    process, so workers sharing one database should route a session to the same worker.
+    """
+    def __init__(self,
+                 max_sessions: int = DEFAULT_MAX_SESSIONS,
+                 ttl: float = DEFAULT_SESSION_TTL,
+                 store: Optional[SqliteStore] = None,
+                 clock: Callable[[], float] = time.time):
+        self.ttl = ttl
+        self.store = store
+        self._clock = clock
+        self._memory = TTLCache(max_size=max_sessions, ttl=ttl, clock=clock)
+
+        if self.store is not None:
+            self.store.prune(self._clock())
+
+    def create(self) -> tuple[str, Context]:
+        """Starts a new session and returns its id and empty context."""
+        session_id = uuid.uuid4().hex
+        context = Context()
+        self.save(session_id, context)
+
+        return session_id, context
+
+    def get(self, session_id: str) -> Context | None:
+        """Returns the context of the session, or None if it does not exist or has expired."""
+        context = self._memory.get(session_id)
+        if context is not None:
+            return context
+
+        if self.store is not None:
+            row = self.store.get(session_id, self._clock())
+            if row is not None:
+                expires_at, snapshot = row
+                context = Context.from_bytes(snapshot)
+                self._memory.set(session_id, context, ttl=expires_at - self._clock())
+                return context
+
+        return None
+
+    def save(self, session_id: str, context: Context):
+        self._memory.set(session_id, context)
+        if self.store is not None:
+            self.store.set(session_id, context.to_bytes(), self._clock() + self.ttl)
+
+    def delete(self, session_id: str):
+        self._memory.delete(session_id)
+        if self.store is not None:
+            self.store.delete(session_id)
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    def close(self):
+        if self.store is not None:
+            self.store.close()
+
+
+_session_store: SessionStore | None = None
+_session_store_lock = threading.Lock()
+
+
+def get_session_store() -> SessionStore:
+    """
+    Returns the process-wide session store, configured from SESSION_MAX, SESSION_TTL and
+    SESSION_STORE_PATH (the SQLite database to persist sessions to, if set, keeping at
+    most SESSION_STORE_MAX_ENTRIES of them).
+    """
+    global _session_store
+
+    if _session_store is None:
+        with _session_store_lock:
+            if _session_store is None:
+                path = os.environ.get("SESSION_STORE_PATH")
+                max_entries = int(os.environ.get("SESSION_STORE_MAX_ENTRIES") or DEFAULT_STORE_MAX_ENTRIES)
+                _session_store = SessionStore(
+                    max_sessions=int(os.environ.get("SESSION_MAX") or DEFAULT_MAX_SESSIONS),
+                    ttl=float(os.environ.get("SESSION_TTL") or DEFAULT_SESSION_TTL),
+                    store=SqliteStore(path, table="sessions", max_entries=max_entries) if path else None)
+
+    return _session_store
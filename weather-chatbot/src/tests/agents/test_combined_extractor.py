@@ -0,0 +1,91 @@
+import asyncio
+import json
+import os
+import unittest
+from unittest.mock import AsyncMock, Mock, patch
+
+from src.agents.combined_extractor import CombinedExtractor
+from src.agents.weather.weather_classifier import WeatherRuleClassifier
+from src.clients.geocoding import GeocodeResult
+from src.clients.weather import WeatherType
+from src.context import Context
+
+
+def _response(content: str):
+    return Mock(choices=[Mock(message=Mock(content=content))])
+
+
+@patch.dict(os.environ, {"OPENAI_DEPLOYMENT_NAME": "openai_deployment_name"})
+class TestCombinedExtractor(unittest.TestCase):
+
+    def setUp(self):
+        self.geocoder = Mock()
+        self.geocoder.geocode.return_value = GeocodeResult(47.6062, -122.3321, 'US, Seattle, WA')
+        self.context = Context()
+        self.context.add_message('assistant', 'Hi! How can I help you with the weather?')
+        self.context.add_message('user', 'I live in Seattle, is it raining there?')
+
+    @patch('src.agents.combined_extractor.get_llm_client')
+    def test_extract_populates_location_and_weather_category_with_one_call(self, openai_mock):
+        openai_mock().chat.completions.create.return_value = _response(
+            json.dumps({'location': 'United States, Seattle, WA', 'weather_category': 'CURRENT_CONDITIONS'}))
+
+        CombinedExtractor(geocoder=self.geocoder).extract(self.context)
+
+        self.assertEqual((47.6062, -122.3321), self.context.location)
+        self.assertEqual('US, Seattle, WA', self.context.location_description)
+        self.assertEqual('United States, Seattle, WA', self.context.location_summary)
+        self.assertEqual(WeatherType.CURRENT_CONDITIONS, self.context.weather_category)
+        self.geocoder.geocode.assert_called_once_with('United States, Seattle, WA')
+        openai_mock().chat.completions.create.assert_called_once()
+        self.assertEqual({'type': 'json_object'},
+                         openai_mock().chat.completions.create.call_args.kwargs['response_format'])
+
+    @patch('src.agents.combined_extractor.get_llm_client')
+    def test_unknown_values_leave_context_unchanged(self, openai_mock):
+        openai_mock().chat.completions.create.return_value = _response(
+            json.dumps({'location': 'LOCATION UNKNOWN', 'weather_category': 'UNKNOWN'}))
+
+        CombinedExtractor(geocoder=self.geocoder).extract(self.context)
+
+        self.assertIsNone(self.context.location)
+        self.assertIsNone(self.context.weather_category)
+        self.geocoder.geocode.assert_not_called()
+
+    @patch('src.agents.weather.weather_extractor.get_llm_client')
+    @patch('src.agents.location.location_extractor.get_llm_client')
+    @patch('src.agents.combined_extractor.get_llm_client')
+    def test_invalid_json_falls_back_to_separate_extractors(self, openai_mock, location_openai_mock,
+                                                            weather_openai_mock):
+        openai_mock().chat.completions.create.return_value = _response('Seattle, CURRENT_CONDITIONS')
+        location_openai_mock().chat.completions.create.return_value = _response('Seattle, WA')
+        weather_openai_mock().chat.completions.create.return_value = _response('CURRENT_CONDITIONS')
+
+        CombinedExtractor(geocoder=self.geocoder).extract(self.context)
+
+        self.assertEqual((47.6062, -122.3321), self.context.location)
+        self.assertEqual(WeatherType.CURRENT_CONDITIONS, self.context.weather_category)
+
+    @patch('src.agents.location.location_extractor.get_llm_client')
+    @patch('src.agents.combined_extractor.get_llm_client')
+    def test_fast_path_only_extracts_location(self, openai_mock, location_openai_mock):
+        location_openai_mock().chat.completions.create.return_value = _response('Seattle, WA')
+        self.context.add_message('assistant', 'What would you like to know?')
+        self.context.add_message('user', 'The forecast for tomorrow please')
+
+        CombinedExtractor(geocoder=self.geocoder, classifier=WeatherRuleClassifier()).extract(self.context)
+
+        self.assertEqual(WeatherType.DAILY_FORECAST, self.context.weather_category)
+        self.assertEqual((47.6062, -122.3321), self.context.location)
+        openai_mock().chat.completions.create.assert_not_called()
+
+    @patch('src.agents.combined_extractor.get_async_llm_client')
+    def test_extract_async(self, openai_mock):
+        openai_mock.return_value.chat.completions.create = AsyncMock(return_value=_response(
+            json.dumps({'location': 'Seattle, WA', 'weather_category': 'SEVERE_ALERTS'})))
+        self.geocoder.geocode_async = AsyncMock(return_value=GeocodeResult(47.6062, -122.3321, 'US, Seattle, WA'))
+
+        asyncio.run(CombinedExtractor(geocoder=self.geocoder).extract_async(self.context))
+
+        self.assertEqual((47.6062, -122.3321), self.context.location)
+        self.assertEqual(WeatherType.SEVERE_ALERTS, self.context.weather_category)
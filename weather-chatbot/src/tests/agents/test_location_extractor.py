@@ -5,14 +5,15 @@ from unittest.mock import Mock, patch, ANY
 from azure.maps.search.models import LatLon
 
 from src.agents.location.location_extractor import LocationExtractor
+from src.clients.geocoding import GeocodeResult, Geocoder
 from src.context import Context
 
 
 class TestLocationExtractor(unittest.TestCase):
     @patch.dict(os.environ, {"OPENAI_DEPLOYMENT_NAME": "openai_deployment_name"})
     @patch.dict(os.environ, {"MAPS_API_KEY": "maps_api_key"})
-    @patch('src.agents.location.location_extractor.AzureOpenAI')
-    @patch('src.agents.location.location_extractor.MapsSearchClient.search_address')
+    @patch('src.agents.location.location_extractor.get_llm_client')
+    @patch('src.clients.geocoding.MapsSearchClient.search_address')
     def test_extract(self, search_address_mock, openai_mock):
         address = Mock(
             type='Point Address',
@@ -24,7 +25,7 @@ class TestLocationExtractor(unittest.TestCase):
 
         openai_mock().chat.completions.create.return_value.choices[0].message.content = 'Seattle'
 
-        extractor = LocationExtractor()
+        extractor = LocationExtractor(geocoder=Geocoder())
 
         message_history = [
             {'role': 'assistant', 'content': 'Hi! What is your location?'},
@@ -46,3 +47,74 @@ class TestLocationExtractor(unittest.TestCase):
                 {'role': 'system', 'content': ANY},
             ]
         )
+
+
+@patch.dict(os.environ, {"OPENAI_DEPLOYMENT_NAME": "openai_deployment_name"})
+@patch('src.agents.location.location_extractor.get_llm_client')
+class TestIncrementalLocationExtractor(unittest.TestCase):
+
+    def setUp(self):
+        self.geocoder = Mock()
+        self.geocoder.geocode.return_value = GeocodeResult(47.6062, -122.3321, 'US, Seattle')
+        self.extractor = LocationExtractor(geocoder=self.geocoder, incremental=True)
+        self.context = Context()
+        self.context.add_message('assistant', 'Hi! What is your location?')
+        self.context.add_message('user', 'I live in Seattle')
+
+    def _respond(self, openai_mock: Mock, *contents: str):
+        openai_mock().chat.completions.create.side_effect = [
+            Mock(choices=[Mock(message=Mock(content=content))]) for content in contents]
+
+    def test_settled_location_only_checks_new_user_messages(self, openai_mock):
+        self._respond(openai_mock, 'Seattle', 'LOCATION UNCHANGED')
+
+        self.extractor.extract(self.context)
+        self.context.add_message('assistant', 'What would you like to know?')
+        self.context.add_message('user', 'Will it rain today?')
+        self.extractor.extract(self.context)
+
+        prompt = openai_mock().chat.completions.create.call_args.kwargs['messages'][0]['content']
+        self.assertIn('user: Will it rain today?', prompt)
+        self.assertNotIn('I live in Seattle', prompt)
+        self.geocoder.geocode.assert_called_once()
+        self.assertEqual(4, self.context.location_checked_upto)
+
+    def test_no_new_user_messages_skips_the_llm(self, openai_mock):
+        self._respond(openai_mock, 'Seattle')
+
+        self.extractor.extract(self.context)
+        self.extractor.extract(self.context)
+
+        openai_mock().chat.completions.create.assert_called_once()
+
+    def test_detected_change_escalates_to_full_extraction(self, openai_mock):
+        self._respond(openai_mock, 'Seattle', 'LOCATION CHANGED', 'Portland, Oregon')
+        self.extractor.extract(self.context)
+        self.geocoder.geocode.return_value = GeocodeResult(45.5152, -122.6784, 'US, Portland')
+
+        self.context.add_message('user', 'Actually, I am in Portland now')
+        self.extractor.extract(self.context)
+
+        full_prompt = openai_mock().chat.completions.create.call_args.kwargs['messages'][0]['content']
+        self.assertIn('I live in Seattle', full_prompt)
+        self.assertEqual((45.5152, -122.6784), self.context.location)
+        self.assertEqual('Portland, Oregon', self.context.location_summary)
+
+    def test_unresolved_change_is_not_checked_again(self, openai_mock):
+        self._respond(openai_mock, 'Seattle', 'LOCATION CHANGED', 'LOCATION UNKNOWN',
+                      'LOCATION CHANGED', 'Atlantis', 'LOCATION UNCHANGED')
+        self.extractor.extract(self.context)
+
+        for message in ['I might be moving', 'Maybe to Atlantis', 'Will it rain today?']:
+            if message == 'Maybe to Atlantis':
+                self.geocoder.geocode.return_value = None
+            self.context.add_message('user', message)
+            self.extractor.extract(self.context)
+
+        # The last check only sees the message sent since the unresolved changes
+        prompt = openai_mock().chat.completions.create.call_args.kwargs['messages'][0]['content']
+        self.assertIn('user: Will it rain today?', prompt)
+        self.assertNotIn('Atlantis', prompt)
+        self.assertEqual(6, openai_mock().chat.completions.create.call_count)
+        self.assertEqual((47.6062, -122.3321), self.context.location)
+        self.assertEqual(5, self.context.location_checked_upto)
@@ -0,0 +1,41 @@
+import json
+import os
+import tempfile
+import unittest
+
+from src.agents.weather.weather_classifier import WeatherRuleClassifier
+from src.clients.weather import WeatherType
+
+
+class TestWeatherRuleClassifier(unittest.TestCase):
+
+    def setUp(self):
+        self.classifier = WeatherRuleClassifier()
+
+    def test_clear_phrasings_are_resolved(self):
+        cases = {
+            'What is the forecast for tomorrow?': WeatherType.DAILY_FORECAST,
+            "What's it gonna be like for the next five days?": WeatherType.DAILY_FORECAST,
+            'Are there any weather alerts?': WeatherType.SEVERE_ALERTS,
+            'What is the weather like right now?': WeatherType.CURRENT_CONDITIONS,
+        }
+
+        for text, weather_type in cases.items():
+            self.assertEqual(weather_type, self.classifier.classify(text).weather_type, text)
+
+    def test_ambiguous_or_unrelated_text_is_left_to_the_llm(self):
+        for text in ['Any storm warnings for tomorrow?', 'I live in Seattle', 'Thanks!', '']:
+            self.assertIsNone(self.classifier.classify(text).weather_type, text)
+
+        self.assertEqual({'attempts': 4, 'hits': 0, 'hit_rate': 0.0}, self.classifier.stats())
+
+    def test_patterns_and_threshold_are_configurable(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'patterns.json')
+            with open(path, 'w') as patterns_file:
+                json.dump({'SEVERE_ALERTS': [['\\bstorms?\\b', 0.6]]}, patterns_file)
+
+            classifier = WeatherRuleClassifier.from_file(path, threshold=0.5)
+
+        self.assertEqual(WeatherType.SEVERE_ALERTS, classifier.classify('Is a storm coming?').weather_type)
+        self.assertIsNone(WeatherRuleClassifier().classify('Is a storm coming?').weather_type)
@@ -3,6 +3,7 @@ import unittest
 from unittest.mock import patch, ANY
 from unittest import mock
 
+from src.agents.weather.weather_classifier import WeatherRuleClassifier
 from src.agents.weather.weather_extractor import WeatherExtractor, UNKNOWN_CATEGORY
 from src.clients.weather import WeatherType
 from src.context import Context
@@ -12,7 +13,7 @@ from src.context import Context
 @mock.patch.dict(os.environ, {"MAPS_API_KEY": "FAKE_KEY"})
 class TestWeatherExtractor(unittest.TestCase):
 
-    @patch('src.agents.weather.weather_extractor.AzureOpenAI')
+    @patch('src.agents.weather.weather_extractor.get_llm_client')
     def test_extract_valid_weather_type_adds_type_to_context(self, openai_mock):
 
         openai_mock().chat.completions.create.return_value.choices[0]\
@@ -40,7 +41,7 @@ class TestWeatherExtractor(unittest.TestCase):
             ]
         )
 
-    @patch('src.agents.weather.weather_extractor.AzureOpenAI')
+    @patch('src.agents.weather.weather_extractor.get_llm_client')
     def test_extract_no_weather_type_type_not_added_to_context(self, openai_mock):
 
         openai_mock().chat.completions.create.return_value.choices[0]\
@@ -67,3 +68,33 @@ class TestWeatherExtractor(unittest.TestCase):
                 {'role': 'system', 'content': ANY},
             ]
         )
+
+    @patch('src.agents.weather.weather_extractor.get_llm_client')
+    def test_extract_clear_request_skips_llm_with_fast_path(self, openai_mock):
+
+        extractor = WeatherExtractor(classifier=WeatherRuleClassifier())
+
+        context = Context()
+        context.add_message('assistant', 'Would you like current conditions, the daily forecast or severe alerts?')
+        context.add_message('user', 'What is the forecast for tomorrow?')
+
+        extractor.extract(context)
+
+        self.assertEqual(WeatherType.DAILY_FORECAST, context.weather_category)
+        openai_mock().chat.completions.create.assert_not_called()
+
+    @patch('src.agents.weather.weather_extractor.get_llm_client')
+    def test_extract_ambiguous_request_falls_back_to_llm(self, openai_mock):
+
+        openai_mock().chat.completions.create.return_value.choices[0]\
+            .message.content = WeatherType.SEVERE_ALERTS.name
+
+        extractor = WeatherExtractor(classifier=WeatherRuleClassifier())
+
+        context = Context()
+        context.add_message('user', 'Any storm warnings for tomorrow?')
+
+        extractor.extract(context)
+
+        self.assertEqual(WeatherType.SEVERE_ALERTS, context.weather_category)
+        openai_mock().chat.completions.create.assert_called_once()
@@ -0,0 +1,65 @@
+import os
+import tempfile
+import unittest
+
+from src.clients.cache import MISSING, SqliteStore, TTLCache
+
+
+class TestTTLCache(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 0.0
+        self.cache = TTLCache(max_size=2, ttl=10, clock=lambda: self.now)
+
+    def test_get_returns_default_when_missing(self):
+        self.assertIs(MISSING, self.cache.get('key', MISSING))
+        self.assertEqual(1, self.cache.stats()['misses'])
+
+    def test_cached_none_is_a_hit(self):
+        self.cache.set('key', None)
+
+        self.assertIsNone(self.cache.get('key', MISSING))
+        self.assertEqual(1, self.cache.stats()['hits'])
+
+    def test_entries_expire_after_ttl(self):
+        self.cache.set('key', 'value')
+        self.cache.set('short', 'value', ttl=1)
+        self.now = 5
+
+        self.assertIsNone(self.cache.get('short'))
+        self.assertEqual('value', self.cache.get('key'))
+
+        self.now = 10
+        self.assertIsNone(self.cache.get('key'))
+        self.assertEqual(2, self.cache.stats()['expirations'])
+
+    def test_least_recently_used_entry_is_evicted(self):
+        self.cache.set('a', 1)
+        self.cache.set('b', 2)
+        self.cache.get('a')
+        self.cache.set('c', 3)
+
+        self.assertEqual(1, self.cache.get('a'))
+        self.assertIsNone(self.cache.get('b'))
+        self.assertEqual({'hits': 2, 'misses': 1, 'evictions': 1, 'expirations': 0, 'size': 2}, self.cache.stats())
+
+
+class TestSqliteStore(unittest.TestCase):
+
+    def test_rows_closest_to_expiry_are_evicted_past_max_entries(self):
+        with tempfile.TemporaryDirectory() as directory:
+            store = SqliteStore(os.path.join(directory, 'cache.db'), table='cache', max_entries=3, prune_every=2)
+            for index, expires_at in enumerate([50, 10, 40, 30, 20]):
+                store.set(f'key{index}', b'data', expires_at)
+
+            # Trimmed on the fourth write, the fifth waits for the next check
+            self.assertEqual({'size': 4, 'evictions': 1}, store.stats())
+            self.assertIsNone(store.get('key1', now=0))
+
+            store.set('key5', b'data', 60)
+            stats = store.stats()
+            kept = [key for key in ['key0', 'key2', 'key3', 'key5'] if store.get(key, now=0) is not None]
+            store.close()
+
+        self.assertEqual({'size': 3, 'evictions': 3}, stats)
+        self.assertEqual(['key0', 'key2', 'key5'], kept)
@@ -0,0 +1,124 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest.mock import AsyncMock, Mock, patch
+
+from openai.types.chat import ChatCompletion
+
+from src.clients.completion_cache import (CachedLLMClient, CompletionCache, SqliteCompletionStore,
+                                          bypass_completion_cache, completion_key, is_cache_enabled)
+
+PARAMS = {'temperature': 0, 'model': 'gpt-4o', 'messages': [{'role': 'system', 'content': 'Where are you?'}]}
+
+
+def _completion(content: str) -> ChatCompletion:
+    return ChatCompletion.model_validate({
+        'id': 'chatcmpl-1', 'object': 'chat.completion', 'created': 0, 'model': 'gpt-4o',
+        'choices': [{'index': 0, 'finish_reason': 'stop', 'message': {'role': 'assistant', 'content': content}}],
+    })
+
+
+class TestCompletionCache(unittest.TestCase):
+
+    def setUp(self):
+        self.client = Mock()
+        self.client.chat.completions.create.return_value = _completion('Seattle')
+        self.cache = CompletionCache()
+        self.cached_client = CachedLLMClient(self.client, self.cache)
+
+    def test_identical_requests_are_answered_from_the_cache(self):
+        first = self.cached_client.chat.completions.create(**PARAMS)
+        second = self.cached_client.chat.completions.create(**PARAMS)
+
+        self.assertEqual('Seattle', second.choices[0].message.content)
+        self.assertIs(first, second)
+        self.client.chat.completions.create.assert_called_once_with(**PARAMS)
+        self.assertEqual(1, self.cache.stats()['hits'])
+
+    def test_key_covers_deployment_messages_and_parameters(self):
+        self.assertEqual(completion_key(PARAMS), completion_key(dict(reversed(PARAMS.items()))))
+        self.assertNotEqual(completion_key(PARAMS), completion_key({**PARAMS, 'model': 'gpt-35'}))
+        self.assertNotEqual(completion_key(PARAMS), completion_key({**PARAMS, 'max_tokens': 10}))
+
+    def test_non_deterministic_and_streamed_requests_bypass_the_cache(self):
+        for params in [{**PARAMS, 'temperature': 0.7}, {**PARAMS, 'stream': True}]:
+            self.cached_client.chat.completions.create(**params)
+            self.cached_client.chat.completions.create(**params)
+
+        self.assertEqual(4, self.client.chat.completions.create.call_count)
+        self.assertEqual(4, self.cache.stats()['bypassed'])
+
+    def test_bypass_flag_always_calls_the_model(self):
+        with bypass_completion_cache():
+            self.cached_client.chat.completions.create(**PARAMS)
+            self.cached_client.chat.completions.create(**PARAMS)
+
+        with patch.dict(os.environ, {'COMPLETION_CACHE_BYPASS': 'true'}):
+            self.cached_client.chat.completions.create(**PARAMS)
+
+        self.assertEqual(3, self.client.chat.completions.create.call_count)
+
+    def test_entries_expire_after_ttl(self):
+        now = [0.0]
+        cache = CompletionCache(ttl=60, clock=lambda: now[0])
+        cached_client = CachedLLMClient(self.client, cache)
+
+        cached_client.chat.completions.create(**PARAMS)
+        now[0] = 61
+        cached_client.chat.completions.create(**PARAMS)
+
+        self.assertEqual(2, self.client.chat.completions.create.call_count)
+
+    def test_disk_tier_is_shared_between_caches(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'completions.db')
+            first_store = SqliteCompletionStore(path)
+            CachedLLMClient(self.client, CompletionCache(store=first_store)).chat.completions.create(**PARAMS)
+
+            second_store = SqliteCompletionStore(path)
+            cache = CompletionCache(store=second_store)
+            response = CachedLLMClient(self.client, cache).chat.completions.create(**PARAMS)
+            stats = cache.stats()
+            first_store.close()
+            second_store.close()
+
+        self.assertEqual('Seattle', response.choices[0].message.content)
+        self.client.chat.completions.create.assert_called_once()
+        self.assertEqual(1, stats['disk_hits'])
+
+    def test_disk_tier_is_capped(self):
+        with tempfile.TemporaryDirectory() as directory:
+            store = SqliteCompletionStore(os.path.join(directory, 'completions.db'), max_entries=2, prune_every=1)
+            cache = CompletionCache(store=store)
+            cached_client = CachedLLMClient(self.client, cache)
+            for city in ['Seattle', 'Portland', 'Boise']:
+                cached_client.chat.completions.create(**{**PARAMS, 'messages': [{'role': 'user', 'content': city}]})
+            stats = cache.stats()
+            store.close()
+
+        self.assertEqual(2, stats['disk_size'])
+        self.assertEqual(1, stats['disk_evictions'])
+
+    def test_async_client(self):
+        client = Mock()
+        client.chat.completions.create = AsyncMock(return_value=_completion('Seattle'))
+        cached_client = CachedLLMClient(client, self.cache, is_async=True)
+
+        async def run():
+            await cached_client.chat.completions.create(**PARAMS)
+            return await cached_client.chat.completions.create(**PARAMS)
+
+        self.assertEqual('Seattle', asyncio.run(run()).choices[0].message.content)
+        client.chat.completions.create.assert_awaited_once()
+
+    def test_cache_is_opt_in_per_agent(self):
+        with patch.dict(os.environ, {'COMPLETION_CACHE_AGENTS': 'LocationExtractor, WeatherExtractor'}):
+            self.assertTrue(is_cache_enabled('WeatherExtractor'))
+            self.assertFalse(is_cache_enabled('WeatherAssistant'))
+
+        with patch.dict(os.environ, {'COMPLETION_CACHE_AGENTS': '*'}):
+            self.assertTrue(is_cache_enabled('WeatherAssistant'))
+
+        with patch.dict(os.environ, {'COMPLETION_CACHE_AGENTS': ''}):
+            self.assertFalse(is_cache_enabled('WeatherAssistant'))
@@ -0,0 +1,156 @@
+import itertools
+import os
+import string
+import tempfile
+import threading
+import unittest
+from unittest.mock import Mock
+
+from src.clients.gazetteer import Gazetteer, build, place_parts
+from src.clients.geocoding import Geocoder, GeocodeResult
+
+
+MARFA = GeocodeResult(30.3094, -104.0206, 'US, Marfa, TX')
+BLOWING_ROCK = GeocodeResult(36.1351, -81.6776, 'US, Blowing Rock, NC')
+PORTLAND_ME = GeocodeResult(43.6591, -70.2568, 'US, Portland, ME')
+PORTLAND_OR = GeocodeResult(45.5152, -122.6784, 'US, Portland, OR')
+JUSTIN = GeocodeResult(33.0848, -97.2961, 'US, Justin, TX')
+NEWARK = GeocodeResult(40.7357, -74.1724, 'US, Newark, NJ')
+
+
+def _gazetteer() -> Gazetteer:
+    gazetteer = Gazetteer()
+    gazetteer.add_all({
+        'Marfa, Texas': MARFA,
+        'Blowing Rock, North Carolina': BLOWING_ROCK,
+        'Portland, Maine': PORTLAND_ME,
+        'Portland, Oregon': PORTLAND_OR,
+    })
+    return gazetteer
+
+
+class TestPlaceParts(unittest.TestCase):
+
+    def test_normalizes_city_state_forms(self):
+        for description in ['Marfa, TX', 'marfa texas', 'Marfa, Texas, USA', 'United States, Texas, Marfa',
+                            ' Marfa ,  T.X.']:
+            self.assertEqual(('marfa', 'texas'), place_parts(description), description)
+
+    def test_street_addresses_and_zip_codes_are_not_place_names(self):
+        self.assertIsNone(place_parts('1 Main St, Marfa, TX'))
+        self.assertIsNone(place_parts('Marfa, TX 79843'))
+
+
+class TestGazetteer(unittest.TestCase):
+
+    def test_lookup_matches_normalized_forms(self):
+        gazetteer = _gazetteer()
+
+        self.assertEqual(MARFA, gazetteer.lookup('Marfa, TX'))
+        self.assertEqual(BLOWING_ROCK, gazetteer.lookup('blowing rock nc'))
+        self.assertEqual(PORTLAND_OR, gazetteer.lookup('United States, Oregon, Portland'))
+        self.assertEqual(3, gazetteer.stats()['hits'])
+
+    def test_lookup_matches_misspellings(self):
+        gazetteer = _gazetteer()
+
+        self.assertEqual(BLOWING_ROCK, gazetteer.lookup('Blowing Rok, NC'))
+        self.assertEqual(PORTLAND_ME, gazetteer.lookup('Portlnd, Maine'))
+        self.assertEqual(2, gazetteer.stats()['fuzzy_hits'])
+
+    def test_lookup_does_not_match_near_namesake_cities(self):
+        gazetteer = _gazetteer()
+        gazetteer.add_all({'Justin, Texas': JUSTIN, 'Newark, New Jersey': NEWARK})
+
+        self.assertIsNone(gazetteer.lookup('Austin, TX'))
+        self.assertIsNone(gazetteer.lookup('Newport, New Jersey'))
+        self.assertEqual(JUSTIN, gazetteer.lookup('Justn, TX'))
+
+    def test_lookup_does_not_match_misspelled_states(self):
+        self.assertIsNone(_gazetteer().lookup('Portland, Main'))
+
+    def test_lookup_by_city_only_when_unambiguous(self):
+        gazetteer = _gazetteer()
+
+        self.assertEqual(MARFA, gazetteer.lookup('Marfa'))
+        self.assertIsNone(gazetteer.lookup('Portland'))
+
+    def test_lookup_misses_unknown_places_and_addresses(self):
+        gazetteer = _gazetteer()
+
+        self.assertIsNone(gazetteer.lookup('Atlantis'))
+        self.assertIsNone(gazetteer.lookup('Austin, TX'))
+        self.assertIsNone(gazetteer.lookup('1 Main St, Marfa, TX'))
+        self.assertEqual(3, gazetteer.stats()['misses'])
+
+    def test_lookup_while_adding_places(self):
+        gazetteer = _gazetteer()
+        errors = []
+
+        def look_up():
+            try:
+                for _ in range(200):
+                    self.assertEqual(BLOWING_ROCK, gazetteer.lookup('Blowing Rok, NC'))
+            except Exception as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=look_up) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for first, second in itertools.product(string.ascii_lowercase, repeat=2):
+            gazetteer.add(f'Town {first}{second}, North Carolina', NEWARK)
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual([], errors)
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'gazetteer.tsv')
+            _gazetteer().save(path)
+
+            gazetteer = Gazetteer.load([path])
+
+        self.assertEqual(4, len(gazetteer))
+        self.assertEqual(PORTLAND_ME, gazetteer.lookup('Portland, ME'))
+
+    def test_add_rejects_addresses(self):
+        with self.assertRaises(ValueError):
+            Gazetteer().add('1 Main St, Marfa, TX', MARFA)
+
+    def test_build_geocodes_only_new_places(self):
+        geocoder = Mock()
+        geocoder.geocode.side_effect = lambda name: {'Marfa, TX': MARFA, 'Blowing Rock, NC': BLOWING_ROCK}.get(name)
+
+        with tempfile.TemporaryDirectory() as directory:
+            places_path = os.path.join(directory, 'places.txt')
+            output = os.path.join(directory, 'gazetteer.tsv')
+            with open(places_path, 'w') as places_file:
+                places_file.write('Marfa, TX\nAtlantis\n\n')
+
+            build([places_path], output, geocoder=geocoder)
+            with open(places_path, 'a') as places_file:
+                places_file.write('Blowing Rock, NC\n')
+            gazetteer = build([places_path], output, geocoder=geocoder)
+
+        self.assertEqual(2, len(gazetteer))
+        self.assertEqual(['Marfa, TX', 'Atlantis', 'Atlantis', 'Blowing Rock, NC'],
+                         [call.args[0] for call in geocoder.geocode.call_args_list])
+
+
+class TestGeocoderWithGazetteer(unittest.TestCase):
+
+    def test_gazetteer_hit_skips_maps(self):
+        search_client = Mock()
+        geocoder = Geocoder(search_client=search_client, gazetteer=_gazetteer())
+
+        self.assertEqual(MARFA, geocoder.geocode('Marfa, TX'))
+        search_client.search_address.assert_not_called()
+
+    def test_gazetteer_miss_falls_back_to_maps(self):
+        search_client = Mock()
+        search_client.search_address.return_value = Mock(results=[])
+        geocoder = Geocoder(search_client=search_client, gazetteer=_gazetteer())
+
+        self.assertIsNone(geocoder.geocode('Atlantis'))
+        search_client.search_address.assert_called_once_with('Atlantis')
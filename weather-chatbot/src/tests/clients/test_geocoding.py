@@ -0,0 +1,58 @@
+import unittest
+from unittest.mock import Mock
+
+from azure.maps.search.models import LatLon
+
+from src.clients.cache import TTLCache
+from src.clients.geocoding import Geocoder, GeocodeResult, normalize_description
+
+
+def _search_results(*scores):
+    return Mock(results=[
+        Mock(position=LatLon(lat=47.6062, lon=-122.3321),
+             score=score,
+             address=Mock(country='US', freeform_address='Seattle, WA'))
+        for score in scores])
+
+
+class TestGeocoder(unittest.TestCase):
+
+    def test_geocode_caches_result_by_normalized_description(self):
+        search_client = Mock()
+        search_client.search_address.return_value = _search_results(0.9)
+        geocoder = Geocoder(search_client=search_client)
+
+        first = geocoder.geocode('Seattle, WA')
+        second = geocoder.geocode('  seattle ,wa. ')
+
+        self.assertEqual(GeocodeResult(47.6062, -122.3321, 'US, Seattle, WA'), first)
+        self.assertEqual(first, second)
+        search_client.search_address.assert_called_once_with('Seattle, WA')
+        self.assertEqual(1, geocoder.stats()['hits'])
+
+    def test_geocode_caches_negative_results(self):
+        search_client = Mock()
+        search_client.search_address.return_value = _search_results(0.2)
+        geocoder = Geocoder(search_client=search_client)
+
+        self.assertIsNone(geocoder.geocode('Atlantis'))
+        self.assertIsNone(geocoder.geocode('Atlantis'))
+
+        search_client.search_address.assert_called_once()
+
+    def test_negative_results_expire_after_negative_ttl(self):
+        now = [0.0]
+        search_client = Mock()
+        search_client.search_address.return_value = _search_results()
+        geocoder = Geocoder(search_client=search_client,
+                            cache=TTLCache(ttl=1000, clock=lambda: now[0]),
+                            negative_ttl=10)
+
+        geocoder.geocode('Atlantis')
+        now[0] = 11
+        geocoder.geocode('Atlantis')
+
+        self.assertEqual(2, search_client.search_address.call_count)
+
+    def test_normalize_description(self):
+        self.assertEqual('new york, ny, us', normalize_description(' New  York ,NY,US.'))
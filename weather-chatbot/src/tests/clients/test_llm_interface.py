@@ -0,0 +1,91 @@
+import asyncio
+import os
+import unittest
+from unittest import mock
+from unittest.mock import AsyncMock, Mock, patch
+
+from src.clients.completion_cache import CachedLLMClient
+from src.clients.llm_interface import LLMClientRegistry, get_llm_client, iter_content
+from src.clients.resilience import ResilientLLMClient
+
+
+@mock.patch.dict(os.environ, {"AZURE_OPENAI_ENDPOINT": "https://endpoint",
+                              "OPENAI_DEPLOYMENT_NAME": "openai_deployment_name"})
+class TestLLMClientRegistry(unittest.TestCase):
+
+    @patch('src.clients.llm_interface.AzureOpenAI')
+    def test_get_client_reuses_client_for_same_key(self, openai_mock):
+        registry = LLMClientRegistry()
+
+        first = registry.get_client()
+        second = registry.get_client()
+
+        self.assertIs(first, second)
+        openai_mock.assert_called_once()
+        self.assertEqual({"https://endpoint|openai_deployment_name": {"hits": 1, "misses": 1}}, registry.stats())
+
+    @patch('src.clients.llm_interface.AzureOpenAI')
+    def test_get_client_creates_client_per_deployment(self, openai_mock):
+        openai_mock.side_effect = lambda **kwargs: mock.Mock()
+        registry = LLMClientRegistry()
+
+        first = registry.get_client(deployment="deployment_a")
+        second = registry.get_client(deployment="deployment_b")
+
+        self.assertIsNot(first, second)
+        self.assertEqual(2, openai_mock.call_count)
+        self.assertEqual({"hits": 0, "misses": 1}, registry.stats()["https://endpoint|deployment_b"])
+
+    @patch('src.clients.llm_interface.AzureOpenAI')
+    def test_close_clears_clients(self, openai_mock):
+        registry = LLMClientRegistry()
+        registry.get_client()
+
+        registry.close()
+
+        openai_mock.return_value.close.assert_called_once()
+        self.assertEqual({}, registry.stats())
+
+    @patch('src.clients.llm_interface.AsyncAzureOpenAI')
+    def test_async_clients_are_closed_on_their_loop(self, openai_mock):
+        openai_mock.side_effect = lambda **kwargs: AsyncMock()
+        registry = LLMClientRegistry()
+
+        async def run():
+            closed_with_loop = registry.get_async_client()
+            await registry.aclose()
+
+            closed_from_thread = registry.get_async_client()
+            await asyncio.to_thread(registry.close)
+            await asyncio.sleep(0)
+
+            return closed_with_loop, closed_from_thread
+
+        for client in asyncio.run(run()):
+            client.close.assert_awaited_once()
+
+
+class TestIterContent(unittest.TestCase):
+
+    def test_iter_content_skips_chunks_without_text(self):
+        def chunk(*contents):
+            return Mock(choices=[Mock(delta=Mock(content=content)) for content in contents])
+
+        stream = [chunk(), chunk(''), chunk('Hello'), chunk(None), chunk(' world')]
+
+        self.assertEqual(['Hello', ' world'], list(iter_content(stream)))
+
+
+@mock.patch.dict(os.environ, {"AZURE_OPENAI_ENDPOINT": "https://endpoint",
+                              "OPENAI_DEPLOYMENT_NAME": "openai_deployment_name"})
+class TestGetLLMClient(unittest.TestCase):
+
+    @patch('src.clients.llm_interface._registry')
+    def test_agents_listed_in_completion_cache_agents_get_a_cached_client(self, registry_mock):
+        with mock.patch.dict(os.environ, {"COMPLETION_CACHE_AGENTS": "LocationExtractor"}):
+            self.assertIsInstance(get_llm_client(agent="LocationExtractor")._client, CachedLLMClient)
+            # Agent clients always go through the resilience layer, which bounds them by the turn budget
+            resilient_client = get_llm_client(agent="WeatherAssistant")._client
+            self.assertIsInstance(resilient_client, ResilientLLMClient)
+            self.assertIs(registry_mock.get_client.return_value, resilient_client._client)
+            self.assertIs(registry_mock.get_client.return_value, get_llm_client())
@@ -0,0 +1,178 @@
+import asyncio
+import threading
+import time
+import unittest
+from unittest.mock import Mock
+
+import httpx
+import openai
+
+from src.clients.resilience import (CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError, LLMResilience,
+                                    LLMTimeoutError, ResiliencePolicy, ResilientLLMClient)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class SlowFirstCompletions:
+    """The first request takes first_delay seconds, later ones answer right away."""
+    def __init__(self, first_delay: float):
+        self.first_delay = first_delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def create(self, **params):
+        with self._lock:
+            self.calls += 1
+            call = self.calls
+        if call == 1:
+            time.sleep(self.first_delay)
+
+        return f'response {call}'
+
+
+class AsyncSlowFirstCompletions(SlowFirstCompletions):
+    def __init__(self, first_delay: float):
+        super().__init__(first_delay)
+        self.cancelled = 0
+
+    async def create(self, **params):
+        self.calls += 1
+        call = self.calls
+        if call == 1:
+            try:
+                await asyncio.sleep(self.first_delay)
+            except asyncio.CancelledError:
+                self.cancelled += 1
+                raise
+
+        return f'response {call}'
+
+
+def _client(completions, resilience, is_async=False):
+    return ResilientLLMClient(Mock(chat=Mock(completions=completions)), 'WeatherAssistant', resilience,
+                              is_async=is_async)
+
+
+def _warmed_up(policy: ResiliencePolicy, latency_s: float = 0.01) -> LLMResilience:
+    resilience = LLMResilience(policy=policy)
+    for _ in range(policy.hedge_min_samples):
+        resilience.record_success('WeatherAssistant', latency_s)
+
+    return resilience
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=self.clock)
+
+    def test_opens_after_consecutive_failures_and_refuses_calls(self):
+        self.breaker.record_failure()
+        self.breaker.record_success()
+        self.breaker.record_failure()
+        self.assertEqual(CLOSED, self.breaker.state)
+
+        self.breaker.record_failure()
+
+        self.assertEqual(OPEN, self.breaker.state)
+        self.assertFalse(self.breaker.allow())
+        self.assertEqual({'state': OPEN, 'opened': 1, 'short_circuits': 1}, self.breaker.stats())
+
+    def test_lets_a_single_trial_call_through_after_the_reset_timeout(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.clock.now = 10
+
+        self.assertTrue(self.breaker.allow())
+        self.assertFalse(self.breaker.allow())
+        self.assertEqual(HALF_OPEN, self.breaker.state)
+
+        self.breaker.record_failure()
+        self.assertEqual(OPEN, self.breaker.state)
+        self.clock.now = 20
+        self.assertTrue(self.breaker.allow())
+        self.breaker.record_success()
+
+        self.assertEqual(CLOSED, self.breaker.state)
+        self.assertTrue(self.breaker.allow())
+
+
+class TestResilientLLMClient(unittest.TestCase):
+
+    def test_slow_call_is_hedged_and_the_hedge_wins(self):
+        resilience = _warmed_up(ResiliencePolicy(hedge_percentile=95, hedge_min_samples=5))
+        completions = SlowFirstCompletions(first_delay=0.5)
+
+        response = _client(completions, resilience).chat.completions.create(messages=[])
+
+        self.assertEqual('response 2', response)
+        self.assertEqual((1, 1), (resilience.hedges_fired, resilience.hedges_won))
+
+    def test_calls_are_not_hedged_until_enough_latencies_are_recorded(self):
+        resilience = LLMResilience(policy=ResiliencePolicy(hedge_percentile=95, hedge_min_samples=5))
+        completions = SlowFirstCompletions(first_delay=0.05)
+
+        response = _client(completions, resilience).chat.completions.create(messages=[])
+
+        self.assertEqual('response 1', response)
+        self.assertEqual(0, resilience.hedges_fired)
+
+    def test_call_times_out(self):
+        resilience = LLMResilience(policy=ResiliencePolicy(timeout=0.05))
+        completions = SlowFirstCompletions(first_delay=0.5)
+
+        with self.assertRaises(LLMTimeoutError):
+            _client(completions, resilience).chat.completions.create(messages=[])
+
+        self.assertEqual(1, resilience.stats()['timeouts'])
+
+    def test_open_circuit_fails_fast_without_calling_the_model(self):
+        resilience = LLMResilience(policy=ResiliencePolicy(failure_threshold=1))
+        completions = Mock()
+        completions.create.side_effect = openai.APIConnectionError(request=httpx.Request('POST', 'https://endpoint'))
+        client = _client(completions, resilience)
+
+        with self.assertRaises(openai.APIConnectionError):
+            client.chat.completions.create(messages=[])
+        with self.assertRaises(CircuitOpenError):
+            client.chat.completions.create(messages=[])
+
+        completions.create.assert_called_once()
+        self.assertEqual({'state': OPEN, 'opened': 1, 'short_circuits': 1}, resilience.stats()['circuit'])
+
+    def test_bad_requests_do_not_open_the_circuit(self):
+        resilience = LLMResilience(policy=ResiliencePolicy(failure_threshold=1))
+        completions = Mock()
+        response = httpx.Response(400, request=httpx.Request('POST', 'https://endpoint'))
+        completions.create.side_effect = openai.BadRequestError('Bad request', response=response, body=None)
+
+        with self.assertRaises(openai.BadRequestError):
+            _client(completions, resilience).chat.completions.create(messages=[])
+
+        self.assertEqual(CLOSED, resilience.breaker.state)
+
+    def test_async_hedge_wins_and_the_slow_call_is_cancelled(self):
+        resilience = _warmed_up(ResiliencePolicy(timeout=1, hedge_percentile=95, hedge_min_samples=5))
+        completions = AsyncSlowFirstCompletions(first_delay=0.5)
+
+        response = asyncio.run(_client(completions, resilience, is_async=True).chat.completions.create(messages=[]))
+
+        self.assertEqual('response 2', response)
+        self.assertEqual(1, completions.cancelled)
+        self.assertEqual((1, 1), (resilience.hedges_fired, resilience.hedges_won))
+
+    def test_async_call_times_out(self):
+        resilience = LLMResilience(policy=ResiliencePolicy(timeout=0.05))
+        completions = AsyncSlowFirstCompletions(first_delay=0.5)
+
+        with self.assertRaises(LLMTimeoutError):
+            asyncio.run(_client(completions, resilience, is_async=True).chat.completions.create(messages=[]))
+
+        self.assertEqual(1, completions.cancelled)
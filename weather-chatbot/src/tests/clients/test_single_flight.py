@@ -0,0 +1,109 @@
+import asyncio
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from src.clients.single_flight import SingleFlight
+from src.deadline import Deadline, DeadlineExceeded, current_deadline, deadline_scope
+
+
+class TestSingleFlight(unittest.TestCase):
+
+    def setUp(self):
+        self.single_flight = SingleFlight()
+
+    def _concurrent_calls(self, fn, callers=5):
+        """Calls do() from several threads, releasing the first call once all the others are waiting on it."""
+        release = threading.Event()
+
+        def call():
+            release.wait(timeout=1)
+            return fn()
+
+        with ThreadPoolExecutor(max_workers=callers) as executor:
+            futures = [executor.submit(self.single_flight.do, 'seattle', call) for _ in range(callers)]
+            while self.single_flight.stats()['coalesced'] < callers - 1:
+                time.sleep(0.001)
+            release.set()
+
+        return futures
+
+    def test_concurrent_threads_share_one_call(self):
+        calls = []
+
+        futures = self._concurrent_calls(lambda: calls.append(1) or 'result')
+
+        self.assertEqual(['result'] * 5, [future.result() for future in futures])
+        self.assertEqual(1, len(calls))
+        self.assertEqual({'calls': 1, 'coalesced': 4}, self.single_flight.stats())
+
+    def test_waiting_threads_get_the_exception(self):
+        def fail():
+            raise ConnectionError('Maps is down')
+
+        futures = self._concurrent_calls(fail)
+
+        self.assertEqual([ConnectionError] * 5, [type(future.exception()) for future in futures])
+
+    def test_callers_wait_no_longer_than_their_own_budget(self):
+        release = threading.Event()
+
+        def call():
+            release.wait(timeout=1)
+            return current_deadline()
+
+        def call_with_budget():
+            with deadline_scope(Deadline(0.05)):
+                return self.single_flight.do('seattle', call)
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            leader = executor.submit(call_with_budget)
+            while self.single_flight.stats()['calls'] < 1:
+                time.sleep(0.001)
+            follower = executor.submit(self.single_flight.do, 'seattle', call)
+            while self.single_flight.stats()['coalesced'] < 1:
+                time.sleep(0.001)
+
+            self.assertRaises(DeadlineExceeded, leader.result)
+            release.set()
+
+        # The follower, with no budget, gets the shared call's result, made outside the leader's deadline
+        self.assertIsNone(follower.result())
+        self.assertEqual({'calls': 1, 'coalesced': 1}, self.single_flight.stats())
+
+    def test_calls_after_completion_are_not_coalesced(self):
+        self.single_flight.do('seattle', lambda: 1)
+        result = self.single_flight.do('seattle', lambda: 2)
+
+        self.assertEqual(2, result)
+        self.assertEqual({'calls': 2, 'coalesced': 0}, self.single_flight.stats())
+
+    def test_concurrent_coroutines_share_one_call(self):
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return 'result'
+
+        async def run():
+            return await asyncio.gather(*(self.single_flight.do_async('seattle', fetch) for _ in range(5)))
+
+        self.assertEqual(['result'] * 5, asyncio.run(run()))
+        self.assertEqual(1, len(calls))
+        self.assertEqual({'calls': 1, 'coalesced': 4}, self.single_flight.stats())
+
+    def test_cancelled_caller_does_not_cancel_the_shared_call(self):
+        async def fetch():
+            await asyncio.sleep(0.01)
+            return 'result'
+
+        async def run():
+            first = asyncio.ensure_future(self.single_flight.do_async('seattle', fetch))
+            second = asyncio.ensure_future(self.single_flight.do_async('seattle', fetch))
+            await asyncio.sleep(0)
+            first.cancel()
+            return await second
+
+        self.assertEqual('result', asyncio.run(run()))
@@ -0,0 +1,124 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock
+
+from src.clients.weather import WeatherType
+from src.clients.weather_cache import SqliteWeatherStore, WeatherCache, geohash
+from src.deadline import Deadline, DeadlineExceeded, current_deadline, deadline_scope
+
+
+class TestWeatherCache(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 1000.0
+        self.fetch = Mock(return_value=b'{"results": []}')
+
+    def _cache(self, **kwargs) -> WeatherCache:
+        return WeatherCache(fetch=self.fetch, clock=lambda: self.now, **kwargs)
+
+    def test_geohash_matches_reference_value(self):
+        self.assertEqual('c23nb', geohash(47.6062, -122.3321))
+        self.assertEqual('u4pruydqqvj', geohash(57.64911, 10.40744, precision=11))
+
+    def test_nearby_coordinates_share_an_upstream_call(self):
+        cache = self._cache()
+
+        cache.get_weather(lat=47.6062, lon=-122.3321, weather_type=WeatherType.CURRENT_CONDITIONS)
+        data = cache.get_weather(lat=47.6070, lon=-122.3330, weather_type=WeatherType.CURRENT_CONDITIONS)
+
+        self.assertEqual(b'{"results": []}', data)
+        self.fetch.assert_called_once()
+        self.assertEqual(1, cache.stats()['hits'])
+
+    def test_concurrent_misses_share_one_fetch(self):
+        async def fetch(**kwargs):
+            await asyncio.sleep(0.01)
+            return b'{"results": []}'
+
+        async_fetch = Mock(side_effect=fetch)
+        cache = self._cache(async_fetch=async_fetch)
+
+        async def run():
+            return await asyncio.gather(*(cache.get_weather_async(lat=47.6, lon=-122.3,
+                                                                  weather_type=WeatherType.CURRENT_CONDITIONS)
+                                          for _ in range(3)))
+
+        self.assertEqual([b'{"results": []}'] * 3, asyncio.run(run()))
+        async_fetch.assert_called_once()
+        self.assertEqual(2, cache.stats()['coalesced'])
+
+    def test_shared_fetch_is_not_bound_by_one_sessions_budget(self):
+        async def fetch(**kwargs):
+            self.assertIsNone(current_deadline())
+            await asyncio.sleep(0.1)
+            return b'{"results": []}'
+
+        cache = self._cache(async_fetch=Mock(side_effect=fetch))
+
+        async def session(budget):
+            with deadline_scope(Deadline(budget) if budget is not None else None):
+                return await cache.get_weather_async(lat=47.6, lon=-122.3, weather_type=WeatherType.CURRENT_CONDITIONS)
+
+        async def run():
+            return await asyncio.gather(session(0.02), session(None), session(0.05), return_exceptions=True)
+
+        short, unbounded, follower = asyncio.run(run())
+
+        self.assertIsInstance(short, DeadlineExceeded)
+        self.assertEqual(b'{"results": []}', unbounded)
+        self.assertIsInstance(follower, DeadlineExceeded)
+        self.assertEqual(2, cache.stats()['coalesced'])
+
+    def test_expired_entry_is_used_when_the_turn_has_no_time_to_refresh_it(self):
+        cache = self._cache(ttls={WeatherType.CURRENT_CONDITIONS: 10})
+        cache.get_weather(lat=47.6, lon=-122.3, weather_type=WeatherType.CURRENT_CONDITIONS)
+        self.now += 50
+
+        with deadline_scope(Deadline(1.0, reserve=1.0)):
+            data = cache.get_weather(lat=47.6, lon=-122.3, weather_type=WeatherType.CURRENT_CONDITIONS)
+
+        self.assertEqual(b'{"results": []}', data)
+        self.fetch.assert_called_once()
+
+        cache.get_weather(lat=47.6, lon=-122.3, weather_type=WeatherType.CURRENT_CONDITIONS)
+        self.assertEqual(2, self.fetch.call_count)
+
+    def test_weather_types_are_cached_separately_with_their_own_ttl(self):
+        cache = self._cache(ttls={WeatherType.SEVERE_ALERTS: 10, WeatherType.DAILY_FORECAST: 100})
+
+        cache.get_weather(lat=47.6, lon=-122.3, weather_type=WeatherType.SEVERE_ALERTS)
+        cache.get_weather(lat=47.6, lon=-122.3, weather_type=WeatherType.DAILY_FORECAST)
+        self.now += 50
+        cache.get_weather(lat=47.6, lon=-122.3, weather_type=WeatherType.SEVERE_ALERTS)
+        cache.get_weather(lat=47.6, lon=-122.3, weather_type=WeatherType.DAILY_FORECAST)
+
+        self.assertEqual(3, self.fetch.call_count)
+
+    def test_invalid_coordinates_bypass_the_cache(self):
+        cache = self._cache()
+
+        cache.get_weather(lat=45.0, lon=189, weather_type=WeatherType.CURRENT_CONDITIONS)
+        cache.get_weather(lat=45.0, lon=189, weather_type=WeatherType.CURRENT_CONDITIONS)
+
+        self.assertEqual(2, self.fetch.call_count)
+        self.assertEqual(0, cache.stats()['size'])
+
+    def test_entries_survive_restart_with_disk_store(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'weather.db')
+            store = SqliteWeatherStore(path)
+            self._cache(store=store).get_weather(lat=47.6, lon=-122.3, weather_type=WeatherType.DAILY_FORECAST)
+            store.close()
+
+            store = SqliteWeatherStore(path)
+            restarted = self._cache(store=store)
+            data = restarted.get_weather(lat=47.6, lon=-122.3, weather_type=WeatherType.DAILY_FORECAST)
+            stats = restarted.stats()
+            store.close()
+
+        self.assertEqual(b'{"results": []}', data)
+        self.fetch.assert_called_once()
+        self.assertEqual(1, stats['disk_hits'])
+        self.assertEqual(1, stats['disk_size'])
@@ -1,32 +1,48 @@
 import unittest
 import json
 import os
-from unittest.mock import Mock, patch
+import httpx
+from unittest.mock import AsyncMock, Mock, patch
 from unittest import mock
-from requests.exceptions import HTTPError
+from requests.exceptions import ConnectTimeout, HTTPError
 from requests import Response
 
-from src.clients.weather import Weather, WeatherType
+from src.clients.weather import AsyncWeatherClient, Weather, WeatherClient, WeatherType
+from src.deadline import Deadline, DeadlineExceeded, deadline_scope
+
+
+def _response(status_code: int, content: str = '', headers: dict | None = None) -> Response:
+    response = Response()
+    response.status_code = status_code
+    response._content = content
+    response.headers.update(headers or {})
+    return response
 
 
 @mock.patch.dict(os.environ, {"MAPS_API_KEY": "FAKE_KEY"})
 class TestWeatherClient(unittest.TestCase):
-    @patch("src.clients.weather.requests")
-    @patch("requests.Response")
-    def test_get_weather_valid_coords_returns_valid_content(self, mock_response: Mock, mock_requests: Mock):
 
-        mock_response.status_code = 200
+    def setUp(self):
+        self.session = Mock()
+        self.sleep = Mock()
+        self.client = WeatherClient(session=self.session, sleep=self.sleep)
 
-        mock_response.content = '{"results": [{"temperature": {"value": 15.0, "unit": "C", "unitType": 17}}]}'
+    def test_get_weather_valid_coords_returns_valid_content(self):
 
-        mock_requests.get.return_value = mock_response
+        self.session.get.return_value = _response(
+            200, '{"results": [{"temperature": {"value": 15.0, "unit": "C", "unitType": 17}}]}')
 
-        current_weather = Weather.get_weather(lat=45.6579106, lon=-122.5834869, weather_type=WeatherType.CURRENT_CONDITIONS)
+        current_weather = self.client.get_weather(lat=45.6579106, lon=-122.5834869,
+                                                  weather_type=WeatherType.CURRENT_CONDITIONS)
 
         self.assertNotEqual(current_weather, "")
         self.assertNotEqual(current_weather, None)
         self.assertIsInstance(current_weather, str)
         self.assertEqual(json.loads(current_weather)["results"][0]["temperature"]["value"], 15.0)
+        self.session.get.assert_called_once()
+        self.assertEqual((self.client.connect_timeout, self.client.read_timeout),
+                         self.session.get.call_args.kwargs["timeout"])
+        self.assertEqual(1, self.client.stats()["count"])
 
     def test_get_weather_invalid_coords_returns_invalid_message(self):
 
@@ -42,17 +58,90 @@ class TestWeatherClient(unittest.TestCase):
                          "range for lat -90 - 90, range for lon -180 - 180")
 
     @patch("src.clients.weather.logger")
-    @patch("src.clients.weather.requests")
-    @patch("requests.Response")
-    def test_get_weather_error_response_throws_exception(self, mock_response: Mock,
-                                                         mock_requests: Mock, mock_logger: Mock):
-        fake_response = Response()
-        fake_response.status_code = 500
+    def test_get_weather_error_response_throws_exception(self, mock_logger: Mock):
+        fake_response = _response(500)
         fake_response.reason = 'Internal Server Error'
 
-        mock_requests.get.return_value = fake_response
+        self.session.get.return_value = fake_response
 
         # make sure to throw exception before you check to see if logger.exception called
-        self.assertRaises(HTTPError, Weather.get_weather, lat=45.6579106, lon=-122.5834869,
+        self.assertRaises(HTTPError, self.client.get_weather, lat=45.6579106, lon=-122.5834869,
                           weather_type=WeatherType.CURRENT_CONDITIONS)
         mock_logger.exception.assert_called_once()
+        self.assertEqual(self.client.max_retries + 1, self.session.get.call_count)
+        self.assertEqual(1, self.client.stats()["errors"])
+
+    def test_get_weather_non_retryable_error_is_not_retried(self):
+        self.session.get.return_value = _response(404)
+
+        self.assertRaises(HTTPError, self.client.get_weather, lat=45.6, lon=-122.5,
+                          weather_type=WeatherType.CURRENT_CONDITIONS)
+        self.session.get.assert_called_once()
+
+    def test_get_weather_honours_retry_after(self):
+        self.session.get.side_effect = [_response(429, headers={"Retry-After": "2"}), _response(200, '{}')]
+
+        self.client.get_weather(lat=45.6, lon=-122.5, weather_type=WeatherType.CURRENT_CONDITIONS)
+
+        delay = self.sleep.call_args.args[0]
+        self.assertGreaterEqual(delay, 2)
+        self.assertLessEqual(delay, 2 + self.client.backoff_factor)
+        self.assertEqual(1, self.client.stats()["retries"])
+
+    def test_get_weather_gives_up_on_long_retry_after(self):
+        for retry_after in ["3600", "Wed, 21 Oct 2099 07:28:00 GMT"]:
+            self.session.get.reset_mock()
+            self.session.get.return_value = _response(429, headers={"Retry-After": retry_after})
+
+            self.assertRaises(HTTPError, self.client.get_weather, lat=45.6, lon=-122.5,
+                              weather_type=WeatherType.CURRENT_CONDITIONS)
+
+            self.session.get.assert_called_once()
+        self.sleep.assert_not_called()
+
+    def test_get_weather_is_bounded_by_the_turn_budget(self):
+        self.session.get.return_value = _response(429, headers={"Retry-After": "5"})
+
+        with deadline_scope(Deadline(1.0)):
+            self.assertRaises(DeadlineExceeded, self.client.get_weather, lat=45.6, lon=-122.5,
+                              weather_type=WeatherType.CURRENT_CONDITIONS)
+
+        # The Retry-After is longer than what is left of the budget, so there is no retry
+        self.session.get.assert_called_once()
+        connect_timeout, read_timeout = self.session.get.call_args.kwargs["timeout"]
+        self.assertLessEqual(read_timeout, 1.0)
+
+    def test_get_weather_retries_timeouts(self):
+        self.session.get.side_effect = [ConnectTimeout(), _response(200, '{}')]
+
+        current_weather = self.client.get_weather(lat=45.6, lon=-122.5, weather_type=WeatherType.DAILY_FORECAST)
+
+        self.assertEqual('{}', current_weather)
+        self.assertEqual(2, self.session.get.call_count)
+        self.sleep.assert_called_once()
+
+
+@mock.patch.dict(os.environ, {"MAPS_API_KEY": "FAKE_KEY"})
+class TestAsyncWeatherClient(unittest.IsolatedAsyncioTestCase):
+
+    async def test_get_weather_retries_server_errors(self):
+        statuses = [503, 200]
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(statuses.pop(0), content=b'{"results": []}')
+
+        sleep = AsyncMock()
+        client = AsyncWeatherClient(transport=httpx.MockTransport(handler), sleep=sleep)
+
+        current_weather = await client.get_weather(lat=45.6, lon=-122.5, weather_type=WeatherType.CURRENT_CONDITIONS)
+
+        self.assertEqual(b'{"results": []}', current_weather)
+        sleep.assert_awaited_once()
+        self.assertEqual({"count": 2, "retries": 1, "errors": 0},
+                         {key: client.stats()[key] for key in ("count", "retries", "errors")})
+
+    async def test_get_weather_error_response_throws_exception(self):
+        client = AsyncWeatherClient(transport=httpx.MockTransport(lambda request: httpx.Response(400)))
+
+        with self.assertRaises(httpx.HTTPStatusError):
+            await client.get_weather(lat=45.6, lon=-122.5, weather_type=WeatherType.CURRENT_CONDITIONS)
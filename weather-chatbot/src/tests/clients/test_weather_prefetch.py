@@ -0,0 +1,88 @@
+import asyncio
+import threading
+import unittest
+from unittest.mock import AsyncMock, Mock
+
+from src.clients.weather import WeatherType
+from src.clients.weather_cache import WeatherCache
+from src.clients.weather_prefetch import PrefetchPolicy, WeatherPrefetcher
+
+
+class TestWeatherPrefetcher(unittest.TestCase):
+
+    def setUp(self):
+        self.fetch = Mock(side_effect=lambda lat, lon, weather_type: weather_type.name)
+        self.cache = WeatherCache(fetch=self.fetch)
+
+    def test_prefetched_data_is_used_without_another_upstream_call(self):
+        prefetcher = WeatherPrefetcher(cache=self.cache)
+
+        prefetcher.prefetch(47.6, -122.3)
+        data = prefetcher.get_weather(lat=47.6, lon=-122.3, weather_type=WeatherType.DAILY_FORECAST)
+
+        self.assertEqual('DAILY_FORECAST', data)
+        # The other prefetches may still be running
+        prefetcher.executor.shutdown(wait=True)
+        self.assertEqual(len(WeatherType), self.fetch.call_count)
+        stats = prefetcher.stats()
+        self.assertEqual({'prefetched': 3, 'used': 1, 'pending': 2},
+                         {key: stats[key] for key in ('prefetched', 'used', 'pending')})
+        prefetcher.close()
+
+    def test_policy_limits_types_and_in_flight_fetches(self):
+        release = threading.Event()
+        in_flight = []
+        max_in_flight = []
+
+        def fetch(lat, lon, weather_type):
+            in_flight.append(weather_type)
+            max_in_flight.append(len(in_flight))
+            release.wait(timeout=1)
+            in_flight.remove(weather_type)
+            return weather_type.name
+
+        policy = PrefetchPolicy(weather_types=[WeatherType.SEVERE_ALERTS, WeatherType.CURRENT_CONDITIONS],
+                                max_in_flight=1)
+        prefetcher = WeatherPrefetcher(policy=policy, cache=WeatherCache(fetch=fetch))
+
+        prefetcher.prefetch(47.6, -122.3)
+        release.set()
+        prefetcher.get_weather(lat=47.6, lon=-122.3, weather_type=WeatherType.CURRENT_CONDITIONS)
+
+        self.assertEqual(1, max(max_in_flight))
+        self.assertEqual(2, prefetcher.stats()['prefetched'])
+        prefetcher.close()
+
+    def test_disabled_policy_reads_through_the_cache(self):
+        prefetcher = WeatherPrefetcher(policy=PrefetchPolicy(enabled=False), cache=self.cache)
+
+        prefetcher.prefetch(47.6, -122.3)
+        data = prefetcher.get_weather(lat=47.6, lon=-122.3, weather_type=WeatherType.SEVERE_ALERTS)
+
+        self.assertEqual('SEVERE_ALERTS', data)
+        self.fetch.assert_called_once()
+        self.assertEqual(0, prefetcher.stats()['prefetched'])
+
+    def test_failed_prefetch_is_fetched_again(self):
+        self.fetch.side_effect = [Exception('timeout'), 'CURRENT_CONDITIONS']
+        policy = PrefetchPolicy(weather_types=[WeatherType.CURRENT_CONDITIONS])
+        prefetcher = WeatherPrefetcher(policy=policy, cache=self.cache)
+
+        prefetcher.prefetch(47.6, -122.3)
+        data = prefetcher.get_weather(lat=47.6, lon=-122.3, weather_type=WeatherType.CURRENT_CONDITIONS)
+
+        self.assertEqual('CURRENT_CONDITIONS', data)
+        self.assertEqual(1, prefetcher.stats()['failed'])
+        prefetcher.close()
+
+    def test_prefetch_async_schedules_tasks_on_the_running_loop(self):
+        async_fetch = AsyncMock(side_effect=lambda lat, lon, weather_type: weather_type.name)
+        prefetcher = WeatherPrefetcher(cache=WeatherCache(fetch=self.fetch, async_fetch=async_fetch))
+
+        async def run():
+            await prefetcher.prefetch_async(47.6, -122.3)
+            return await prefetcher.get_weather_async(lat=47.6, lon=-122.3, weather_type=WeatherType.SEVERE_ALERTS)
+
+        self.assertEqual('SEVERE_ALERTS', asyncio.run(run()))
+        self.assertEqual(1, prefetcher.stats()['used'])
+        self.fetch.assert_not_called()
@@ -0,0 +1,92 @@
+import json
+import unittest
+
+from src.clients.weather import WeatherType
+from src.clients.weather_projection import project_weather
+from src.metrics import estimate_tokens
+
+
+def _measure(value, unit='C'):
+    return {'value': value, 'unit': unit, 'unitType': 17}
+
+
+CURRENT_CONDITIONS = {'results': [{
+    'dateTime': '2024-03-01T10:00:00-08:00', 'phrase': 'Cloudy', 'iconCode': 7, 'hasPrecipitation': False,
+    'isDayTime': True, 'temperature': _measure(15.2), 'realFeelTemperature': _measure(13.9),
+    'realFeelTemperatureShade': _measure(13.9), 'relativeHumidity': 80, 'dewPoint': _measure(11.8),
+    'wind': {'direction': {'degrees': 225.0, 'localizedDescription': 'SW'}, 'speed': _measure(11.1, 'km/h')},
+    'windGust': {'speed': _measure(20.4, 'km/h')}, 'uvIndex': 1, 'uvIndexPhrase': 'Low',
+    'visibility': _measure(16.1, 'km'), 'obstructionsToVisibility': '', 'cloudCover': 90,
+    'ceiling': _measure(1219.0, 'm'), 'pressure': _measure(1014.9, 'mb'),
+    'pressureTendency': {'localizedDescription': 'Steady', 'code': 'S'},
+    'past24HourTemperatureDeparture': _measure(1.1), 'apparentTemperature': _measure(16.1),
+    'windChillTemperature': _measure(15.0), 'wetBulbTemperature': _measure(13.0),
+    'precipitationSummary': {'pastHour': _measure(0.0, 'mm'), 'past24Hours': _measure(2.1, 'mm')},
+    'temperatureSummary': {'past6Hours': {'minimum': _measure(9.4), 'maximum': _measure(15.2)}}}]}
+
+DAILY_FORECAST = {
+    'summary': {'startDate': '2024-03-02T07:00:00-08:00', 'severity': 3,
+                'phrase': 'Expect rainy weather Saturday morning', 'category': 'rain'},
+    'forecasts': [{
+        'date': '2024-03-01T07:00:00-08:00',
+        'temperature': {'minimum': _measure(8.3), 'maximum': _measure(15.6)},
+        'realFeelTemperature': {'minimum': _measure(6.1), 'maximum': _measure(14.2)},
+        'hoursOfSun': 1.2, 'degreeDaySummary': {'heating': _measure(6.0), 'cooling': _measure(0.0)},
+        'airAndPollen': [{'name': 'AirQuality', 'value': 21, 'category': 'Good', 'categoryValue': 1}],
+        'day': {'iconCode': 12, 'iconPhrase': 'Showers', 'hasPrecipitation': True, 'precipitationType': 'Rain',
+                'precipitationIntensity': 'Light', 'shortPhrase': 'Showers', 'longPhrase': 'Cloudy with showers',
+                'precipitationProbability': 80, 'thunderstormProbability': 10, 'rainProbability': 80,
+                'snowProbability': 0, 'iceProbability': 0,
+                'wind': {'direction': {'degrees': 200.0, 'localizedDescription': 'SSW'}, 'speed': _measure(14.8, 'km/h')},
+                'totalLiquid': _measure(3.2, 'mm'), 'rain': _measure(3.2, 'mm'), 'cloudCover': 96},
+        'night': {'iconCode': 7, 'iconPhrase': 'Cloudy', 'hasPrecipitation': False,
+                  'precipitationProbability': 20, 'thunderstormProbability': 0,
+                  'wind': {'speed': _measure(9.3, 'km/h')}, 'totalLiquid': _measure(0.0, 'mm')}}]}
+
+SEVERE_ALERTS = {'results': [{
+    'countryCode': 'US', 'alertId': 242621, 'description': {'localized': 'Wind Advisory', 'english': 'Wind Advisory'},
+    'category': 'WIND', 'priority': 40, 'class': 'Meteorological', 'level': 'Moderate', 'source': 'NWS',
+    'alertAreas': [{'name': 'Seattle', 'summary': 'Wind Advisory in effect until 6 PM PST.',
+                    'startTime': '2024-03-01T09:00:00+00:00', 'endTime': '2024-03-02T02:00:00+00:00',
+                    'latestStatus': {'localized': 'Continue', 'english': 'Continue'},
+                    'alertDetails': '...WIND ADVISORY REMAINS IN EFFECT UNTIL 6 PM PST THIS EVENING... ' * 10}]}]}
+
+
+class TestWeatherProjection(unittest.TestCase):
+
+    def test_current_conditions_keep_the_useful_fields(self):
+        projected = project_weather(json.dumps(CURRENT_CONDITIONS).encode(), WeatherType.CURRENT_CONDITIONS)
+
+        self.assertEqual('2024-03-01T10:00:00-08:00, Cloudy, 15.2C, feels like 13.9C, humidity 80%, '
+                         'wind SW 11.1km/h, gusts 20.4km/h, UV Low, cloud cover 90%, '
+                         'precipitation past hour 0.0mm, past 24h 2.1mm', projected)
+
+    def test_daily_forecast_keeps_day_ranges_and_precipitation(self):
+        projected = project_weather(json.dumps(DAILY_FORECAST).encode(), WeatherType.DAILY_FORECAST)
+
+        self.assertEqual('Summary: Expect rainy weather Saturday morning\n'
+                         '2024-03-01: 8.3C to 15.6C; sun 1.2h; '
+                         'day: Showers, precipitation 80%, Light Rain, total 3.2mm, thunderstorms 10%, wind 14.8km/h; '
+                         'night: Cloudy, precipitation 20%, total 0.0mm, thunderstorms 0%, wind 9.3km/h', projected)
+
+    def test_severe_alerts_keep_the_summaries(self):
+        projected = project_weather(json.dumps(SEVERE_ALERTS).encode(), WeatherType.SEVERE_ALERTS)
+
+        self.assertEqual('Wind Advisory, WIND, priority 40, Seattle, Wind Advisory in effect until 6 PM PST., '
+                         'from 2024-03-01T09:00:00+00:00, until 2024-03-02T02:00:00+00:00', projected)
+        self.assertEqual('No active severe weather alerts', project_weather(b'{"results": []}',
+                                                                            WeatherType.SEVERE_ALERTS))
+
+    def test_projection_cuts_prompt_tokens(self):
+        for payload, weather_type in [(CURRENT_CONDITIONS, WeatherType.CURRENT_CONDITIONS),
+                                      (DAILY_FORECAST, WeatherType.DAILY_FORECAST),
+                                      (SEVERE_ALERTS, WeatherType.SEVERE_ALERTS)]:
+            raw = json.dumps(payload).encode()
+
+            self.assertLess(estimate_tokens(project_weather(raw, weather_type)), estimate_tokens(str(raw)) / 2)
+
+    def test_non_json_data_is_passed_through(self):
+        message = 'Coordinates out of range: received lat 45.6 lon 189'
+
+        self.assertEqual(message, project_weather(message, WeatherType.CURRENT_CONDITIONS))
+        self.assertIsNone(project_weather(None, WeatherType.CURRENT_CONDITIONS))
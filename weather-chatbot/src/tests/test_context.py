@@ -0,0 +1,60 @@
+import unittest
+
+from src.clients.weather import WeatherType
+from src.context import SNAPSHOT_HEADER, Context
+
+
+class TestContext(unittest.TestCase):
+
+    def _context(self, turns: int = 1) -> Context:
+        context = Context()
+        for turn in range(turns):
+            context.add_message('user', f'Will it rain in Zürich on day {turn}?')
+            context.add_message('assistant', 'No rain is expected.')
+        context.location = (47.3769, 8.5417)
+        context.location_description = 'Switzerland, Zürich'
+        context.weather_category = WeatherType.DAILY_FORECAST
+        context.location_summary = 'Zürich, Switzerland'
+        context.location_checked_upto = 2
+        context.history_summary = 'The user asked about rain in Zürich.'
+        context.history_summary_upto = 2
+
+        return context
+
+    def _assert_restored(self, context: Context):
+        restored = Context.from_bytes(context.to_bytes())
+
+        self.assertEqual(context.get_messages(), restored.get_messages())
+        self.assertEqual(context.transcript.render(), restored.transcript.render())
+        for field in ('location', 'location_description', 'weather_category', 'location_summary',
+                      'location_checked_upto', 'history_summary', 'history_summary_upto'):
+            self.assertEqual(getattr(context, field), getattr(restored, field), field)
+
+    def test_snapshot_round_trip(self):
+        self._assert_restored(self._context())
+        self._assert_restored(Context())
+
+    def test_large_snapshot_is_compressed(self):
+        context = self._context(turns=100)
+
+        self.assertLess(len(context.to_bytes()), len(context.transcript.render()))
+        self._assert_restored(context)
+
+    def test_unknown_version_is_rejected(self):
+        snapshot = bytearray(Context().to_bytes())
+        snapshot[3] = 99
+
+        with self.assertRaisesRegex(ValueError, 'version'):
+            Context.from_bytes(bytes(snapshot))
+
+        with self.assertRaises(ValueError):
+            Context.from_bytes(b'{}')
+
+    def test_roles_are_interned(self):
+        context = Context()
+        context.add_message(''.join(['us', 'er']), 'Hi')
+        context.add_message(''.join(['u', 'ser']), 'Hello')
+
+        first, second = context.get_messages()
+        self.assertIs(first['role'], second['role'])
+        self.assertEqual(5, SNAPSHOT_HEADER.size)
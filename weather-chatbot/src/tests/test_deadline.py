@@ -0,0 +1,55 @@
+import asyncio
+import unittest
+
+from src.deadline import (Deadline, DeadlineExceeded, check_deadline, current_deadline, deadline_scope,
+                          remaining_timeout, skip_optional)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestDeadline(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.deadline = Deadline(4.0, clock=self.clock)
+
+    def test_downstream_timeouts_are_capped_by_the_remaining_budget(self):
+        self.clock.now += 3
+
+        with deadline_scope(self.deadline):
+            self.assertEqual(1.0, remaining_timeout(10.0))
+            self.assertEqual(0.5, remaining_timeout(0.5))
+        self.assertEqual(10.0, remaining_timeout(10.0))
+        self.assertIsNone(remaining_timeout())
+
+    def test_optional_steps_are_skipped_once_the_reserve_is_reached(self):
+        with deadline_scope(self.deadline):
+            self.assertFalse(skip_optional('weather refresh'))
+            self.clock.now += 3.5
+            self.assertTrue(skip_optional('weather refresh'))
+
+        self.assertEqual(['weather refresh'], self.deadline.skipped)
+        self.assertFalse(skip_optional('weather refresh'))
+
+    def test_check_raises_once_the_budget_is_spent(self):
+        self.clock.now += 4
+
+        with deadline_scope(self.deadline):
+            with self.assertRaises(DeadlineExceeded):
+                check_deadline('the weather request')
+
+    def test_tasks_started_in_the_scope_share_its_deadline(self):
+        async def step():
+            return current_deadline()
+
+        async def turn():
+            with deadline_scope(self.deadline):
+                return await asyncio.gather(step(), step())
+
+        self.assertEqual([self.deadline, self.deadline], asyncio.run(turn()))
@@ -0,0 +1,72 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, Mock
+
+from src.context import Context
+from src.history import HistoryManager
+
+
+class TestHistoryManager(unittest.TestCase):
+
+    def setUp(self):
+        self.summarize = Mock(side_effect=lambda summary, transcript: f'summary of {transcript.count(chr(10)) + 1}')
+
+    def _context(self, turns: int, content: str = 'short') -> Context:
+        context = Context()
+        for turn in range(turns):
+            context.add_message('user', f'{content} question {turn}')
+            context.add_message('assistant', f'{content} answer {turn}')
+
+        return context
+
+    def test_short_history_is_rendered_verbatim(self):
+        context = self._context(turns=3)
+        history = HistoryManager(keep_turns=2, summarize=self.summarize)
+
+        self.assertEqual(context.transcript.render(), history.render(context))
+        self.summarize.assert_not_called()
+
+    def test_summary_is_refreshed_only_when_the_window_slides(self):
+        history = HistoryManager(keep_turns=2, summarize=self.summarize)
+        context = self._context(turns=4)
+
+        rendered = history.render(context)
+        self.assertEqual(4, context.history_summary_upto)
+        self.assertTrue(rendered.startswith('Summary of the earlier conversation: summary of 4\n'))
+        self.assertTrue(rendered.endswith('user: short question 2\nassistant: short answer 2\n'
+                                          'user: short question 3\nassistant: short answer 3'))
+
+        for turn in range(4, 5):
+            context.add_message('user', f'short question {turn}')
+            context.add_message('assistant', f'short answer {turn}')
+            history.render(context)
+
+        self.assertEqual(1, self.summarize.call_count)
+
+        context.add_message('user', 'short question 5')
+        context.add_message('assistant', 'short answer 5')
+        history.render(context)
+
+        self.assertEqual(2, self.summarize.call_count)
+        self.assertEqual('summary of 4', self.summarize.call_args.args[0])
+        self.assertEqual(8, context.history_summary_upto)
+
+    def test_token_budget_folds_long_messages_but_keeps_the_latest_turn(self):
+        history = HistoryManager(keep_turns=4, token_budget=100, summarize=self.summarize)
+        context = self._context(turns=3, content='long ' * 50)
+
+        history.render(context)
+
+        self.assertEqual(4, context.history_summary_upto)
+        stats = history.stats()
+        self.assertLess(stats['prompt_tokens'], stats['full_history_tokens'])
+
+    def test_render_async_uses_async_summarizer(self):
+        summarize_async = AsyncMock(return_value='async summary')
+        history = HistoryManager(keep_turns=1, summarize=self.summarize, summarize_async=summarize_async)
+        context = self._context(turns=2)
+
+        rendered = asyncio.run(history.render_async(context))
+
+        self.assertIn('async summary', rendered)
+        self.summarize.assert_not_called()
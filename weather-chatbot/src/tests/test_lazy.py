@@ -0,0 +1,52 @@
+import json
+import unittest
+from collections import OrderedDict
+from typing import Optional
+from unittest.mock import patch
+
+from src.lazy import lazy_import
+from src.tests import test_lazy
+
+lazy_json = lazy_import("json")
+LazyOrderedDict = lazy_import("collections", "OrderedDict")
+
+
+class TestLazyImport(unittest.TestCase):
+
+    def test_imports_on_first_use(self):
+        placeholder = lazy_import("json")
+        self.assertFalse(placeholder.is_loaded)
+
+        self.assertEqual('{"a": 1}', placeholder.dumps({"a": 1}))
+        self.assertTrue(placeholder.is_loaded)
+
+    def test_annotations_do_not_import(self):
+        placeholder = lazy_import("collections", "OrderedDict")
+
+        def function(value: Optional[placeholder] = None) -> placeholder:
+            return value
+
+        self.assertIsNone(function())
+        self.assertFalse(placeholder.is_loaded)
+
+    def test_attribute_placeholder_is_callable_and_checks_instances(self):
+        ordered = LazyOrderedDict(a=1)
+
+        self.assertIsInstance(ordered, OrderedDict)
+        self.assertIsInstance(ordered, LazyOrderedDict)
+        self.assertTrue(issubclass(OrderedDict, LazyOrderedDict))
+
+    def test_can_be_patched(self):
+        with patch("src.tests.test_lazy.lazy_json") as mock_json:
+            test_lazy.lazy_json.dumps({})
+            mock_json.dumps.assert_called_once_with({})
+
+        with patch("src.tests.test_lazy.lazy_json.dumps", return_value="patched"):
+            self.assertEqual("patched", lazy_json.dumps({}))
+        self.assertIs(json.dumps, lazy_json.dumps)
+
+    def test_missing_module(self):
+        placeholder = lazy_import("not_a_module")
+
+        with self.assertRaises(ModuleNotFoundError):
+            placeholder.anything
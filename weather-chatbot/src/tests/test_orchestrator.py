@@ -0,0 +1,233 @@
+import asyncio
+import time
+import unittest
+from unittest.mock import Mock, patch
+
+import requests
+
+from src.agents.location.location_extractor import LocationExtractor
+from src.clients.resilience import CircuitOpenError, LLMTimeoutError
+from src.context import Context
+from src.deadline import Deadline, deadline_scope
+from src.orchestrator import FALLBACK_REPLY, AsyncOrchestrator, Orchestrator
+
+
+class FakeLocationAgent:
+    def __init__(self, location_extracted: asyncio.Event, weather_extracted: asyncio.Event, location=None):
+        self.location_extracted = location_extracted
+        self.weather_extracted = weather_extracted
+        self.location = location
+
+    async def extract_async(self, context):
+        self.location_extracted.set()
+        # Only completes if the weather extract step runs at the same time
+        await asyncio.wait_for(self.weather_extracted.wait(), timeout=1)
+        context.location = self.location
+
+    async def reply_async(self, context):
+        return 'Where are you?'
+
+
+class FakeWeatherAgent:
+    def __init__(self, location_extracted: asyncio.Event, weather_extracted: asyncio.Event):
+        self.location_extracted = location_extracted
+        self.weather_extracted = weather_extracted
+
+    async def extract_async(self, context):
+        self.weather_extracted.set()
+        await asyncio.wait_for(self.location_extracted.wait(), timeout=1)
+
+    async def reply_async(self, context):
+        return 'It is sunny.'
+
+
+class TestAsyncOrchestrator(unittest.TestCase):
+
+    def _get_reply(self, location, user_message='Hi'):
+        context = Context()
+
+        async def run():
+            location_extracted = asyncio.Event()
+            weather_extracted = asyncio.Event()
+            orchestrator = AsyncOrchestrator(
+                location_agent=FakeLocationAgent(location_extracted, weather_extracted, location),
+                weather_agent=FakeWeatherAgent(location_extracted, weather_extracted))
+            return await orchestrator.get_reply_async(user_message, context)
+
+        return asyncio.run(run()), context
+
+    def test_extract_steps_run_concurrently_and_weather_agent_replies(self):
+        reply, context = self._get_reply(location=(47.6, -122.3))
+
+        self.assertEqual('It is sunny.', reply)
+        self.assertEqual([{'role': 'user', 'content': 'Hi'}, {'role': 'assistant', 'content': 'It is sunny.'}],
+                         context.get_messages())
+
+    def test_location_agent_replies_when_location_is_unknown(self):
+        reply, _ = self._get_reply(location=None)
+
+        self.assertEqual('Where are you?', reply)
+
+    def test_get_reply_runs_on_a_reused_event_loop(self):
+        orchestrator = AsyncOrchestrator(location_agent=Mock(), weather_agent=Mock())
+        loops = []
+
+        async def get_reply_async(user_message, context):
+            loops.append(asyncio.get_running_loop())
+            return 'reply'
+
+        with patch.object(orchestrator, 'get_reply_async', side_effect=get_reply_async):
+            self.assertEqual('reply', orchestrator.get_reply('Hi', Context()))
+            self.assertEqual('reply', orchestrator.get_reply('Hi again', Context()))
+
+        orchestrator.close()
+        self.assertIs(loops[0], loops[1])
+
+
+class TestOrchestrator(unittest.TestCase):
+
+    @patch('src.orchestrator.WeatherAgent')
+    @patch('src.orchestrator.LocationAgent')
+    def test_stream_reply_yields_chunks_and_records_reply(self, location_agent_mock: Mock, weather_agent_mock: Mock):
+        location_agent_mock.return_value.stream.return_value = None
+        weather_agent_mock.return_value.stream.return_value = iter(['It ', 'is ', 'sunny.'])
+        orchestrator = Orchestrator()
+        context = Context()
+
+        chunks = orchestrator.stream_reply('Will it rain?', context)
+
+        self.assertEqual('It ', next(chunks))
+        self.assertEqual([{'role': 'user', 'content': 'Will it rain?'}], context.get_messages())
+        self.assertIsNotNone(orchestrator.last_time_to_first_token_ms)
+
+        self.assertEqual(['is ', 'sunny.'], list(chunks))
+        self.assertEqual({'role': 'assistant', 'content': 'It is sunny.'}, context.get_messages()[-1])
+        self.assertEqual(1, orchestrator.time_to_first_token.summary()['count'])
+
+    @patch('src.orchestrator.WeatherAgent')
+    @patch('src.orchestrator.LocationAgent')
+    def test_stream_reply_closed_early_records_partial_reply(self, location_agent_mock: Mock,
+                                                             weather_agent_mock: Mock):
+        location_agent_mock.return_value.stream.return_value = None
+        weather_agent_mock.return_value.stream.return_value = iter(['It ', 'is ', 'sunny.'])
+        context = Context()
+
+        chunks = Orchestrator().stream_reply('Will it rain?', context)
+        next(chunks)
+        chunks.close()
+
+        self.assertEqual({'role': 'assistant', 'content': 'It '}, context.get_messages()[-1])
+
+    @patch('src.orchestrator.WeatherAgent')
+    @patch('src.orchestrator.LocationAgent')
+    def test_stream_reply_failing_before_first_chunk_records_fallback_reply(self, location_agent_mock: Mock,
+                                                                            weather_agent_mock: Mock):
+        def fail():
+            raise RuntimeError('Connection reset')
+            yield
+
+        location_agent_mock.return_value.stream.return_value = None
+        weather_agent_mock.return_value.stream.return_value = fail()
+        context = Context()
+
+        with self.assertRaises(RuntimeError):
+            list(Orchestrator().stream_reply('Will it rain?', context))
+
+        self.assertEqual({'role': 'assistant', 'content': FALLBACK_REPLY}, context.get_messages()[-1])
+
+    @patch('src.orchestrator.WeatherAgent')
+    @patch('src.orchestrator.LocationAgent')
+    def test_stream_reply_uses_location_agent_until_location_is_known(self, location_agent_mock: Mock,
+                                                                      weather_agent_mock: Mock):
+        location_agent_mock.return_value.stream.return_value = iter(['Where are you?'])
+
+        reply = ''.join(Orchestrator().stream_reply('Hi', Context()))
+
+        self.assertEqual('Where are you?', reply)
+        weather_agent_mock.return_value.stream.assert_not_called()
+
+    @patch('src.orchestrator.WeatherAgent')
+    @patch('src.orchestrator.LocationAgent')
+    def test_agents_are_built_once_and_reused_across_turns(self, location_agent_mock: Mock,
+                                                           weather_agent_mock: Mock):
+        location_agent_mock.return_value.invoke.return_value = None
+        weather_agent_mock.return_value.invoke.return_value = 'It is sunny.'
+        orchestrator = Orchestrator()
+
+        for message in ('Hi', 'Will it rain?', 'And tomorrow?'):
+            orchestrator.get_reply(message, Context())
+
+        location_agent_mock.assert_called_once()
+        weather_agent_mock.assert_called_once()
+        self.assertEqual(3, weather_agent_mock.return_value.invoke.call_count)
+
+    def test_unavailable_model_is_answered_with_the_fallback_reply(self):
+        location_agent = Mock()
+        location_agent.invoke.side_effect = CircuitOpenError('The circuit is open')
+        location_agent.stream.side_effect = LLMTimeoutError('Timed out')
+        orchestrator = Orchestrator(location_agent=location_agent, weather_agent=Mock())
+        context = Context()
+
+        self.assertEqual(FALLBACK_REPLY, orchestrator.get_reply('Hi', context))
+        self.assertEqual(FALLBACK_REPLY, ''.join(orchestrator.stream_reply('Hello?', context)))
+        self.assertEqual([FALLBACK_REPLY, FALLBACK_REPLY],
+                         [message['content'] for message in context.get_messages() if message['role'] == 'assistant'])
+
+    def test_turn_out_of_budget_is_answered_with_the_fallback_reply(self):
+        location_agent = Mock()
+
+        def invoke(context):
+            time.sleep(0.02)
+            raise requests.ReadTimeout('Read timed out')
+
+        location_agent.invoke.side_effect = invoke
+        orchestrator = Orchestrator(location_agent=location_agent, weather_agent=Mock(), turn_budget=0.01)
+
+        self.assertEqual(FALLBACK_REPLY, orchestrator.get_reply('Hi', Context()))
+
+    def test_bugs_are_raised_even_when_the_turn_is_out_of_budget(self):
+        location_agent = Mock()
+
+        def invoke(context):
+            time.sleep(0.02)
+            raise KeyError('location')
+
+        location_agent.invoke.side_effect = invoke
+        orchestrator = Orchestrator(location_agent=location_agent, weather_agent=Mock(), turn_budget=0.01)
+
+        self.assertRaises(KeyError, orchestrator.get_reply, 'Hi', Context())
+
+    def test_location_is_not_extracted_again_when_the_budget_is_nearly_spent(self):
+        context = Context()
+        context.location = (47.6, -122.3)
+        extractor = LocationExtractor(geocoder=Mock(), incremental=False)
+
+        with deadline_scope(Deadline(1.0, reserve=1.0)), \
+                patch('src.agents.location.location_extractor.get_llm_client') as llm_mock:
+            extractor.extract(context)
+
+        llm_mock.assert_not_called()
+        self.assertEqual((47.6, -122.3), context.location)
+
+
+class TestExtractionMode(unittest.TestCase):
+
+    def test_unknown_extraction_mode_is_rejected(self):
+        with self.assertRaises(ValueError):
+            Orchestrator(extraction_mode='parallel')
+
+    def test_combined_mode_extracts_once_before_weather_agent_replies(self):
+        context = Context()
+        location_agent = Mock()
+        location_agent.invoke.return_value = None
+        weather_agent = Mock()
+        weather_agent.reply.return_value = 'It is sunny.'
+
+        with patch('src.orchestrator.CombinedExtractor') as extractor_mock, \
+                patch('src.orchestrator.LocationAgent', return_value=location_agent) as location_agent_mock, \
+                patch('src.orchestrator.WeatherAgent', return_value=weather_agent):
+            reply = Orchestrator(extraction_mode='combined').get_reply('Hi', context)
+
+        self.assertEqual('It is sunny.', reply)
+        location_agent_mock.assert_called_once_with(extractor=extractor_mock.return_value)
+        weather_agent.invoke.assert_not_called()
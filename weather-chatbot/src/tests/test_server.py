@@ -0,0 +1,162 @@
+import asyncio
+import json
+import unittest
+
+from src.context import Context
+from src.server import ChatServer
+from src.sessions import SessionStore
+
+
+class FakeOrchestrator:
+    """Echoes the user's message, optionally waiting until released."""
+    def __init__(self):
+        self.release = None
+
+    async def get_reply_async(self, user_message: str | None, context: Context) -> str:
+        if user_message:
+            context.add_message('user', user_message)
+        if self.release is not None:
+            await self.release.wait()
+
+        reply = f'You said: {user_message}' if user_message else 'Hi! What is your location?'
+        context.add_message('assistant', reply)
+
+        return reply
+
+
+async def request(app: ChatServer, method: str, path: str, body: dict | None = None) -> tuple[int, dict, dict]:
+    messages = [{'type': 'http.request', 'body': json.dumps(body).encode() if body is not None else b''}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    await app({'type': 'http', 'method': method, 'path': path}, receive, send)
+
+    headers = {name.decode(): value.decode() for name, value in sent[0]['headers']}
+    return sent[0]['status'], headers, json.loads(sent[1]['body'])
+
+
+
+async def wait_until(condition, timeout: float = 1.0):
+    """Session store I/O runs in worker threads, so requests reach the queue after a variable delay."""
+    async def poll():
+        while not condition():
+            await asyncio.sleep(0.001)
+
+    await asyncio.wait_for(poll(), timeout)
+
+
+class TestChatServer(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.orchestrator = FakeOrchestrator()
+        self.sessions = SessionStore()
+
+    def _app(self, **kwargs) -> ChatServer:
+        return ChatServer(orchestrator=self.orchestrator, sessions=self.sessions, **kwargs)
+
+    async def test_session_conversation(self):
+        app = self._app()
+
+        status, _, created = await request(app, 'POST', '/sessions')
+        self.assertEqual(201, status)
+        self.assertEqual('Hi! What is your location?', created['reply'])
+
+        status, _, body = await request(app, 'POST', f"/sessions/{created['session_id']}/messages",
+                                        {'message': 'Seattle'})
+        self.assertEqual(200, status)
+        self.assertEqual('You said: Seattle', body['reply'])
+        self.assertEqual(32, len(body['trace_id']))
+        self.assertNotEqual(created['trace_id'], body['trace_id'])
+        self.assertEqual(3, len(self.sessions.get(created['session_id']).get_messages()))
+
+        status, _, _ = await request(app, 'DELETE', f"/sessions/{created['session_id']}")
+        self.assertEqual(200, status)
+        self.assertIsNone(self.sessions.get(created['session_id']))
+
+    async def test_unknown_session_and_bad_requests(self):
+        app = self._app()
+        _, _, created = await request(app, 'POST', '/sessions')
+
+        self.assertEqual(404, (await request(app, 'POST', '/sessions/missing/messages', {'message': 'Hi'}))[0])
+        self.assertEqual(400, (await request(app, 'POST', f"/sessions/{created['session_id']}/messages", {}))[0])
+        self.assertEqual(404, (await request(app, 'GET', '/unknown'))[0])
+
+    async def test_full_queue_is_rejected_with_retry_after(self):
+        app = self._app(max_concurrency=1, max_queue=1)
+        session_id, _ = self.sessions.create()
+        self.orchestrator.release = asyncio.Event()
+
+        running = asyncio.ensure_future(request(app, 'POST', f'/sessions/{session_id}/messages', {'message': 'a'}))
+        queued = asyncio.ensure_future(request(app, 'POST', f'/sessions/{session_id}/messages', {'message': 'b'}))
+        await wait_until(lambda: app.in_flight == 1 and app.queued == 1)
+
+        status, headers, _ = await request(app, 'POST', f'/sessions/{session_id}/messages', {'message': 'c'})
+        _, _, metrics = await request(app, 'GET', '/metrics')
+
+        self.assertEqual(503, status)
+        self.assertEqual('1', headers['retry-after'])
+        self.assertEqual({'in_flight': 1, 'queued': 1, 'rejected': 1},
+                         {key: metrics[key] for key in ('in_flight', 'queued', 'rejected')})
+
+        self.orchestrator.release.set()
+        self.assertEqual([200, 200], [(await running)[0], (await queued)[0]])
+
+        _, _, metrics = await request(app, 'GET', '/metrics')
+        self.assertEqual(2, metrics['turns'])
+        self.assertIsNotNone(metrics['turn_latency_p95_ms'])
+
+    async def test_messages_waiting_for_their_session_do_not_hold_a_slot(self):
+        app = self._app(max_concurrency=2, max_queue=2)
+        busy_id, _ = self.sessions.create()
+        other_id, _ = self.sessions.create()
+        self.orchestrator.release = asyncio.Event()
+
+        busy = [asyncio.ensure_future(request(app, 'POST', f'/sessions/{busy_id}/messages', {'message': message}))
+                for message in 'abc']
+        await wait_until(lambda: app.in_flight == 1 and app.queued == 2)
+        other = asyncio.ensure_future(request(app, 'POST', f'/sessions/{other_id}/messages', {'message': 'd'}))
+        await wait_until(lambda: app.in_flight == 2)
+
+        _, _, metrics = await request(app, 'GET', '/metrics')
+        self.assertEqual({'in_flight': 2, 'queued': 2, 'rejected': 0},
+                         {key: metrics[key] for key in ('in_flight', 'queued', 'rejected')})
+        # The other session's turn got the second slot while the busy session's messages wait their turn
+        self.assertEqual(['d'], [message['content'] for message in self.sessions.get(other_id).get_messages()])
+
+        self.orchestrator.release.set()
+        self.assertEqual([200] * 4, [(await response)[0] for response in [*busy, other]])
+        self.assertEqual(6, len(self.sessions.get(busy_id).get_messages()))
+
+    async def test_delete_waits_for_the_running_turn(self):
+        app = self._app()
+        session_id, _ = self.sessions.create()
+        self.orchestrator.release = asyncio.Event()
+
+        running = asyncio.ensure_future(request(app, 'POST', f'/sessions/{session_id}/messages', {'message': 'a'}))
+        await wait_until(lambda: app.in_flight == 1)
+        deleted = asyncio.ensure_future(request(app, 'DELETE', f'/sessions/{session_id}'))
+        await asyncio.sleep(0.01)
+        self.assertFalse(deleted.done())
+
+        self.orchestrator.release.set()
+        self.assertEqual([200, 200], [(await running)[0], (await deleted)[0]])
+        # The turn's save doesn't bring the deleted session back
+        self.assertIsNone(self.sessions.get(session_id))
+
+    async def test_queue_timeout_is_rejected(self):
+        app = self._app(max_concurrency=1, queue_timeout=0.01)
+        session_id, _ = self.sessions.create()
+        self.orchestrator.release = asyncio.Event()
+
+        running = asyncio.ensure_future(request(app, 'POST', f'/sessions/{session_id}/messages', {'message': 'a'}))
+        await wait_until(lambda: app.in_flight == 1)
+
+        self.assertEqual(503, (await request(app, 'POST', '/sessions', {}))[0])
+
+        self.orchestrator.release.set()
+        await running
@@ -0,0 +1,43 @@
+import os
+import tempfile
+import unittest
+
+from src.clients.cache import SqliteStore
+from src.sessions import SessionStore
+
+
+class TestSessionStore(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 1000.0
+
+    def test_idle_sessions_expire(self):
+        sessions = SessionStore(ttl=60, clock=lambda: self.now)
+        session_id, context = sessions.create()
+
+        self.now += 30
+        self.assertIs(context, sessions.get(session_id))
+        sessions.save(session_id, context)
+
+        self.now += 45
+        self.assertIs(context, sessions.get(session_id))
+
+        self.now += 61
+        self.assertIsNone(sessions.get(session_id))
+
+    def test_sessions_are_resumed_from_sqlite(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'sessions.db')
+            sessions = SessionStore(store=SqliteStore(path, table='sessions'), clock=lambda: self.now)
+            session_id, context = sessions.create()
+            context.add_message('user', 'Seattle')
+            context.location = (47.6, -122.3)
+            sessions.save(session_id, context)
+            sessions.close()
+
+            sessions = SessionStore(store=SqliteStore(path, table='sessions'), clock=lambda: self.now)
+            resumed = sessions.get(session_id)
+            sessions.close()
+
+        self.assertEqual([{'role': 'user', 'content': 'Seattle'}], resumed.get_messages())
+        self.assertEqual((47.6, -122.3), resumed.location)
@@ -0,0 +1,133 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+
+from src.clients.llm_interface import TracedLLMClient
+from src.context import Context
+from src.orchestrator import Orchestrator
+from src.tracing import STATUS_CODE_ERROR, JsonLinesExporter, Tracer, current_span
+
+
+class RecordingExporter:
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span)
+
+
+class TestTracer(unittest.TestCase):
+
+    def setUp(self):
+        self.exporter = RecordingExporter()
+        self.tracer = Tracer(exporter=self.exporter)
+
+    def test_spans_nest_under_the_current_span(self):
+        with self.tracer.span('turn') as turn:
+            with self.tracer.span('agent') as agent:
+                self.assertIs(agent, current_span())
+            with self.tracer.span('other agent') as other_agent:
+                pass
+
+        self.assertIsNone(current_span())
+        self.assertEqual(['agent', 'other agent', 'turn'], [span.name for span in self.exporter.spans])
+        self.assertEqual({turn.trace_id}, {span.trace_id for span in self.exporter.spans})
+        self.assertEqual(turn.span_id, agent.parent_id)
+        self.assertEqual(turn.span_id, other_agent.parent_id)
+        self.assertIsNone(turn.parent_id)
+        self.assertGreaterEqual(turn.duration_ms, agent.duration_ms)
+
+    def test_new_trace_per_root_span(self):
+        with self.tracer.span('turn') as first:
+            pass
+        with self.tracer.span('turn') as second:
+            pass
+
+        self.assertNotEqual(first.trace_id, second.trace_id)
+
+    def test_errors_are_recorded_and_raised(self):
+        with self.assertRaises(ValueError):
+            with self.tracer.span('llm.chat'):
+                raise ValueError('Rate limited')
+
+        exported = self.exporter.spans[0].to_otel()
+        self.assertEqual({'code': STATUS_CODE_ERROR, 'message': 'Rate limited'}, exported['status'])
+        self.assertEqual('exception', exported['events'][0]['name'])
+
+    def test_concurrent_tasks_nest_under_the_span_that_started_them(self):
+        async def agent(name):
+            with self.tracer.span(name):
+                await asyncio.sleep(0)
+
+        async def turn():
+            with self.tracer.span('turn') as span:
+                await asyncio.gather(agent('location'), agent('weather'))
+            return span
+
+        turn_span = asyncio.run(turn())
+
+        self.assertEqual({turn_span.span_id},
+                         {span.parent_id for span in self.exporter.spans if span.name != 'turn'})
+
+    def test_json_lines_export_is_otlp_json(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'traces.jsonl')
+            exporter = JsonLinesExporter(path)
+            tracer = Tracer(exporter=exporter)
+            with tracer.span('turn', session='abc'):
+                with tracer.span('llm.chat', prompt_tokens=120, cache_hit=False, latency=1.5):
+                    pass
+            exporter.close()
+
+            with open(path) as traces:
+                lines = [json.loads(line) for line in traces]
+
+        self.assertEqual(2, len(lines))
+        resource_spans = lines[0]['resourceSpans'][0]
+        self.assertEqual('weather-chatbot', resource_spans['resource']['attributes'][0]['value']['stringValue'])
+        span = resource_spans['scopeSpans'][0]['spans'][0]
+        self.assertEqual('llm.chat', span['name'])
+        self.assertEqual(lines[1]['resourceSpans'][0]['scopeSpans'][0]['spans'][0]['spanId'], span['parentSpanId'])
+        self.assertEqual([{'key': 'prompt_tokens', 'value': {'intValue': '120'}},
+                          {'key': 'cache_hit', 'value': {'boolValue': False}},
+                          {'key': 'latency', 'value': {'doubleValue': 1.5}}], span['attributes'])
+
+
+class TestInstrumentation(unittest.TestCase):
+
+    def setUp(self):
+        self.exporter = RecordingExporter()
+        self.tracer = Tracer(exporter=self.exporter)
+
+    def test_llm_calls_record_agent_and_token_usage(self):
+        client = Mock()
+        client.chat.completions.create.return_value = Mock(
+            usage=Mock(prompt_tokens=120, completion_tokens=8, total_tokens=128))
+
+        with patch('src.clients.llm_interface.get_tracer', return_value=self.tracer):
+            TracedLLMClient(client, 'WeatherExtractor').chat.completions.create(model='gpt-4o', messages=[])
+
+        self.assertEqual({'agent': 'WeatherExtractor', 'model': 'gpt-4o', 'stream': False,
+                          'llm.prompt_tokens': 120, 'llm.completion_tokens': 8, 'llm.total_tokens': 128},
+                         self.exporter.spans[0].attributes)
+
+    def test_get_reply_traces_the_turn_and_keeps_its_trace_id(self):
+        location_agent = Mock()
+
+        def invoke(context):
+            with self.tracer.span('LocationAgent.invoke'):
+                return 'Where are you?'
+
+        location_agent.invoke.side_effect = invoke
+        orchestrator = Orchestrator(extraction_mode='separate', tracer=self.tracer,
+                                    location_agent=location_agent, weather_agent=Mock())
+
+        orchestrator.get_reply('Hi', Context())
+
+        turn = self.exporter.spans[-1]
+        self.assertEqual('turn', turn.name)
+        self.assertEqual(orchestrator.last_trace_id, turn.trace_id)
+        self.assertEqual(turn.span_id, self.exporter.spans[0].parent_id)
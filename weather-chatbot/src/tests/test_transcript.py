@@ -0,0 +1,69 @@
+import unittest
+
+from src.context import Context
+from src.transcript import Transcript, transcript_for
+
+
+class TestTranscript(unittest.TestCase):
+
+    def setUp(self):
+        self.messages = [
+            {'role': 'assistant', 'content': 'Hi! What is your location?'},
+            {'role': 'user', 'content': 'Seattle'},
+        ]
+
+    def test_render_matches_flattened_history(self):
+        transcript = Transcript(self.messages)
+
+        self.assertEqual('assistant: Hi! What is your location?\nuser: Seattle', transcript.render())
+        self.assertEqual('ASSISTANT: Hi! What is your location?\nUSER: Seattle', transcript.render('upper'))
+
+    def test_append_updates_memoized_rendering(self):
+        transcript = Transcript(self.messages)
+        transcript.render()
+
+        self.messages.append({'role': 'assistant', 'content': 'What would you like to know?'})
+        transcript.sync(self.messages)
+
+        self.assertEqual('assistant: Hi! What is your location?\nuser: Seattle\n'
+                         'assistant: What would you like to know?', transcript.render())
+        self.assertEqual('user: Seattle\nassistant: What would you like to know?', transcript.render(start=-2))
+        self.assertEqual('user: Seattle', transcript.render(start=1, roles=['user']))
+
+    def test_replaced_list_is_rendered_from_scratch(self):
+        transcript = Transcript(self.messages)
+        transcript.render()
+
+        transcript.sync([{'role': 'user', 'content': 'Portland'}])
+
+        self.assertEqual('user: Portland', transcript.render())
+
+    def test_refilled_list_is_rendered_from_scratch(self):
+        transcript = Transcript(self.messages)
+        transcript.render()
+
+        self.messages[:] = [{'role': 'user', 'content': 'Portland'}, {'role': 'assistant', 'content': 'Sunny'}]
+        transcript.sync(self.messages)
+
+        self.assertEqual('user: Portland\nassistant: Sunny', transcript.render())
+
+    def test_edited_last_message_is_rendered_again(self):
+        transcript = Transcript(self.messages)
+        transcript.render()
+
+        self.messages[-1]['content'] = 'Seattle, WA'
+        transcript.sync(self.messages)
+
+        self.assertEqual('assistant: Hi! What is your location?\nuser: Seattle, WA', transcript.render())
+
+    def test_transcript_for_reuses_transcript_of_the_same_list(self):
+        self.assertIs(transcript_for(self.messages), transcript_for(self.messages))
+        self.assertEqual(0, len(transcript_for([])))
+
+    def test_context_transcript_follows_messages(self):
+        context = Context()
+        context.add_message('user', 'Seattle')
+        self.assertEqual('user: Seattle', context.transcript.render())
+
+        context._messages = self.messages
+        self.assertEqual('assistant: Hi! What is your location?\nuser: Seattle', context.transcript.render())
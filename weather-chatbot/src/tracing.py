@@ -0,0 +1,208 @@
+"""
+Lightweight tracing of conversation turns.
+
+A turn is traced as nested spans (turn, agent steps, then LLM, Maps and weather calls)
+recording durations, token usage, cache hits and errors. Spans are kept in a context
+variable, so they nest across function calls and asyncio tasks without being passed
+around. When TRACE_PATH is set, finished spans are appended to it as OpenTelemetry
+(OTLP/JSON) lines, one ResourceSpans object per span, which the OpenTelemetry
+collector's otlpjsonfile receiver and most trace viewers can import.
+"""
+import contextlib
+import contextvars
+import functools
+import inspect
+import json
+import os
+import secrets
+import threading
+import time
+from typing import Any, Callable, Iterator, Optional
+
+
+SERVICE_NAME = "weather-chatbot"
+
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+
+STATUS_CODE_UNSET = 0
+STATUS_CODE_ERROR = 2
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    """A timed operation within a trace."""
+    __slots__ = ("name", "kind", "trace_id", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, name: str, trace_id: str, parent_id: str | None = None, kind: int = SPAN_KIND_INTERNAL,
+                 attributes: Optional[dict[str, Any]] = None):
+        self.name = name
+        self.kind = kind
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns: int | None = None
+        self.attributes = attributes or {}
+        self.error: BaseException | None = None
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def set_attributes(self, **attributes: Any):
+        self.attributes.update(attributes)
+
+    def record_error(self, error: BaseException):
+        self.error = error
+
+    @property
+    def duration_ms(self) -> float | None:
+        return (self.end_ns - self.start_ns) / 1e6 if self.end_ns is not None else None
+
+    def to_otel(self) -> dict:
+        """Returns the span in the OTLP/JSON span format."""
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [{"key": key, "value": _otel_value(value)}
+                           for key, value in self.attributes.items() if value is not None],
+            "status": {"code": STATUS_CODE_UNSET},
+        }
+        if self.parent_id is not None:
+            span["parentSpanId"] = self.parent_id
+
+        if self.error is not None:
+            message = str(self.error) or type(self.error).__name__
+            span["status"] = {"code": STATUS_CODE_ERROR, "message": message}
+            span["events"] = [{
+                "name": "exception",
+                "timeUnixNano": str(self.end_ns),
+                "attributes": [{"key": "exception.type", "value": {"stringValue": type(self.error).__name__}},
+                               {"key": "exception.message", "value": {"stringValue": str(self.error)}}],
+            }]
+
+        return span
+
+
+def _otel_value(value: Any) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+
+    return {"stringValue": str(value)}
+
+
+class JsonLinesExporter:
+    """Appends finished spans to a file as OTLP/JSON lines."""
+    def __init__(self, path: str, service_name: str = SERVICE_NAME):
+        self.path = path
+        self._resource = {"attributes": [{"key": "service.name", "value": {"stringValue": service_name}}]}
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def export(self, span: Span):
+        line = json.dumps({"resourceSpans": [{
+            "resource": self._resource,
+            "scopeSpans": [{"scope": {"name": __name__}, "spans": [span.to_otel()]}],
+        }]}, separators=(",", ":"))
+
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class Tracer:
+    """Creates spans, nesting each one under the span that is current when it starts."""
+    def __init__(self, exporter: Optional[JsonLinesExporter] = None):
+        self.exporter = exporter
+
+    @contextlib.contextmanager
+    def span(self, name: str, kind: int = SPAN_KIND_INTERNAL, **attributes: Any) -> Iterator[Span]:
+        """Runs the block in a new current span, recording any error raised in it."""
+        span = self.start_span(name, kind, **attributes)
+        with self.use_span(span):
+            try:
+                yield span
+            except BaseException as error:
+                span.record_error(error)
+                raise
+            finally:
+                self.end_span(span)
+
+    def start_span(self, name: str, kind: int = SPAN_KIND_INTERNAL, **attributes: Any) -> Span:
+        """Starts a span without making it current, for work that can't run in a single block (like streams)."""
+        parent = _current_span.get()
+        if parent is None:
+            return Span(name, secrets.token_hex(16), kind=kind, attributes=attributes)
+
+        return Span(name, parent.trace_id, parent.span_id, kind=kind, attributes=attributes)
+
+    @staticmethod
+    @contextlib.contextmanager
+    def use_span(span: Span) -> Iterator[Span]:
+        """Makes span the current span inside the block."""
+        token = _current_span.set(span)
+        try:
+            yield span
+        finally:
+            _current_span.reset(token)
+
+    def end_span(self, span: Span):
+        span.end_ns = time.time_ns()
+        if self.exporter is not None:
+            self.exporter.export(span)
+
+
+def current_span() -> Span | None:
+    return _current_span.get()
+
+
+def traced(name: str, kind: int = SPAN_KIND_INTERNAL) -> Callable:
+    """Decorates a function or coroutine function to run in a span of the process-wide tracer."""
+    def decorator(function: Callable) -> Callable:
+        if inspect.iscoroutinefunction(function):
+            @functools.wraps(function)
+            async def async_wrapper(*args, **kwargs):
+                with get_tracer().span(name, kind):
+                    return await function(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with get_tracer().span(name, kind):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+_tracer: Tracer | None = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer() -> Tracer:
+    """Returns the process-wide tracer, exporting to TRACE_PATH if it is set."""
+    global _tracer
+
+    if _tracer is None:
+        with _tracer_lock:
+            if _tracer is None:
+                path = os.environ.get("TRACE_PATH")
+                _tracer = Tracer(exporter=JsonLinesExporter(path) if path else None)
+
+    return _tracer
@@ -0,0 +1,135 @@
+import threading
+from typing import Callable, Iterable, Optional
+
+from src.clients.cache import TTLCache
+
+
+LINE_FORMATS: dict[str, Callable[[str, str], str]] = {
+    # How the agents flatten the history into their prompts
+    "plain": lambda role, content: f"{role}: {content}",
+    # How the eval library prints conversations for the graders
+    "upper": lambda role, content: f"{role.upper()}: {content}",
+}
+
+
+class Transcript:
+    """
+    Append-only text rendering of a message history.
+
+    Each message is rendered once per line format, the first time that format is asked
+    for, and the full transcript of a format is kept up to date as messages are added.
+    Prompts that flatten the history every turn take their (sliced) rendering from here
+    instead of rebuilding the whole string.
+
+    Messages already rendered must not be edited in place. Only the last one is checked
+    on each sync, so editing an earlier message goes unnoticed. A transcript can be
+    shared between threads.
+    """
+    __slots__ = ("_source", "_roles", "_contents", "_lines", "_rendered", "_lock")
+
+    def __init__(self, messages: Optional[list[dict]] = None):
+        self._source: Optional[list[dict]] = None
+        self._roles: list[str] = []
+        self._contents: list[str] = []
+        self._lines: dict[str, list[str]] = {}
+        self._rendered: dict[str, str] = {}
+        self._lock = threading.RLock()
+
+        if messages is not None:
+            self.sync(messages)
+
+    def __len__(self):
+        return len(self._roles)
+
+    def append(self, role: str, content: str):
+        with self._lock:
+            self._roles.append(role)
+            self._contents.append(content)
+
+            # Only formats somebody has rendered are kept up to date
+            for line_format, lines in self._lines.items():
+                line = LINE_FORMATS[line_format](role, content)
+                lines.append(line)
+                if line_format in self._rendered:
+                    rendered = self._rendered[line_format]
+                    self._rendered[line_format] = f"{rendered}\n{line}" if len(lines) > 1 else line
+
+    def sync(self, messages: list[dict]) -> "Transcript":
+        """
+        Appends the messages added to the list since the last sync. The list is expected
+        to only grow; a different or shorter list, or one whose last rendered message has
+        changed (it was edited, or the list truncated and refilled), is rendered again from
+        scratch.
+        """
+        with self._lock:
+            if messages is not self._source or len(messages) < len(self) or not self._last_matches(messages):
+                self._source = messages
+                self._roles, self._contents = [], []
+                self._lines, self._rendered = {}, {}
+
+            for message in messages[len(self):]:
+                self.append(message["role"], message["content"])
+
+        return self
+
+    def _last_matches(self, messages: list[dict]) -> bool:
+        if len(self) == 0:
+            return True
+
+        last = messages[len(self) - 1]
+        return last["role"] == self._roles[-1] and last["content"] == self._contents[-1]
+
+    def lines(self, line_format: str = "plain") -> list[str]:
+        """Returns the rendered line of every message. The list must not be modified."""
+        with self._lock:
+            lines = self._lines.get(line_format)
+            if lines is None:
+                render_line = LINE_FORMATS[line_format]
+                lines = [render_line(role, content) for role, content in zip(self._roles, self._contents)]
+                self._lines[line_format] = lines
+
+            return lines
+
+    def render(self,
+               line_format: str = "plain",
+               start: Optional[int] = None,
+               end: Optional[int] = None,
+               roles: Optional[Iterable[str]] = None) -> str:
+        """
+        Returns the messages joined by newlines. start and end slice the history like a list,
+        and roles keeps only the messages sent by the given roles.
+        """
+        with self._lock:
+            lines = self.lines(line_format)
+
+            if start is None and end is None and roles is None:
+                rendered = self._rendered.get(line_format)
+                if rendered is None:
+                    rendered = "\n".join(lines)
+                    self._rendered[line_format] = rendered
+
+                return rendered
+
+            if roles is None:
+                return "\n".join(lines[start:end])
+
+            roles = set(roles)
+            return "\n".join(line for role, line in zip(self._roles[start:end], lines[start:end]) if role in roles)
+
+
+# Transcripts of plain message lists (like the eval library's dict contexts), keyed by list
+# identity. Each entry holds on to its list, so an id cannot be reused while it is cached.
+_transcripts = TTLCache(max_size=256, ttl=60 * 60.0)
+_transcripts_lock = threading.Lock()
+
+
+def transcript_for(messages: list[dict]) -> Transcript:
+    """Returns the cached transcript of a message list, appending whatever was added since the last call."""
+    # Eval threads share the cache; the lock keeps two of them from caching different transcripts of a list
+    with _transcripts_lock:
+        transcript = _transcripts.get(id(messages))
+        if transcript is None:
+            transcript = Transcript()
+            _transcripts.set(id(messages), transcript)
+
+    return transcript.sync(messages)